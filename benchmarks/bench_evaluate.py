@@ -0,0 +1,85 @@
+"""
+Per-call overhead of func_evaluate: compiled candidate evaluator vs the previous re.sub + eval path.
+
+Run from the repository root:
+    python benchmarks/bench_evaluate.py
+"""
+
+import re
+import timeit
+
+import pandas as pd
+
+from symbolfit.evaluate import func_evaluate
+from symbolfit.math_defs import *
+
+# A typical unscaled 1D candidate (dijet-like spectrum, 5 parameters).
+func_candidate = pd.Series(
+    {
+        "Parameterized equation, unscaled": (
+            "0.0123*(a1*exp(-a2*((x0 - 1568.5) * 0.000145)) * (1 - (x0 - 1568.5) * 0.000145)**a3"
+            " + a4*gauss(a5*((x0 - 1568.5) * 0.000145)))"
+        ),
+        "Parameterization": {"a1": 1.2, "a2": 3.4, "a3": 5.6, "a4": 0.7, "a5": 8.9},
+        "Parameters: (best-fit, +1, -1)": {
+            "a1": (1.21, 0.01, -0.01),
+            "a2": (3.41, 0.02, -0.02),
+            "a3": (5.61, 0.03, -0.03),
+            "a4": (0.71, 0.04, -0.04),
+            "a5": (8.91, 0.05, -0.05),
+        },
+    }
+)
+
+
+def legacy_func_evaluate(func_candidate, x, dim, param_shifted=None):
+    # The previous implementation (best-fit and one-parameter-shifted paths), kept for comparison.
+    func = re.sub(
+        r"\b(a\d+)\b",
+        r"func_candidate['Parameters: (best-fit, +1, -1)']['\1'][0]",
+        func_candidate["Parameterized equation, unscaled"],
+    )
+
+    if param_shifted is not None:
+        param_key = "Parameters: (best-fit, +1, -1)"
+        pattern = r"func_candidate\['Parameters: \(best-fit, \+1, -1\)'\]\['" + re.escape(param_shifted) + r"'\]\[0\]"
+        replacement = (
+            r"(func_candidate['" + param_key + r"']['" + param_shifted + r"'][0]"
+            r" + func_candidate['" + param_key + r"']['" + param_shifted + r"'][1])"
+        )
+        func = re.sub(pattern, replacement, func)
+
+    if dim > 1:
+        for i in range(dim):
+            globals()[f"x{i}"] = np.reshape(x[:, i], (-1, 1))
+
+    else:
+        x0 = x  # noqa: F841 -- used by eval(func) below
+
+    return eval(func)
+
+
+def main():
+    n_calls = 2000
+
+    print(f"{'n points':>10} {'legacy [us/call]':>18} {'compiled [us/call]':>20} {'speedup':>9}")
+
+    for n_points in (20, 200, 2000, 20000):
+        x = np.reshape(np.linspace(1568.5, 8452.0, n_points), (-1, 1))
+
+        np.testing.assert_allclose(
+            func_evaluate(func_candidate, x, dim=1, param_shifted="a3", sigma_pm="+"),
+            legacy_func_evaluate(func_candidate, x, dim=1, param_shifted="a3"),
+        )
+
+        t_legacy = timeit.timeit(lambda: legacy_func_evaluate(func_candidate, x, dim=1), number=n_calls)
+        t_compiled = timeit.timeit(lambda: func_evaluate(func_candidate, x, dim=1), number=n_calls)
+
+        print(
+            f"{n_points:>10} {t_legacy / n_calls * 1e6:>18.1f} {t_compiled / n_calls * 1e6:>20.1f}"
+            f" {t_legacy / t_compiled:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+Wall time of each SymbolFit stage after the PySR search, driven by recorded hall-of-fame fixtures.
+
+The PySR search itself is not run: the candidate functions come from
+benchmarks/fixtures/hall_of_fame_{1d,2d}.csv, recorded from PySR runs on
+the same synthetic shapes that are generated here, for 1D and 2D inputs
+of any number of points. Each stage is timed on its own, with the inputs
+prepared by the previous stages:
+
+    parse_pysr_equ, parameterize_func_all, refit_all, functions_unscale, add_gof,
+    func_sampling_1d (1D), plot_all_syst_all_func_1D/2D,
+    plot_total_unc_coverage_all_func_1D (1D), plot_all_corr, plot_all_gof.
+
+parse_pysr_equ needs a PySR run directory, which is built from the fixture
+with PySRRegressor.from_file(), so it is skipped when Julia is not available.
+Sampling and plotting on very large datasets take long, so they are skipped
+above --max-points-sampling and --max-points-plot (raise them to include).
+The ROF dominates the largest datasets (minutes per repeat for 1e6 points in 2D),
+narrow down the run with --sizes, --dims, --stages and --repeat as needed.
+
+The results are written as JSON (one record per stage, dim and number of points)
+for regression tracking, and summarized on stdout.
+
+Run from the repository root:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 20 1000 --dims 1 --repeat 5 --output bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import pickle
+import platform
+import shutil
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import sympy  # noqa: E402
+
+from symbolfit.evaluate import add_gof, func_sampling_1d  # noqa: E402
+from symbolfit.plotting import (  # noqa: E402
+    plot_all_corr,
+    plot_all_gof,
+    plot_all_syst_all_func_1D,
+    plot_all_syst_all_func_2D,
+    plot_total_unc_coverage_all_func_1D,
+)
+from symbolfit.processing import dataset_formatting, functions_unscale, histogram_scale  # noqa: E402
+from symbolfit.refit import parameterize_func_all, refit_all  # noqa: E402
+from symbolfit.utils import parse_pysr_equ, round_a_number, round_numbers_in_sympy_expr  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+fixtures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+stages = [
+    "parse_pysr_equ",
+    "parameterize_func_all",
+    "refit_all",
+    "functions_unscale",
+    "add_gof",
+    "func_sampling_1d",
+    "plot_all_syst_all_func",
+    "plot_total_unc_coverage_all_func_1D",
+    "plot_all_corr",
+    "plot_all_gof",
+]
+
+# Operators appearing in the fixtures, needed to rebuild a PySR model from the csv.
+pysr_operators = dict(binary_operators=["+", "-", "*", "/", "^"], unary_operators=["exp"])
+
+
+def synthetic_dataset(n_points, dim, seed=0):
+    """
+    Falling spectrum (1D) or falling x slope on a rising x1 slope (2D, on a regular grid),
+    the shapes the hall-of-fame fixtures were recorded on. Returns x, y, y_up, y_down and
+    the bin edges for the 2D plots.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    if dim == 1:
+        x = np.linspace(100, 2000, n_points)
+        u = (x - 100) / 1900
+        y_true = 1e4 * np.exp(-3 * u) * (1 + 0.04 * u)
+        bin_edges_2d = None
+
+    else:
+        n_side = max(2, math.isqrt(n_points))
+        x0_edges = np.linspace(0, 10, n_side + 1)
+        x1_edges = np.linspace(1, 3, n_side + 1)
+
+        x0, x1 = np.meshgrid((x0_edges[1:] + x0_edges[:-1]) / 2, (x1_edges[1:] + x1_edges[:-1]) / 2)
+        x = np.column_stack((x0.flatten(), x1.flatten()))
+        y_true = 500 * np.exp(-0.2 * x[:, 0]) * (1 + (x[:, 1] - 1) / 2)
+        bin_edges_2d = [x0_edges, x1_edges]
+
+    y_unc = 0.02 * y_true + 1
+    y = y_true + rng.normal(0, 1, y_true.shape) * y_unc
+
+    return x.tolist(), y.tolist(), y_unc.tolist(), y_unc.tolist(), bin_edges_2d
+
+
+def pysr_run_directory(dim, tmp_dir):
+    """
+    Rebuild a PySR run directory (hall_of_fame.csv + checkpoint.pkl) from the fixture,
+    as parse_pysr_equ() expects it. Raises if PySR/Julia is not available.
+    """
+
+    from pysr import PySRRegressor
+
+    run_directory = os.path.join(tmp_dir, f"run_{dim}d")
+    os.makedirs(run_directory, exist_ok=True)
+    shutil.copy(os.path.join(fixtures_dir, f"hall_of_fame_{dim}d.csv"), os.path.join(run_directory, "hall_of_fame.csv"))
+
+    model = PySRRegressor.from_file(run_directory=run_directory, n_features_in=dim, **pysr_operators)
+
+    with open(os.path.join(run_directory, "checkpoint.pkl"), "wb") as f:
+        pickle.dump(model, f)
+
+    return run_directory
+
+
+def hall_of_fame_candidates(dim):
+    """
+    The same candidates as parse_pysr_equ() would return, read from the fixture with sympy
+    only, so the later stages can be benchmarked without PySR.
+    """
+
+    hall_of_fame = pd.read_csv(os.path.join(fixtures_dir, f"hall_of_fame_{dim}d.csv"))
+
+    equation = []
+    for equ in hall_of_fame["Equation"]:
+        with sympy.evaluate(True):
+            equ = sympy.sympify(equ.replace("^", "**"))
+
+        equation.append(str(round_numbers_in_sympy_expr(equ)).replace("^", "**"))
+
+    return pd.DataFrame(
+        {
+            "PySR equation": equation,
+            "Complexity": hall_of_fame["Complexity"],
+            "PySR loss": [round_a_number(loss, sig_fig=3) for loss in hall_of_fame["Loss"]],
+        }
+    )
+
+
+def timed(func, repeat):
+    """
+    Run func() repeat times with its printout silenced, and return the last output and the wall times.
+    """
+
+    times = []
+
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            output = func()
+            times.append(time.perf_counter() - start)
+
+    return output, times
+
+
+def run(sizes, dims, selected_stages, repeat, n_samples, max_stderr, max_points_sampling, max_points_plot):
+    records = []
+
+    tmp_dir = tempfile.mkdtemp(prefix="symbolfit_bench_")
+
+    def record(stage, dim, n_points, n_candidates, times=None, skipped=None):
+        result = {
+            "stage": stage,
+            "dim": dim,
+            "n_points": n_points,
+            "n_candidates": n_candidates,
+            "repeat": len(times) if times else 0,
+            "status": "skipped" if skipped else "ok",
+        }
+
+        if skipped:
+            result["reason"] = skipped
+
+        else:
+            result["times_s"] = [round(t, 6) for t in times]
+            result["min_s"] = round(min(times), 6)
+            result["median_s"] = round(float(np.median(times)), 6)
+
+        records.append(result)
+
+        summary = f"{result['min_s']:.4f} s (min of {len(times)})" if times else f"skipped: {skipped}"
+        print(f"{stage:>40} | dim {dim} | {n_points:>8} points | {n_candidates} candidates | {summary}", flush=True)
+
+    try:
+        for dim in dims:
+            try:
+                run_directory = pysr_run_directory(dim, tmp_dir)
+                parse_error = None
+
+            except Exception as e:
+                run_directory = None
+                parse_error = f"PySR run directory unavailable ({type(e).__name__}: {e})".splitlines()[0]
+
+            for size in sizes:
+                x, y, y_up, y_down, bin_edges_2d = synthetic_dataset(size, dim)
+
+                x, y, y_up, y_down, _, dim = dataset_formatting(x=x, y=y, y_up=y_up, y_down=y_down, fit_y_unc=True)
+                X, Y, Y_up, Y_down, y_scale = histogram_scale(
+                    x=x, y=y, y_up=y_up, y_down=y_down, x_min=0, x_max=1, scale_y_by="mean"
+                )
+
+                n_points = x.shape[0]
+
+                def want(stage):
+                    return stage in selected_stages
+
+                # Candidates from the PySR search.
+                func_candidates = None
+                if want("parse_pysr_equ"):
+                    if run_directory is not None:
+                        func_candidates, times = timed(lambda: parse_pysr_equ(pysr_dir=run_directory, x=X), repeat)
+                        record("parse_pysr_equ", dim, n_points, len(func_candidates), times)
+
+                    else:
+                        record("parse_pysr_equ", dim, n_points, 0, skipped=parse_error)
+
+                if func_candidates is None:
+                    func_candidates = hall_of_fame_candidates(dim)
+
+                n_candidates = len(func_candidates)
+
+                func_candidates, times = timed(
+                    lambda: parameterize_func_all(func_candidates=func_candidates.copy(), dim=dim), repeat
+                )
+                if want("parameterize_func_all"):
+                    record("parameterize_func_all", dim, n_points, n_candidates, times)
+
+                # The later stages need the refitted candidates, so the ROF is always run (once if not selected).
+                func_candidates, times = timed(
+                    lambda: refit_all(
+                        func_candidates=func_candidates.copy(),
+                        x=X,
+                        y=Y,
+                        y_up=Y_up,
+                        y_down=Y_down,
+                        max_stderr=max_stderr,
+                        dim=dim,
+                    ),
+                    repeat if want("refit_all") else 1,
+                )
+                if want("refit_all"):
+                    record("refit_all", dim, n_points, n_candidates, times)
+
+                func_candidates, times = timed(
+                    lambda: functions_unscale(
+                        func_candidates=func_candidates.copy(), x=x, X=X, y_scale=y_scale, input_scale=True, dim=dim
+                    ),
+                    repeat,
+                )
+                if want("functions_unscale"):
+                    record("functions_unscale", dim, n_points, n_candidates, times)
+
+                func_candidates, times = timed(
+                    lambda: add_gof(
+                        func_candidates=func_candidates.copy(), x=x, y=y, y_up=y_up, y_down=y_down, dim=dim
+                    ),
+                    repeat,
+                )
+                if want("add_gof"):
+                    record("add_gof", dim, n_points, n_candidates, times)
+
+                if want("func_sampling_1d") and dim == 1:
+                    if n_points > max_points_sampling:
+                        record(
+                            "func_sampling_1d", dim, n_points, n_candidates, skipped="n_points > --max-points-sampling"
+                        )
+
+                    else:
+                        # Same finer grid as in plot_total_unc_coverage_single_func_1D().
+                        x_finer = np.arange(np.min(x), np.max(x), np.abs(np.max(x) - np.min(x)) / 200)
+
+                        def sampling():
+                            for i in range(len(func_candidates)):
+                                func_candidate = func_candidates.iloc[i]
+                                func_sampling_1d(
+                                    func_str=func_candidate["Parameterized equation, unscaled"],
+                                    param=func_candidate["Parameters: (best-fit, +1, -1)"],
+                                    cov=func_candidate["Covariance"],
+                                    x=x,
+                                    x_finer=x_finer,
+                                    n_samples=n_samples,
+                                )
+
+                        _, times = timed(sampling, repeat)
+                        record("func_sampling_1d", dim, n_points, n_candidates, times)
+
+                pdf_path = os.path.join(tmp_dir, "bench.pdf")
+
+                plots = {
+                    "plot_all_syst_all_func": (
+                        lambda: (
+                            plot_all_syst_all_func_1D(
+                                func_candidates=func_candidates,
+                                x=x,
+                                bin_widths_1d=None,
+                                y=y,
+                                y_up=y_up,
+                                y_down=y_down,
+                                pdf_path=pdf_path,
+                                logy=False,
+                                logx=False,
+                            )
+                            if dim == 1
+                            else plot_all_syst_all_func_2D(
+                                func_candidates=func_candidates,
+                                x=x,
+                                bin_edges_2d=bin_edges_2d,
+                                y=y,
+                                y_up=y_up,
+                                y_down=y_down,
+                                pdf_path=pdf_path,
+                                logx0=False,
+                                logx1=False,
+                                logy=False,
+                                cbar_min=None,
+                                cbar_max=None,
+                                cmap=None,
+                                contour=None,
+                            )
+                        )
+                    ),
+                    "plot_total_unc_coverage_all_func_1D": lambda: plot_total_unc_coverage_all_func_1D(
+                        func_candidates=func_candidates,
+                        x=x,
+                        bin_widths_1d=None,
+                        y=y,
+                        y_up=y_up,
+                        y_down=y_down,
+                        n_samples=n_samples,
+                        sampling_95quantile=False,
+                        pdf_path=pdf_path,
+                        logy=False,
+                        logx=False,
+                    ),
+                    "plot_all_corr": lambda: plot_all_corr(
+                        func_candidates=func_candidates, y_up=y_up, y_down=y_down, pdf_path=pdf_path
+                    ),
+                    "plot_all_gof": lambda: plot_all_gof(
+                        func_candidates=func_candidates, y_up=y_up, y_down=y_down, pdf_path=pdf_path
+                    ),
+                }
+
+                for stage, plot in plots.items():
+                    if not want(stage) or (stage.endswith("_1D") and dim != 1):
+                        continue
+
+                    if n_points > max_points_plot:
+                        record(stage, dim, n_points, n_candidates, skipped="n_points > --max-points-plot")
+
+                    else:
+                        _, times = timed(plot, repeat)
+                        record(stage, dim, n_points, n_candidates, times)
+
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 1000, 10000, 100000, 1000000])
+    parser.add_argument("--dims", type=int, nargs="+", default=[1, 2], choices=[1, 2])
+    parser.add_argument("--stages", nargs="+", default=stages, choices=stages)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--n-samples", type=int, default=2000, help="Same as in SymbolFit.plot_to_pdf().")
+    parser.add_argument("--max-stderr", type=float, default=20)
+    parser.add_argument("--max-points-sampling", type=int, default=100000)
+    parser.add_argument("--max-points-plot", type=int, default=10000)
+    parser.add_argument("--output", default="bench_pipeline.json")
+    args = parser.parse_args()
+
+    records = run(
+        sizes=args.sizes,
+        dims=args.dims,
+        selected_stages=args.stages,
+        repeat=args.repeat,
+        n_samples=args.n_samples,
+        max_stderr=args.max_stderr,
+        max_points_sampling=args.max_points_sampling,
+        max_points_plot=args.max_points_plot,
+    )
+
+    results = {
+        "benchmark": "bench_pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "cpu_count": os.cpu_count(),
+        "args": vars(args),
+        "results": records,
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+ROF with the analytic (symbolic) Jacobian vs the finite-difference Jacobian estimated by LMFIT.
+
+Each candidate is fitted once with all parameters floating on the bundled
+dijet, dimuon and diphoton spectra (rescaled as in SymbolFit.fit), and the
+number of function evaluations (nfev) and wall time are compared.
+
+Run from the repository root:
+    python benchmarks/bench_rof_jacobian.py
+"""
+
+import importlib
+import time
+
+import pandas as pd
+from lmfit import Minimizer, Parameters
+
+from symbolfit.processing import dataset_formatting, histogram_scale
+from symbolfit.refit import compile_jacobian, compile_residual, parameterize_func_all
+
+# Falling-spectrum shapes of increasing complexity, written in the rescaled x in [0, 1].
+candidates = [
+    "1.2*exp(-5.3*x0)",
+    "1.5*exp(-6.1*x0 + 1.7*x0**2)",
+    "2.1*exp(-7.4*x0)*(1 + 0.6*x0 + 0.3*x0**2)",
+    "0.9*exp(-4.2*x0)/(0.35 + x0)",
+    "1.1*tanh(0.4 + 3.2*exp(-5.6*x0)) + 0.02*x0",
+]
+
+datasets = ["dijet", "dimuon", "diphoton"]
+
+n_repeat = 5
+
+
+def fit(func_str, init, x, y, y_up, y_down, jacobian):
+    residual = compile_residual(func_str, x, y, y_up, y_down, loss_weights=None, dim=1)
+
+    params = Parameters()
+    for name, value in init.items():
+        params.add(name=name, value=value)
+
+    mini = Minimizer(userfcn=lambda p: residual([par.value for par in p.values()]), params=params)
+
+    if jacobian is None:
+        return mini.minimize()
+
+    return mini.minimize(Dfun=lambda p: jacobian([par.value for par in p.values()], [par.vary for par in p.values()]))
+
+
+def main():
+    rows = []
+
+    for dataset_name in datasets:
+        dataset = importlib.import_module(f"examples.datasets.{dataset_name}.dataset")
+
+        x, y, y_up, y_down, _, dim = dataset_formatting(
+            x=dataset.x, y=dataset.y, y_up=dataset.y_up, y_down=dataset.y_down, fit_y_unc=True
+        )
+        X, Y, Y_up, Y_down, _ = histogram_scale(x=x, y=y, y_up=y_up, y_down=y_down, scale_y_by="mean")
+
+        func_candidates = parameterize_func_all(pd.DataFrame({"PySR equation": candidates, "Complexity": 0}), dim)
+
+        for i in range(len(func_candidates)):
+            func_str = func_candidates["Parameterized equation"][i]
+            init = func_candidates["Parameterization"][i]
+
+            jacobian = compile_jacobian(func_str, X, Y, Y_up, Y_down, loss_weights=None, dim=dim)
+
+            row = {"dataset": dataset_name, "candidate": func_str, "num params": len(init)}
+
+            for mode, jac in (("finite diff", None), ("analytic", jacobian)):
+                try:
+                    start = time.perf_counter()
+                    for _ in range(n_repeat):
+                        result = fit(func_str, init, X, Y, Y_up, Y_down, jac)
+                    elapsed = (time.perf_counter() - start) / n_repeat
+
+                except ValueError:
+                    # The fit wandered into NaNs (same as a failed trial in refit_single).
+                    row[f"nfev ({mode})"] = row[f"time [ms] ({mode})"] = row[f"chi2 ({mode})"] = None
+                    continue
+
+                row[f"nfev ({mode})"] = result.nfev
+                row[f"time [ms] ({mode})"] = round(elapsed * 1e3, 2)
+                row[f"chi2 ({mode})"] = round(result.chisqr, 3)
+
+            rows.append(row)
+
+    pd.set_option("display.width", 250)
+    pd.set_option("display.max_colwidth", 45)
+
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Total minimizer evaluations per candidate in the ROF retry loop, with and without warm-started retries.
+
+A tight max_stderr forces retries with frozen parameters, on the bundled
+dijet, dimuon and diphoton spectra (rescaled as in SymbolFit.fit).
+
+Run from the repository root:
+    python benchmarks/bench_rof_warm_start.py
+"""
+
+import contextlib
+import importlib
+import io
+
+import pandas as pd
+from bench_rof_jacobian import candidates, datasets
+
+from symbolfit.processing import dataset_formatting, histogram_scale
+from symbolfit.refit import parameterize_func_all, refit_all
+
+max_stderr = 2
+
+
+def main():
+    rows = []
+
+    for dataset_name in datasets:
+        dataset = importlib.import_module(f"examples.datasets.{dataset_name}.dataset")
+
+        x, y, y_up, y_down, _, dim = dataset_formatting(
+            x=dataset.x, y=dataset.y, y_up=dataset.y_up, y_down=dataset.y_down, fit_y_unc=True
+        )
+        X, Y, Y_up, Y_down, _ = histogram_scale(x=x, y=y, y_up=y_up, y_down=y_down, scale_y_by="mean")
+
+        results = {}
+
+        for warm_start in (False, True):
+            func_candidates = parameterize_func_all(pd.DataFrame({"PySR equation": candidates, "Complexity": 0}), dim)
+
+            # Silence the progress printout of the refit loop.
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[warm_start] = refit_all(
+                    func_candidates=func_candidates,
+                    x=X,
+                    y=Y,
+                    y_up=Y_up,
+                    y_down=Y_down,
+                    max_stderr=max_stderr,
+                    dim=dim,
+                    warm_start=warm_start,
+                )
+
+        for i in range(len(candidates)):
+            rows.append(
+                {
+                    "dataset": dataset_name,
+                    "candidate": results[False]["Parameterized equation"][i],
+                    "fits (cold)": len(results[False]["ROF trials"][i]),
+                    "fits (warm)": len(results[True]["ROF trials"][i]),
+                    "nfev (cold)": results[False]["ROF nfev"][i],
+                    "nfev (warm)": results[True]["ROF nfev"][i],
+                    "final chi2 (cold)": results[False]["ROF trials"][i][-1]["chi2"],
+                    "final chi2 (warm)": results[True]["ROF trials"][i][-1]["chi2"],
+                }
+            )
+
+    df = pd.DataFrame(rows)
+
+    pd.set_option("display.width", 250)
+    pd.set_option("display.max_colwidth", 45)
+
+    print(df.to_string(index=False))
+    print(f"\nTotal nfev: {df['nfev (cold)'].sum()} (cold) vs {df['nfev (warm)'].sum()} (warm)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+def __getattr__(name):
+    # Imported on first use, so that e.g. symbolfit.evaluate can be used without loading PySR.
+    if name == "fit_many":
+        from .batch import fit_many
+
+        return fit_many
+
+    raise AttributeError(f"module 'symbolfit' has no attribute '{name}'")
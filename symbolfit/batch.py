@@ -0,0 +1,220 @@
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from .symbolfit import SymbolFit
+
+
+def fit_dataset(name, dataset, pysr_config, options, output_dir):
+    """
+    Run the SymbolFit pipeline on a single dataset (in a worker process of fit_many()).
+
+    Arguments
+    ---------
+    name (str):
+        Name of the dataset.
+
+    dataset (dict):
+        SymbolFit arguments of this dataset (x, y, y_up, y_down,...).
+
+    pysr_config (PySRRegressor):
+        PySR configuration, None for the SymbolFit default.
+
+    options (dict):
+        SymbolFit arguments common to all datasets, overridden by those in dataset.
+
+    output_dir (str):
+        Save the results to output_dir/name/ with SymbolFit.save_to_csv(), None to skip.
+
+
+    Returns
+    -------
+    result (dict):
+        'name', 'func_candidates' (None if failed), 'timings' (per stage, see SymbolFit.fit()),
+        'total time' and 'error' (traceback of the failure, None if succeeded).
+    """
+
+    start = time.perf_counter()
+
+    kwargs = {**options, **dataset}
+    if pysr_config is not None:
+        kwargs.setdefault("pysr_config", pysr_config)
+
+    model = None
+
+    try:
+        # Invalid options of this dataset only fail this dataset.
+        model = SymbolFit(**kwargs)
+        model.fit()
+
+        if output_dir is not None:
+            model.save_to_csv(output_dir=os.path.join(output_dir, name))
+
+        error = None
+
+    except Exception:
+        error = traceback.format_exc()
+
+    return {
+        "name": name,
+        "func_candidates": model.func_candidates if error is None else None,
+        "timings": model.timings if model is not None else {},
+        "total time": time.perf_counter() - start,
+        "error": error,
+    }
+
+
+def fit_many(datasets, pysr_config=None, max_workers=None, output_dir=None, start_method="spawn", **options):
+    """
+    Fits many datasets, each with the full SymbolFit pipeline, scheduled
+    over a process pool.
+
+    Parameters
+    ----------
+    datasets : dict | list
+        `{name: dataset}`, or a list of datasets named by their index, where
+        each dataset is a dict of SymbolFit arguments, at least `x`, `y` (and
+        `y_up`, `y_down`). Other arguments like `max_stderr` can be set per
+        dataset as well.
+    pysr_config : PySRRegressor | None
+        PySR configuration for all datasets (each worker fits its own copy),
+        `None` for the SymbolFit default.
+    max_workers : int | None
+        Maximum number of datasets fitted at the same time. `None` for the
+        number of CPU cores, `1` to fit them one after another in this process.
+    output_dir : str | None
+        If provided, the results of each dataset are saved to
+        `output_dir/<name>/` as with `SymbolFit.save_to_csv()`.
+    start_method : str
+        `multiprocessing` start method of the worker processes (`'spawn'` or `'forkserver'`).
+        Avoid `'fork'` once PySR is imported in this process, as Julia does not support forking.
+        With `'spawn'`, scripts call `fit_many()` under `if __name__ == '__main__':`.
+    **options
+        Other SymbolFit arguments common to all datasets,
+        e.g., `max_stderr=20`, `random_seed=42`.
+
+    Returns
+    -------
+    results : dict
+        `{name: func_candidates}` of the datasets fitted successfully.
+    summary : DataFrame
+        One row per dataset with its status, number of candidates, best
+        candidate (Chi2/NDF closest to 1, or lowest RMSE), wall time of each
+        stage and in total, and the error of failed fits.
+
+    !!! tip
+        ```python
+        import symbolfit
+
+        datasets = {}
+        for name in ["dijet", "dimuon", "diphoton"]:
+            dataset = importlib.import_module(f"examples.datasets.{name}.dataset")
+            datasets[name] = dict(x=dataset.x, y=dataset.y, y_up=dataset.y_up, y_down=dataset.y_down)
+
+        results, summary = symbolfit.fit_many(datasets, pysr_config=pysr_config, max_workers=3, max_stderr=20)
+        print(summary)
+        ```
+    """
+
+    if not isinstance(datasets, dict):
+        datasets = {str(i): dataset for i, dataset in enumerate(datasets)}
+
+    if max_workers is None:
+        max_workers = min(len(datasets), os.cpu_count() or 1)
+
+    fit_kwargs = dict(pysr_config=pysr_config, options=options, output_dir=output_dir)
+
+    fit_results = {}
+
+    print(f"Fitting {len(datasets)} datasets with {max_workers} worker(s)...")
+
+    if max_workers == 1:
+        for name, dataset in datasets.items():
+            fit_results[name] = fit_dataset(name=name, dataset=dataset, **fit_kwargs)
+            print_status(fit_results[name], len(fit_results), len(datasets))
+
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context(start_method)
+        ) as executor:
+            futures = {
+                executor.submit(fit_dataset, name=name, dataset=dataset, **fit_kwargs): name
+                for name, dataset in datasets.items()
+            }
+
+            # Report each dataset as soon as it is done.
+            for future in as_completed(futures):
+                try:
+                    fit_result = future.result()
+
+                except BrokenProcessPool:
+                    # A worker process died (e.g., a crash of Julia), the datasets not returned yet are lost,
+                    # but not those already done.
+                    fit_result = {
+                        "name": futures[future],
+                        "func_candidates": None,
+                        "timings": {},
+                        "total time": float("nan"),
+                        "error": traceback.format_exc(),
+                    }
+
+                fit_results[fit_result["name"]] = fit_result
+                print_status(fit_result, len(fit_results), len(datasets))
+
+    # Keep the input order of the datasets.
+    fit_results = [fit_results[name] for name in datasets]
+
+    results = {
+        fit_result["name"]: fit_result["func_candidates"] for fit_result in fit_results if fit_result["error"] is None
+    }
+
+    summary = pd.DataFrame([summary_row(fit_result) for fit_result in fit_results]).set_index("Dataset")
+
+    return results, summary
+
+
+def print_status(fit_result, num_done, num_datasets):
+    status = "done" if fit_result["error"] is None else "failed"
+
+    print(f"    >>> [{num_done}/{num_datasets}] {fit_result['name']} {status} in {fit_result['total time']:.1f} s")
+
+
+def summary_row(fit_result):
+    """
+    One row of the fit_many() summary for the result of fit_dataset().
+    """
+
+    func_candidates = fit_result["func_candidates"]
+
+    row = {
+        "Dataset": fit_result["name"],
+        "Status": "ok" if fit_result["error"] is None else "failed",
+        "Candidates": len(func_candidates) if func_candidates is not None else 0,
+    }
+
+    if func_candidates is not None and len(func_candidates) > 0:
+        gof = "Chi2/NDF" if "Chi2/NDF" in func_candidates.columns else "RMSE"
+
+        if gof == "Chi2/NDF":
+            # Closest to 1.
+            best = func_candidates.iloc[(func_candidates[gof] - 1).abs().argmin()]
+
+        else:
+            best = func_candidates.iloc[func_candidates[gof].argmin()]
+
+        row["Best candidate"] = best["Parameterized equation, unscaled"]
+        row[f"Best {gof}"] = best[gof]
+
+    for stage, t in fit_result["timings"].items():
+        row[f"Time: {stage} [s]"] = round(t, 3)
+
+    row["Time: total [s]"] = round(fit_result["total time"], 3)
+
+    row["Error"] = fit_result["error"].strip().splitlines()[-1] if fit_result["error"] is not None else None
+
+    return row
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Bump when the format of the cached dataframe (parse_pysr_equ output) changes.
+CACHE_VERSION = 1
+
+# PySR settings that do not change the search result.
+IGNORED_PYSR_PARAMS = {
+    "output_directory",
+    "run_id",
+    "temp_equation_file",
+    "tempdir",
+    "delete_tempfiles",
+    "verbosity",
+    "progress",
+}
+
+
+def cache_key(x, y, weights, pysr_params, max_complexity, random_seed):
+    """
+    Content hash identifying a PySR search.
+
+    Arguments
+    ---------
+    x (np.ndarray):
+        Independent variable given to PySR (after rescaling).
+
+    y (np.ndarray):
+        Dependent variable given to PySR (after rescaling).
+
+    weights (np.ndarray):
+        Loss weights given to PySR.
+
+    pysr_params (dict):
+        PySRRegressor.get_params(), settings which do not change the result are ignored.
+
+    max_complexity (int):
+        Maximum complexity of the search.
+
+    random_seed (int):
+        Random seed of the search.
+
+
+    Returns
+    -------
+    key (str):
+        sha256 hex digest.
+    """
+
+    h = hashlib.sha256()
+
+    h.update(f"symbolfit-pysr-cache-v{CACHE_VERSION}".encode())
+
+    for array in (x, y, weights):
+        array = np.ascontiguousarray(np.asarray(array, dtype=np.float64))
+        h.update(repr(array.shape).encode())
+        h.update(array.tobytes())
+
+    # Stable representation of the settings: sorted keys and repr of the values.
+    # Values without a stable repr (e.g., objects showing their address) only cause cache misses.
+    params = {k: v for k, v in pysr_params.items() if k not in IGNORED_PYSR_PARAMS}
+    h.update(repr(sorted((k, repr(v)) for k, v in params.items())).encode())
+
+    h.update(repr((max_complexity, random_seed)).encode())
+
+    return h.hexdigest()
+
+
+def cache_entries(cache_dir):
+    """
+    Paths of all cached entries in cache_dir, least recently used first.
+    """
+
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith(".pkl")]
+
+    return sorted(entries, key=os.path.getmtime)
+
+
+def update_stats(cache_dir, **increments):
+    """
+    Add the increments (hits, misses, evictions) to the counters in cache_dir/stats.json.
+    """
+
+    stats_path = os.path.join(cache_dir, "stats.json")
+
+    try:
+        with open(stats_path) as f:
+            stats = json.load(f)
+
+    except (OSError, ValueError):
+        stats = {}
+
+    for name, increment in increments.items():
+        stats[name] = stats.get(name, 0) + increment
+
+    with open(stats_path, "w") as f:
+        json.dump(stats, f)
+
+
+def cache_load(cache_dir, key):
+    """
+    Load the cached func_candidates dataframe for key, or None if not cached.
+    A hit marks the entry as most recently used.
+    """
+
+    path = os.path.join(cache_dir, f"{key}.pkl")
+
+    try:
+        func_candidates = pd.read_pickle(path)
+        os.utime(path)
+
+    except (OSError, EOFError, ValueError):
+        os.makedirs(cache_dir, exist_ok=True)
+        update_stats(cache_dir, misses=1)
+
+        return None
+
+    update_stats(cache_dir, hits=1)
+
+    return func_candidates
+
+
+def cache_store(cache_dir, key, func_candidates, max_size):
+    """
+    Store the func_candidates dataframe for key, then evict the least recently used
+    entries until the cache takes at most max_size bytes (the new entry is always kept).
+    """
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Write to a temporary file first so that concurrent readers never see a partial entry.
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    os.close(fd)
+
+    func_candidates.to_pickle(tmp_path)
+    os.replace(tmp_path, os.path.join(cache_dir, f"{key}.pkl"))
+
+    evicted = cache_evict(cache_dir, max_size, keep=key)
+
+    if evicted:
+        update_stats(cache_dir, evictions=evicted)
+
+
+def cache_evict(cache_dir, max_size, keep=None):
+    """
+    Remove the least recently used entries until the cache takes at most max_size bytes.
+    Returns the number of entries removed.
+    """
+
+    entries = cache_entries(cache_dir)
+    total_size = sum(os.path.getsize(entry) for entry in entries)
+
+    evicted = 0
+
+    for entry in entries:
+        if max_size is None or total_size <= max_size:
+            break
+
+        if keep is not None and os.path.basename(entry) == f"{keep}.pkl":
+            continue
+
+        size = os.path.getsize(entry)
+        os.remove(entry)
+
+        total_size -= size
+        evicted += 1
+
+    return evicted
+
+
+def cache_stats(cache_dir):
+    """
+    Report of the PySR cache in cache_dir.
+
+
+    Returns
+    -------
+    stats (dict):
+        entries: number of cached searches,
+        size: total size in bytes,
+        hits, misses: number of lookups found/not found in the cache,
+        hit rate: hits / (hits + misses),
+        evictions: number of entries removed to keep the cache under its maximum size.
+    """
+
+    entries = cache_entries(cache_dir)
+
+    try:
+        with open(os.path.join(cache_dir, "stats.json")) as f:
+            counters = json.load(f)
+
+    except (OSError, ValueError):
+        counters = {}
+
+    hits = counters.get("hits", 0)
+    misses = counters.get("misses", 0)
+
+    return {
+        "entries": len(entries),
+        "size": sum(os.path.getsize(entry) for entry in entries),
+        "hits": hits,
+        "misses": misses,
+        "hit rate": hits / (hits + misses) if hits + misses > 0 else 0.0,
+        "evictions": counters.get("evictions", 0),
+    }
@@ -0,0 +1,277 @@
+import csv
+import os
+
+import numpy as np
+
+from .evaluate import (
+    compile_func,
+    linear_bands,
+    parameter_sampler,
+    sampled_bands,
+    sampler_size,
+    streamed_bands,
+    varied_covariance,
+    x_columns,
+)
+from .storage import parse_literal, read_candidates
+
+# Only numpy is needed (no pandas, sympy, lmfit, scipy or PySR), so that analysis jobs
+# can evaluate saved candidates with a fast import, from as many worker processes as needed.
+
+GOF_COLUMNS = ["RMSE", "R2", "NDF", "Chi2", "Chi2/NDF", "p-value"]
+
+
+class Candidate:
+    """
+    A fitted candidate function, for evaluation on new data.
+
+    Parameters
+    ----------
+    equation : str
+        Parameterized equation in the original (unscaled) x, like `'a1*exp(a2*x0)'`.
+    parameters : dict
+        `{'a1': (best-fit, +1 sigma, -1 sigma),...}`, as in the `Parameters: (best-fit, +1, -1)` column.
+    covariance : dict
+        `{'a1, a1': variance, 'a1, a2': covariance,...}`, as in the `Covariance` column.
+    gof : dict | None
+        Goodness-of-fit metrics (`RMSE`, `R2`, `NDF`, `Chi2`, `Chi2/NDF`, `p-value`).
+
+    !!! tip
+        ```python
+        from symbolfit import inference
+
+        candidates = inference.load('output_dir/')
+        y = candidates[0].evaluate(x)
+        bands = candidates[0].bands(x, n_samples=2000, seed=42)
+        ```
+    """
+
+    def __init__(self, equation, parameters, covariance, gof=None):
+        self.equation = equation
+        self.parameters = parameters
+        self.covariance = covariance
+        self.gof = gof if gof is not None else {}
+
+        self.param_names = [f"a{i + 1}" for i in range(len(parameters))]
+        self.params = np.array([parameters[p][0] for p in self.param_names], dtype=float)
+
+    def __repr__(self):
+        return f"Candidate('{self.equation}')"
+
+    def evaluate(self, x):
+        """
+        Function values at the best-fit parameters.
+
+        Parameters
+        ----------
+        x : np.ndarray
+            Independent variable(s), of shape `(n,)` or `(n, dim)`.
+
+        Returns
+        -------
+        y : np.ndarray
+            Function values of shape `(n,)`.
+        """
+
+        x, dim = as_grid(x)
+
+        func, _ = compile_func(self.equation, dim)
+
+        return np.broadcast_to(np.reshape(func(self.params, *x_columns(x, dim)), (-1,)), (x.shape[0],)).copy()
+
+    def bands(
+        self,
+        x,
+        n_samples=2000,
+        seed=None,
+        chunk_size=1024,
+        streaming=False,
+        sample_chunk_size=1000,
+        band_method="mc",
+        sampler="random",
+    ):
+        """
+        Uncertainty bands by sampling the parameters from their best-fit values and covariance matrix.
+
+        Parameters
+        ----------
+        x : np.ndarray
+            Independent variable(s), of shape `(n,)` or `(n, dim)`.
+        n_samples : int
+            Number of parameter samples.
+        seed : int | None
+            Seed of the sampling, for reproducible bands. `None` to use the global numpy random state.
+        chunk_size : int
+            Maximum number of points evaluated at once for all samples,
+            which caps the peak memory at about `n_samples * chunk_size` values.
+        streaming : bool
+            Draw the samples in chunks of `sample_chunk_size` and estimate the percentiles from
+            histograms at each point, so that the memory does not depend on `n_samples`
+            (for `1e5` samples or more on fine grids). The percentiles are then approximate,
+            within a small fraction of the band width (see `evaluate.streamed_bands()`).
+        sample_chunk_size : int
+            Number of samples drawn at once in the streaming mode.
+        band_method : str
+            `'mc'` to sample the parameters, or `'linear'` to propagate the covariance matrix
+            through the gradient of the function (delta method), in a single evaluation.
+            The linearized bands are only accurate if the function is close to linear within
+            the parameter uncertainties (see `SymbolFit.check_linear_bands()`), and their
+            symbolic gradient needs SymPy.
+        sampler : str
+            `'random'` for pseudo-random samples, or `'sobol'`/`'halton'` for scrambled quasi-Monte Carlo
+            points (transformed through the Cholesky factor of the covariance matrix), which give
+            more precise percentiles for the same `n_samples` (see `SymbolFit.band_precision()`)
+            and need SciPy. With `'sobol'`, `n_samples` and `sample_chunk_size` are rounded up to powers of 2.
+
+        Returns
+        -------
+        bands : dict
+            `'central'` (best-fit parameters), `'mean'`, `'-2sigma'`, `'-1sigma'`, `'+1sigma'`, `'+2sigma'`
+            (2.5/16/84/97.5 percentiles of the sampled functions), each of shape `(n,)`.
+            With `band_method='linear'`, `'mean'` is the best-fit function and the percentiles
+            are those of a Gaussian of the propagated standard deviation.
+        """
+
+        x, dim = as_grid(x)
+
+        if band_method == "linear":
+            ((central, *band_values),) = linear_bands(
+                func_str=self.equation,
+                param=self.parameters,
+                cov=self.covariance,
+                x_grids=[x if dim > 1 else x[:, 0]],
+                dim=dim,
+                chunk_size=chunk_size,
+            )
+
+            return dict(
+                zip(["central", "mean", "-2sigma", "-1sigma", "+1sigma", "+2sigma"], [central, central, *band_values])
+            )
+
+        elif band_method != "mc":
+            raise ValueError(f"band_method must be 'mc' or 'linear', got {band_method!r}.")
+
+        func, _ = compile_func(self.equation, dim)
+
+        varied_params, varied_params_values, cov_matrix = varied_covariance(self.parameters, self.covariance)
+
+        # Same sampling and sample counts as evaluate.func_sampling().
+        n_samples = sampler_size(n_samples, sampler)
+        sample_chunk_size = sampler_size(sample_chunk_size, sampler)
+
+        if varied_params:
+            draw = parameter_sampler(varied_params_values, cov_matrix, sampler=sampler, seed=seed)
+
+        def sampled_params(size):
+            params = list(self.params)
+
+            if varied_params:
+                samples = draw(size)
+
+                for k, p in enumerate(varied_params):
+                    params[self.param_names.index(p)] = samples[:, k : k + 1]
+
+            return params
+
+        if streaming:
+            param_chunks = (
+                sampled_params(min(sample_chunk_size, n_samples - start))
+                for start in range(0, n_samples, sample_chunk_size)
+            )
+
+            (band_values,) = streamed_bands(
+                func=func,
+                param_chunks=param_chunks,
+                x_grids=[x if dim > 1 else x[:, 0]],
+                chunk_size=chunk_size,
+                dim=dim,
+            )
+
+        else:
+            band_values = sampled_bands(
+                func=func,
+                params=sampled_params(n_samples),
+                x=x if dim > 1 else x[:, 0],
+                n_samples=n_samples,
+                chunk_size=chunk_size,
+                dim=dim,
+            )
+
+        return dict(
+            zip(["central", "mean", "-2sigma", "-1sigma", "+1sigma", "+2sigma"], [self.evaluate(x), *band_values])
+        )
+
+
+def as_grid(x):
+    """
+    Reshape x to (n, dim) and return it with its dimension.
+    """
+
+    x = np.asarray(x, dtype=float)
+
+    if x.ndim == 1:
+        x = np.reshape(x, (-1, 1))
+
+    return x, x.shape[1]
+
+
+def load(path):
+    """
+    Load the candidates saved by SymbolFit.save_to_npz() or SymbolFit.save_to_csv().
+
+    Parameters
+    ----------
+    path : str
+        Output directory of `save_to_npz()` or `save_to_csv()` (`candidates.npz` is read if found,
+        otherwise `candidates_compact.csv` or `candidates.csv`), or the path of one of these csv files.
+
+    Returns
+    -------
+    candidates : list
+        One `Candidate` per row, in the saved order.
+    """
+
+    path = os.fspath(path)
+
+    if os.path.exists(os.path.join(path, "candidates.npz")):
+        columns, _, _, _ = read_candidates(path)
+
+        return [
+            Candidate(
+                equation=columns["Parameterized equation, unscaled"][i],
+                parameters=columns["Parameters: (best-fit, +1, -1)"][i],
+                covariance=columns["Covariance"][i] if "Covariance" in columns else {},
+                gof={column: float(columns[column][i]) for column in GOF_COLUMNS if column in columns},
+            )
+            for i in range(len(columns["Parameterized equation, unscaled"]))
+        ]
+
+    if os.path.isdir(path):
+        for name in ["candidates_compact.csv", "candidates.csv"]:
+            if os.path.exists(os.path.join(path, name)):
+                path = os.path.join(path, name)
+                break
+
+        else:
+            raise FileNotFoundError(f"No candidates_compact.csv or candidates.csv found in {path}.")
+
+    candidates = []
+
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            gof = {}
+
+            for column in GOF_COLUMNS:
+                if row.get(column) not in (None, ""):
+                    gof[column] = float(row[column])
+
+            candidates.append(
+                Candidate(
+                    equation=row["Parameterized equation, unscaled"],
+                    parameters=parse_literal(row["Parameters: (best-fit, +1, -1)"]),
+                    covariance=parse_literal(row["Covariance"]) if row.get("Covariance") else {},
+                    gof=gof,
+                )
+            )
+
+    return candidates
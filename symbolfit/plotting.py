@@ -5,6 +5,7 @@ import matplotlib.colors as mcolors
 import matplotlib.image as mpimg
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
+import pandas as pd
 import seaborn as sns
 from matplotlib.backends.backend_pdf import PdfPages
 
@@ -474,8 +475,34 @@ Monte Carlo sampling
 """
 
 
+def candidate_band_method(func_candidate, band_method, dim):
+    """
+    The band method used for a candidate: the linearized bands need the gradient
+    in closed form, otherwise the parameters are sampled.
+    """
+
+    if band_method == "linear" and compile_gradient(func_candidate["Parameterized equation, unscaled"], dim) is None:
+        return "mc"
+
+    return band_method
+
+
 def plot_total_unc_coverage_single_func_1D(
-    func_candidate, candidate_idx, x, bin_widths_1d, y, y_up, y_down, n_samples, sampling_95quantile, logy, logx
+    func_candidate,
+    candidate_idx,
+    x,
+    bin_widths_1d,
+    y,
+    y_up,
+    y_down,
+    n_samples,
+    sampling_95quantile,
+    logy,
+    logx,
+    band_method="mc",
+    sampler="random",
+    sampling_rtol=None,
+    max_samples=32768,
 ):
     """
     Plot a particular candidate function with total uncertainty coverage.
@@ -511,6 +538,20 @@ def plot_total_unc_coverage_single_func_1D(
 
     logx (bool):
         Plot x in log scale.
+
+    band_method (str):
+        'mc' for the sampled bands, 'linear' for the linearized bands (see linear_bands()).
+
+    sampler (str):
+        'random', 'sobol' or 'halton' parameter samples (see parameter_sampler()).
+
+    sampling_rtol (float):
+        If not None, choose the number of samples per candidate with adaptive_func_sampling():
+        double it until the percentiles at the data points change by less than sampling_rtol
+        times the half-width of the 68% range (n_samples is then ignored).
+
+    max_samples (int):
+        Hard cap on the number of samples in the adaptive mode.
     """
     fig, axes = plt.subplots(3, 1, sharex=True, figsize=(9, 8), gridspec_kw={"height_ratios": [3, 1, 1]})
     fig.subplots_adjust(hspace=0.1)
@@ -520,7 +561,20 @@ def plot_total_unc_coverage_single_func_1D(
 
     x0 = np.arange(np.min(x), np.max(x), np.abs(np.max(x) - np.min(x)) / 200)
 
-    if n_samples is not None:
+    if n_samples is not None and sampling_rtol is not None and band_method == "mc":
+        (func_bands, func_bands_finer), n_samples = adaptive_func_sampling(
+            func_str=func_candidate["Parameterized equation, unscaled"],
+            param=func_candidate["Parameters: (best-fit, +1, -1)"],
+            cov=func_candidate["Covariance"],
+            x_grids=[x, x0],
+            dim=1,
+            rtol=sampling_rtol,
+            max_samples=max_samples,
+            converge_95=sampling_95quantile,
+            sampler=sampler,
+        )
+
+    elif n_samples is not None:
         func_bands, func_bands_finer = func_sampling_1d(
             func_str=func_candidate["Parameterized equation, unscaled"],
             param=func_candidate["Parameters: (best-fit, +1, -1)"],
@@ -528,24 +582,37 @@ def plot_total_unc_coverage_single_func_1D(
             x=x,
             x_finer=x0,
             n_samples=n_samples,
+            band_method=band_method,
+            sampler=sampler,
         )
 
+        # Sobol samples are rounded up to a power of 2 in func_sampling().
+        if band_method == "mc":
+            n_samples = sampler_size(n_samples, sampler)
+
+    if n_samples is not None:
         (mean_func, lower_2sigma, lower_1sigma, upper_1sigma, upper_2sigma) = func_bands
         (mean_func_finer, lower_2sigma_finer, lower_1sigma_finer, upper_1sigma_finer, upper_2sigma_finer) = (
             func_bands_finer
         )
 
-        axes[0].plot(x0, mean_func_finer, label="Sample mean", color="red")
+        if band_method == "linear":
+            mean_label, range_label = "Best-fit", "range (linearized)"
+
+        else:
+            mean_label, range_label = "Sample mean", "quantile range"
+
+        axes[0].plot(x0, mean_func_finer, label=mean_label, color="red")
 
         axes[0].fill_between(
-            x0, lower_1sigma_finer, upper_1sigma_finer, color="limegreen", alpha=0.5, label="68% quantile range"
+            x0, lower_1sigma_finer, upper_1sigma_finer, color="limegreen", alpha=0.5, label=f"68% {range_label}"
         )
 
         if sampling_95quantile:
             axes[0].fill_between(x0, lower_2sigma_finer, lower_1sigma_finer, color="gold", alpha=0.5)
 
             axes[0].fill_between(
-                x0, upper_1sigma_finer, upper_2sigma_finer, color="gold", alpha=0.5, label="95% quantile range"
+                x0, upper_1sigma_finer, upper_2sigma_finer, color="gold", alpha=0.5, label=f"95% {range_label}"
             )
 
     else:
@@ -628,9 +695,16 @@ def plot_total_unc_coverage_single_func_1D(
     axes[0].set_title(title, loc="left", size=9.5)
 
     # Show the candidate # being plotted and some of the gof metrics.
-    if n_samples is not None:
+    if n_samples is not None and band_method == "linear":
         axes[0].set_title(
-            rf"$\bfit{{Candidate\,\#{candidate_idx}}}$" + "\nEnsemble of functions generated by sampling parameters",
+            rf"$\bfit{{Candidate\,\#{candidate_idx}}}$" + "\nLinear error propagation of the parameter covariance",
+            loc="right",
+            size=9.5,
+        )
+    elif n_samples is not None:
+        axes[0].set_title(
+            rf"$\bfit{{Candidate\,\#{candidate_idx}}}$"
+            + f"\nEnsemble of {n_samples} functions generated by sampling parameters",
             loc="right",
             size=9.5,
         )
@@ -865,9 +939,26 @@ def plot_total_unc_coverage_single_func_1D(
 
     plt.tight_layout()
 
+    # Number of samples used (0 if not sampled).
+    return n_samples if n_samples is not None and band_method == "mc" else 0
+
 
 def plot_total_unc_coverage_all_func_1D(
-    func_candidates, x, bin_widths_1d, y, y_up, y_down, n_samples, sampling_95quantile, pdf_path, logy, logx
+    func_candidates,
+    x,
+    bin_widths_1d,
+    y,
+    y_up,
+    y_down,
+    n_samples,
+    sampling_95quantile,
+    pdf_path,
+    logy,
+    logx,
+    band_method="mc",
+    sampler="random",
+    sampling_rtol=None,
+    max_samples=32768,
 ):
     """
     Plot all candidate functions with total uncertainty coverage.
@@ -904,12 +995,33 @@ def plot_total_unc_coverage_all_func_1D(
     logx (bool):
         Plot x in log scale.
 
+    band_method (str):
+        'mc' for the sampled bands, 'linear' for the linearized bands (see linear_bands()),
+        the candidates that cannot be differentiated in closed form are sampled.
+
+    sampler (str):
+        'random', 'sobol' or 'halton' parameter samples (see parameter_sampler()).
+
+    sampling_rtol (float):
+        If not None, choose the number of samples per candidate with adaptive_func_sampling():
+        double it until the percentiles at the data points change by less than sampling_rtol
+        times the half-width of the 68% range (n_samples is then ignored).
+
+    max_samples (int):
+        Hard cap on the number of samples in the adaptive mode.
+
 
     Returns
     -------
     Plot all candidate functions with total unc coverage and write to an output file.
+
+    samples_used (list):
+        Number of samples used for each candidate (0 if not sampled), in the order of func_candidates.
     """
 
+    # Number of samples used for each candidate.
+    samples_used = [0] * len(func_candidates)
+
     with PdfPages(pdf_path) as pdf:
         for i in range(len(func_candidates)):
             # Print candidate # page.
@@ -948,7 +1060,7 @@ def plot_total_unc_coverage_all_func_1D(
 
                 if has_uncert:
                     try:
-                        plot_total_unc_coverage_single_func_1D(
+                        samples_used[len(func_candidates) - 1 - i] = plot_total_unc_coverage_single_func_1D(
                             func_candidate=func_candidate,
                             candidate_idx=len(func_candidates) - 1 - i,
                             x=x,
@@ -960,9 +1072,17 @@ def plot_total_unc_coverage_all_func_1D(
                             sampling_95quantile=sampling_95quantile,
                             logy=logy,
                             logx=logx,
+                            band_method=candidate_band_method(func_candidate, band_method, dim=1),
+                            sampler=sampler,
+                            sampling_rtol=sampling_rtol,
+                            max_samples=max_samples,
                         )
 
-                    except Exception:
+                    except np.linalg.LinAlgError:
+                        # No bands if the covariance matrix cannot be sampled.
+                        samples_used[len(func_candidates) - 1 - i] = 0
+
+                        plt.close()
                         plot_total_unc_coverage_single_func_1D(
                             func_candidate=func_candidate,
                             candidate_idx=len(func_candidates) - 1 - i,
@@ -1016,6 +1136,8 @@ def plot_total_unc_coverage_all_func_1D(
                 plt.savefig(pdf, format="pdf")
                 plt.close()
 
+    return samples_used
+
 
 """
 2D candidate plots
@@ -1597,6 +1719,479 @@ def plot_all_syst_all_func_2D(
                 plt.close()
 
 
+def plot_total_unc_coverage_single_func_2D(
+    func_candidate,
+    candidate_idx,
+    x,
+    bin_edges_2d,
+    y,
+    y_up,
+    y_down,
+    n_samples,
+    sampling_95quantile,
+    logx0,
+    logx1,
+    logy,
+    cbar_min,
+    cbar_max,
+    cmap,
+    band_method="mc",
+    sampler="random",
+    sampling_rtol=None,
+    max_samples=32768,
+):
+    """
+    Plot a particular 2D candidate function with total uncertainty coverage.
+    The coverage is computed from an ensemble of functions where the parameters
+    are sampled from the multivariate normal distribution according to the
+    best-fit parameter values and the covariance matrix,
+    evaluated on a 200x200 grid (in chunks, see func_sampling()).
+
+    Panels: sample mean (finer binning), relative 68% (or 95%) quantile range (finer binning),
+    (Data - Mean) / Data unc. in the original bins, and the fraction of the data bins
+    inside the 68%/95% quantile ranges.
+
+    Arguments
+    ---------
+    func_candidate (pd.dataframe):
+        A particular candidate function (one row of the full func_candidates).
+
+    candidate_idx (np.int):
+        Candidate function # (ranked by function complexity).
+
+    x (np.ndarray):
+        The independent variable.
+
+    y (np.ndarray):
+        The dependent variable.
+
+    y_up (np.ndarray):
+        +1 sigma of y.
+
+    y_down (np.ndarray):
+        -1 sigma of y.
+
+    n_samples (int):
+        Number of samples to be drawn from the multivariate normal distribution,
+        None to plot the best-fit function without sampling.
+
+    sampling_95quantile (bool):
+        Show the 95% quantile range instead of the 68% one.
+
+    band_method (str):
+        'mc' for the sampled bands, 'linear' for the linearized bands (see linear_bands()).
+
+    sampler (str):
+        'random', 'sobol' or 'halton' parameter samples (see parameter_sampler()).
+
+    sampling_rtol (float):
+        If not None, choose the number of samples per candidate with adaptive_func_sampling():
+        double it until the percentiles at the data points change by less than sampling_rtol
+        times the half-width of the 68% range (n_samples is then ignored).
+
+    max_samples (int):
+        Hard cap on the number of samples in the adaptive mode.
+
+    Other arguments are the same as in plot_single_syst_single_func_2D().
+    """
+
+    fig, axes = plt.subplots(
+        2, 2, sharex=True, sharey=True, figsize=(9, 7), gridspec_kw={"width_ratios": [1, 1], "height_ratios": [1, 1]}
+    )
+    cbar_fontsize = 14
+    label_fontsize = 12
+
+    x0_bins = np.reshape(np.array(bin_edges_2d[0]), (-1))
+    x1_bins = np.reshape(np.array(bin_edges_2d[1]), (-1))
+
+    if cbar_min is None:
+        cbar_min = min(y)
+    if cbar_max is None:
+        cbar_max = max(y)
+
+    if cmap is None:
+        cmap = "Greens"
+
+    cmap = plt.get_cmap(cmap).copy()
+    cmap.set_bad(color="white")
+
+    # Finer grid as in plot_single_syst_single_func_2D().
+    x0_nbins = 200
+    x1_nbins = 200
+
+    x0_smooth, x1_smooth = np.meshgrid(
+        np.linspace(min(x0_bins), max(x0_bins), x0_nbins), np.linspace(min(x1_bins), max(x1_bins), x1_nbins)
+    )
+
+    x_smooth = np.column_stack((x0_smooth.flatten(), x1_smooth.flatten()))
+
+    if n_samples is not None and sampling_rtol is not None and band_method == "mc":
+        (func_bands, func_bands_smooth), n_samples = adaptive_func_sampling(
+            func_str=func_candidate["Parameterized equation, unscaled"],
+            param=func_candidate["Parameters: (best-fit, +1, -1)"],
+            cov=func_candidate["Covariance"],
+            x_grids=[x, x_smooth],
+            dim=2,
+            rtol=sampling_rtol,
+            max_samples=max_samples,
+            converge_95=sampling_95quantile,
+            sampler=sampler,
+        )
+
+    elif n_samples is not None:
+        func_bands, func_bands_smooth = func_sampling(
+            func_str=func_candidate["Parameterized equation, unscaled"],
+            param=func_candidate["Parameters: (best-fit, +1, -1)"],
+            cov=func_candidate["Covariance"],
+            x_grids=[x, x_smooth],
+            dim=2,
+            n_samples=n_samples,
+            band_method=band_method,
+            sampler=sampler,
+        )
+
+        # Sobol samples are rounded up to a power of 2 in func_sampling().
+        if band_method == "mc":
+            n_samples = sampler_size(n_samples, sampler)
+
+    if n_samples is not None:
+        mean_func, lower_2sigma, lower_1sigma, upper_1sigma, upper_2sigma = func_bands
+        mean_smooth, lower_2sigma_smooth, lower_1sigma_smooth, upper_1sigma_smooth, upper_2sigma_smooth = (
+            func_bands_smooth
+        )
+
+    else:
+        mean_func = func_evaluate(func_candidate=func_candidate, x=x, dim=2)[:, 0]
+        mean_smooth = func_evaluate(func_candidate=func_candidate, x=x_smooth, dim=2)[:, 0]
+
+        lower_2sigma = lower_1sigma = upper_1sigma = upper_2sigma = mean_func
+        lower_2sigma_smooth = lower_1sigma_smooth = upper_1sigma_smooth = upper_2sigma_smooth = mean_smooth
+
+    range_label = "range (linearized)" if band_method == "linear" else "quantile range"
+
+    if sampling_95quantile:
+        quantile_label = "95%"
+        range_smooth = upper_2sigma_smooth - lower_2sigma_smooth
+
+    else:
+        quantile_label = "68%"
+        range_smooth = upper_1sigma_smooth - lower_1sigma_smooth
+
+    # Sample mean (finer binning).
+    norm = mcolors.LogNorm(vmin=cbar_min, vmax=cbar_max) if logy else mcolors.Normalize(vmin=cbar_min, vmax=cbar_max)
+
+    fig_mean = axes[0, 0].hist2d(
+        x_smooth[:, 0],
+        x_smooth[:, 1],
+        bins=(x0_nbins, x1_nbins),
+        weights=mean_smooth,
+        cmap=cmap,
+        edgecolor="none",
+        rasterized=True,
+        norm=norm,
+    )
+
+    label = "Sample mean" if n_samples is not None and band_method == "mc" else "Best-fit"
+    cbar_mean = plt.colorbar(fig_mean[3], ax=axes[0, 0], pad=0, label=label)
+    cbar_mean.ax.yaxis.label.set_size(cbar_fontsize)
+
+    if logy:
+        cbar_mean.set_ticks(ticker.LogLocator())
+        cbar_mean.update_ticks()
+
+    # Relative quantile range (finer binning).
+    relative_range = np.divide(
+        range_smooth, np.abs(mean_smooth), out=np.zeros_like(range_smooth), where=mean_smooth != 0
+    )
+
+    fig_range = axes[0, 1].hist2d(
+        x_smooth[:, 0],
+        x_smooth[:, 1],
+        bins=(x0_nbins, x1_nbins),
+        weights=relative_range,
+        cmap="Oranges",
+        edgecolor="none",
+        rasterized=True,
+    )
+
+    cbar_range = plt.colorbar(
+        fig_range[3],
+        ax=axes[0, 1],
+        pad=0,
+        label=f"$\\frac{{\\text{{{quantile_label} {range_label}}}}}{{\\text{{{label}}}}}$",
+    )
+    cbar_range.ax.yaxis.label.set_size(cbar_fontsize)
+
+    # (Data - Mean) / Data unc. in the original bins.
+    y = np.reshape(y, (-1,))
+    residual = y - mean_func
+
+    if y_up is not None and y_down is not None:
+        y_up = np.reshape(y_up, (-1,))
+        y_down = np.reshape(y_down, (-1,))
+
+        y_unc = np.where(residual < 0, np.where(y_up != 0, y_up, y_down), np.where(y_down != 0, y_down, y_up))
+        residual = residual / y_unc
+
+        residual_label = "$\\frac{\\text{Data}-\\text{Mean}}{\\text{Data unc.}}$"
+
+    else:
+        residual_label = "$\\text{Data}-\\text{Mean}$"
+
+    fig_residual = axes[1, 0].hist2d(
+        x[:, 0],
+        x[:, 1],
+        bins=[x0_bins, x1_bins],
+        weights=residual,
+        cmap="bwr",
+        vmin=-max(np.abs(residual)),
+        vmax=max(np.abs(residual)),
+        edgecolor="none",
+        rasterized=True,
+    )
+
+    cbar_residual = plt.colorbar(fig_residual[3], ax=axes[1, 0], pad=0, label=residual_label)
+    cbar_residual.ax.yaxis.label.set_size(cbar_fontsize)
+
+    # Coverage: data bins inside the 68% (1) or 95% (0.5) quantile ranges, outside (0).
+    coverage = np.where(
+        (y >= lower_1sigma) & (y <= upper_1sigma), 1.0, np.where((y >= lower_2sigma) & (y <= upper_2sigma), 0.5, 0.0)
+    )
+
+    fig_coverage = axes[1, 1].hist2d(
+        x[:, 0],
+        x[:, 1],
+        bins=[x0_bins, x1_bins],
+        weights=coverage,
+        cmap="Blues",
+        vmin=0,
+        vmax=1,
+        edgecolor="none",
+        rasterized=True,
+    )
+
+    cbar_coverage = plt.colorbar(fig_coverage[3], ax=axes[1, 1], pad=0, ticks=[0, 0.5, 1])
+    cbar_coverage.ax.set_yticklabels(["out", "95%", "68%"])
+    cbar_coverage.set_label("Data coverage", size=cbar_fontsize)
+
+    axes[1, 1].set_title(f"In 68%: {np.mean(coverage == 1):.0%}, in 95%: {np.mean(coverage >= 0.5):.0%}", size=9.5)
+
+    for ax in axes.flatten():
+        ax.set_xlabel("x0", fontsize=label_fontsize)
+        ax.set_ylabel("x1", fontsize=label_fontsize)
+
+        if logx0:
+            ax.set_xscale("log")
+        if logx1:
+            ax.set_yscale("log")
+
+    # Define a string containing all the parameters in the function with each one in the form of
+    # best-fit^{+1 sigma}_{-1 sigma}, with relative % error next to the +/-1 sigma values.
+    parameters_string = ""
+    parameters = func_candidate["Parameters: (best-fit, +1, -1)"]
+
+    for i in range(len(parameters)):
+        # If the parameter is held fixed in the fit, it does not have +/-1 sigma values.
+        if parameters[f"a{i + 1}"][1] == 0:
+            parameters_string += r"${} = {}$".format(
+                f"a{i + 1}",
+                round_a_number(parameters[f"a{i + 1}"][0], 6),
+            )
+
+        else:
+            parameters_string += r"$\text{{{}}} = {}^{{+ {} ({}\%) }}_{{- {} ({}\%)}}$".format(
+                f"a{i + 1}",
+                round_a_number(parameters[f"a{i + 1}"][0], 6),
+                round_a_number(parameters[f"a{i + 1}"][1], 4),
+                round_a_number(100 * np.abs(float(parameters[f"a{i + 1}"][1]) / float(parameters[f"a{i + 1}"][0])), 3),
+                round_a_number(np.abs(parameters[f"a{i + 1}"][2]), 4),
+                round_a_number(100 * np.abs(float(parameters[f"a{i + 1}"][2]) / float(parameters[f"a{i + 1}"][0])), 3),
+            )
+
+        if i < len(parameters) - 1:
+            parameters_string += ",  "
+
+        if np.mod(i + 1, 2) == 0:
+            parameters_string += "\n"
+
+    # Print parameter string defined above as title.
+    title = textwrap.fill(func_candidate["Parameterized equation, unscaled"], width=95) + "\n\n" + parameters_string
+    axes[0, 0].set_title(title, loc="left", size=9.5)
+
+    if n_samples is not None and band_method == "linear":
+        axes[0, 1].set_title(
+            rf"$\bfit{{Candidate\,\#{candidate_idx}}}$" + "\nLinear error propagation of the parameter covariance",
+            loc="right",
+            size=9.5,
+        )
+    elif n_samples is not None:
+        axes[0, 1].set_title(
+            rf"$\bfit{{Candidate\,\#{candidate_idx}}}$"
+            + f"\nEnsemble of {n_samples} functions generated by sampling parameters",
+            loc="right",
+            size=9.5,
+        )
+    else:
+        axes[0, 1].set_title(rf"$\bfit{{Candidate\,\#{candidate_idx}}}$" + "\n", loc="right", size=9.5)
+
+    # Add logo to every plot.
+    logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "img/logo.png")
+    logo_img = mpimg.imread(logo_path)
+
+    bbox = axes[0, 0].get_position()
+
+    logo_width = 0.13
+    logo_height = logo_width * (logo_img.shape[0] / logo_img.shape[1])
+
+    ax_inset = fig.add_axes([bbox.x0 + 0.73, bbox.y1 + 0.085, logo_width, logo_height])
+
+    ax_inset.imshow(logo_img)
+    ax_inset.axis("off")
+
+    plt.tight_layout()
+
+    # Number of samples used (0 if not sampled).
+    return n_samples if n_samples is not None and band_method == "mc" else 0
+
+
+def plot_total_unc_coverage_all_func_2D(
+    func_candidates,
+    x,
+    bin_edges_2d,
+    y,
+    y_up,
+    y_down,
+    n_samples,
+    sampling_95quantile,
+    pdf_path,
+    logx0,
+    logx1,
+    logy,
+    cbar_min,
+    cbar_max,
+    cmap,
+    band_method="mc",
+    sampler="random",
+    sampling_rtol=None,
+    max_samples=32768,
+):
+    """
+    Plot all 2D candidate functions with total uncertainty coverage,
+    see plot_total_unc_coverage_single_func_2D().
+
+    Arguments
+    ---------
+    func_candidates (pd.dataframe):
+        Full dataframe containing all candidate functions after fits.
+
+    n_samples (int):
+        Number of samples to be drawn from the multivariate normal distribution.
+
+    pdf_path (str):
+        Save the output files to this directory.
+
+    band_method (str):
+        'mc' for the sampled bands, 'linear' for the linearized bands (see linear_bands()),
+        the candidates that cannot be differentiated in closed form are sampled.
+
+    sampler (str):
+        'random', 'sobol' or 'halton' parameter samples (see parameter_sampler()).
+
+    sampling_rtol (float):
+        If not None, choose the number of samples per candidate with adaptive_func_sampling():
+        double it until the percentiles at the data points change by less than sampling_rtol
+        times the half-width of the 68% range (n_samples is then ignored).
+
+    max_samples (int):
+        Hard cap on the number of samples in the adaptive mode.
+
+    Other arguments are the same as in plot_all_syst_all_func_2D().
+
+
+    Returns
+    -------
+    samples_used (list):
+        Number of samples used for each candidate (0 if not sampled), in the order of func_candidates.
+    """
+
+    # Number of samples used for each candidate.
+    samples_used = [0] * len(func_candidates)
+
+    with PdfPages(pdf_path) as pdf:
+        for i in range(len(func_candidates)):
+            # Print candidate # page.
+            fig, axes = plt.subplots(figsize=(9, 7))
+            axes.axis("off")
+            plt.text(
+                0.5, 0.5, f"Candidate function #{len(func_candidates) - 1 - i}", fontsize=20, ha="center", va="center"
+            )
+
+            plt.tight_layout()
+
+            plt.savefig(pdf, format="pdf")
+
+            plt.close()
+
+            if i < len(func_candidates) - 1:
+                print(
+                    f"Plotting candidate functions (sampling parameters) {i + 1}/{len(func_candidates)} >>> {pdf_path}",
+                    end="\r",
+                )
+
+            else:
+                print(
+                    f"Plotting candidate functions (sampling parameters) {i + 1}/{len(func_candidates)} >>> {pdf_path}"
+                )
+
+            func_candidate = func_candidates.iloc[len(func_candidates) - 1 - i]
+
+            # Sample only if any parameter has variations.
+            has_uncert = any(values[1] > 0 for values in func_candidate["Parameters: (best-fit, +1, -1)"].values())
+
+            kwargs = dict(
+                func_candidate=func_candidate,
+                candidate_idx=len(func_candidates) - 1 - i,
+                x=x,
+                bin_edges_2d=bin_edges_2d,
+                y=y,
+                y_up=y_up,
+                y_down=y_down,
+                logx0=logx0,
+                logx1=logx1,
+                logy=logy,
+                cbar_min=cbar_min,
+                cbar_max=cbar_max,
+                cmap=cmap,
+            )
+
+            if has_uncert:
+                try:
+                    samples_used[len(func_candidates) - 1 - i] = plot_total_unc_coverage_single_func_2D(
+                        n_samples=n_samples,
+                        sampling_95quantile=sampling_95quantile,
+                        band_method=candidate_band_method(func_candidate, band_method, dim=2),
+                        sampler=sampler,
+                        sampling_rtol=sampling_rtol,
+                        max_samples=max_samples,
+                        **kwargs,
+                    )
+
+                except np.linalg.LinAlgError:
+                    # No bands if the covariance matrix cannot be sampled.
+                    samples_used[len(func_candidates) - 1 - i] = 0
+
+                    plt.close()
+                    plot_total_unc_coverage_single_func_2D(n_samples=None, sampling_95quantile=False, **kwargs)
+
+            else:
+                plot_total_unc_coverage_single_func_2D(n_samples=None, sampling_95quantile=False, **kwargs)
+
+            plt.savefig(pdf, format="pdf")
+            plt.close()
+
+    return samples_used
+
+
 def plot_correlation(func_candidate, candidate_idx, y_up, y_down):
     """
     Plot correlation matrix for the fitted parameters of a candidate function.
@@ -0,0 +1,1083 @@
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import combinations
+
+from .evaluate import *
+from .utils import *
+
+
+def parameterize_func_single(func_str, dim):
+    """
+    Parameterizing a function like: '1.2*x0 + exp(3.4*x0)' -> 'a1*x0 + exp(a2*x0)'.
+    Set the constants as initial conditions for the parameters in the second fits:
+        e.g., {'a1': 1.2, 'a2': 3.4}.
+
+    Arguments
+    ---------
+    func_str (str):
+        Function in str like '1.2*x0 + exp(3.4*x0)'.
+
+
+    Returns
+    -------
+    function (str):
+        E.g., '1.2*x0 + exp(3.4*x0)' same as input
+
+    parameterized function (str):
+        E.g., 'a1*x0 + exp(a2*x0)'
+
+    parameterization (dict):
+        E.g., {'a1': 1.2, 'a2': 3.4}
+    """
+    import sympy
+
+    # Define the independent variable (x0, x1, x2,...),
+    # parse the input function str into a SymPy equation.
+    for i in range(dim):
+        func = sympy.sympify(func_str, locals={f"x{i}": sympy.symbols(f"x{i}")})
+
+    # Loop over all constants in the function using SymPy's tree traversal method.
+    # If there are 3 constants (1.2, 3.4, 5.6), then create {1.2: 'a1', 3.4: 'a2', 5.6: 'a3'} for them.
+    parameterization = {}
+    variable_counter = 0
+
+    for a in sympy.preorder_traversal(func):
+        # Replace non-integer constants only,
+        # as sometimes constants like 1 are trivial.
+        if isinstance(a, sympy.Number) and not a.is_Integer:
+            variable_counter += 1
+            parameterization[a] = sympy.Symbol(f"a{variable_counter}")
+
+    # In case there are constants belonging to more than one subtree,
+    # the earlier variable_counter will be overriden,
+    # creating {1.2: 'a1', 3.4: 'a3', 5.6: 'a4'} instead of {1.2: 'a1', 3.4: 'a2', 5.6: 'a3'}.
+    # We don't want that since it will cause problem in later processing.
+    # Here, we rename the variables with ascending subscripts {'a1', 'a2', 'a3',...}.
+    def rename_ascending_variables(param_dict):
+        # parameterization was created with float keys and sympy symbols as values.
+        # First sort the items by the constants (keys).
+        sorted_items = sorted(param_dict.items(), key=lambda x: x[0])
+
+        # Loop over the sorted items, rename the variables,
+        # and store to a new dictionary.
+        param_dict_renamed = {}
+        for i, (key, value) in enumerate(sorted_items, start=1):
+            renamed_variable = f"a{i}"
+
+            if value.name != renamed_variable:
+                value = sympy.symbols(renamed_variable)
+
+            param_dict_renamed[key] = value
+
+        return param_dict_renamed
+
+    parameterization = rename_ascending_variables(parameterization)
+
+    # Replace constants by their corresponding parameters in the function.
+    func_parameterized = func.subs(parameterization)
+
+    return (
+        str(func),
+        str(func_parameterized),
+        {str(value): float(key) for key, value in parameterization.items()},
+    )
+
+
+def parameterize_func_all(func_candidates, dim):
+    """
+    Parameterize all candidate functions at once.
+
+    Arguments
+    ---------
+    func_candidates (pd.dataframe):
+        Contains all PySR functions to be parameterized.
+
+
+    Returns
+    -------
+    func_candidates (pd.dataframe):
+        Add new columns for the parameterized functions
+        and the parameterization that stores the initial values.
+    """
+
+    # Loop over all candidate functions, parameterize them,
+    # and store as new columns.
+    func_param_all = []
+    param_all = []
+
+    for i in range(len(func_candidates)):
+        _, func_param, param = parameterize_func_single(func_str=func_candidates["PySR equation"][i], dim=dim)
+
+        func_param_all.append(func_param)
+        param_all.append(param)
+
+    func_candidates["Parameterized equation"] = func_param_all
+
+    func_candidates["Parameterization"] = param_all
+
+    try:
+        func_candidates = func_candidates[
+            ["PySR template spec", "PySR equation", "Parameterized equation", "Parameterization", "Complexity"]
+        ]
+    except Exception:
+        func_candidates = func_candidates[["PySR equation", "Parameterized equation", "Parameterization", "Complexity"]]
+
+    return func_candidates
+
+
+def get_rel_err(param):
+    """
+    Get relative error of a fitted parameter from the LMFIT result.
+
+    Arguments
+    ---------
+    param (LMFIT.Param):
+        Parameter instance of LMFIT after fit.
+
+
+    Returns
+    -------
+    value (np.float):
+        Best-fit.
+
+    std_err (np.float):
+        Standard error.
+
+    ratio (np.float):
+        (standard error / best-fit value) * 100, in absolute value.
+    """
+
+    # Get numbers of a fitted parameter from the LMFIT result
+    numbers = re.findall(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", str(param))
+    numbers = np.array(numbers, dtype=float)
+
+    value = None
+    std_err = None
+    ratio = 99999
+
+    # If the fit succeeds, LMFIT parameter returns something like
+    # "... a1 ... [best-fit] ... [standard error]...", 3 numbers in total,
+    # we need the last two to calculate the relative error.
+    # Otherwise the parameter has been held fixed or sent to inf,
+    # which we assign 99999 for the relative error and ignore it for later.
+    if len(numbers) == 3:
+        value, std_err = numbers[1], numbers[2]
+        ratio = std_err / np.abs(value) * 100
+
+    return value, std_err, ratio
+
+
+def get_covariance_correlation(fit_result):
+    """
+    Get correlation of all fitted parameters from the LMFIT result.
+
+    Arguments
+    ---------
+    fit_result:
+        Fit result from LMFIT.
+
+
+    Returns
+    -------
+    correlation (dict):
+        Correlation matrix of fitted parameters {'a1, a2': 0.1, ...}.
+    """
+
+    # Get the number of fitted parameters that were not held fixed.
+    num_param = len(fit_result.params)
+    param_varied = []
+
+    for i in range(num_param):
+        if "fixed" not in str(fit_result.params[f"a{i + 1}"]):
+            param_varied.append(f"a{i + 1}")
+
+    num_param_varied = len(param_varied)
+
+    # Store diagonal and upper or lower triangular elements.
+    covariance = {}
+
+    # Calculate correlation as covariance(x, y) / (stderr_x * stderr_y).
+    correlation = {}
+
+    # Correlation only when at least one pair of parameters exist.
+    if num_param_varied > 1:
+        # All possible pairs.
+        for i in range(num_param_varied - 1):
+            for j in range(i + 1, num_param_varied):
+                # Get a pair of parameters.
+                pair = f"{param_varied[i]}, {param_varied[j]}"
+
+                # Get standard errors from covariance matrix.
+                _, error_i, _ = get_rel_err(param=fit_result.params[param_varied[i]])
+                _, error_j, _ = get_rel_err(param=fit_result.params[param_varied[j]])
+
+                # Compute the correlation value.
+                corr = round_a_number(number=fit_result.covar[i][j] / (error_i * error_j), sig_fig=4)
+
+                # Numerical rounding causing correlation slightly > 1 or < 1.
+                if corr > 1:
+                    corr = 1
+
+                elif corr < -1:
+                    corr = -1
+
+                correlation[pair] = corr
+
+                # Off diagonal elements of the covariance matrix.
+                covariance[pair] = fit_result.covar[i][j]
+
+        # Diagonal elements of the covariance matrix.
+        for i in range(num_param_varied):
+            pair = f"{param_varied[i]}, {param_varied[i]}"
+            covariance[pair] = fit_result.covar[i][i]
+
+    return covariance, correlation
+
+
+def compile_residual(func_str, x, y, y_up, y_down, loss_weights, dim):
+    """
+    Build the ROF residual of a parameterized function as a pure numpy callable,
+    with the data, loss weights and up/down uncertainties bound ahead of time.
+
+    Arguments
+    ---------
+    func_str (str):
+        Parameterized function like 'a1*x0 + exp(a2*x0)'.
+
+    x (np.ndarray):
+        Independent variable of data after processing.
+
+    y (np.ndarray):
+        Dependent variable of data after processing.
+
+    y_up (np.ndarray):
+        +1 sigma for y.
+
+    y_down (np.ndarray):
+        -1 sigma for y.
+
+    loss_weights (np.ndarray):
+        Per-bin weights of the loss, overriding y_up/y_down if provided.
+
+    dim (int):
+        Dimension of the input data.
+
+
+    Returns
+    -------
+    residual (callable):
+        residual(params) -> weighted residual, with params ordered as (a1, a2,...).
+    """
+
+    func, _ = compile_func(func_str, dim)
+    xs = x_columns(x, dim)
+
+    # Scale residual by +/-1 sigma in the fit if they exist.
+    # If the residual is +ve in a bin, scale by +1 sigma,
+    # otherwise scale by -1 sigma.
+    # Also replace with one another if either is zero in a bin.
+    if loss_weights is not None:
+        sqrt_weights = np.sqrt(np.reshape(np.array(loss_weights), (-1, 1)))
+
+        def residual(params):
+            return (func(params, *xs) - y) * sqrt_weights
+
+    elif y_up is not None and y_down is not None:
+        y_unc_pos = np.where(y_up != 0, y_up, y_down)
+        y_unc_neg = np.where(y_down != 0, y_down, y_up)
+
+        def residual(params):
+            residual = func(params, *xs) - y
+
+            return residual / np.where(residual > 0, y_unc_pos, y_unc_neg)
+
+    else:
+
+        def residual(params):
+            return func(params, *xs) - y
+
+    return residual
+
+
+def compile_jacobian(func_str, x, y, y_up, y_down, loss_weights, dim):
+    """
+    Build the Jacobian of the ROF residual from compile_residual() using the
+    symbolic derivatives of the parameterized function.
+
+    Arguments are the same as in compile_residual().
+
+
+    Returns
+    -------
+    jacobian (callable):
+        jacobian(params, vary) -> d(residual)/d(params) of shape (num_examples, num_varied),
+        with the columns for the parameters flagged in vary.
+        None if the function cannot be differentiated in closed form.
+    """
+
+    gradient = compile_gradient(func_str, dim)
+
+    if gradient is None:
+        return None
+
+    func, _ = compile_func(func_str, dim)
+    xs = x_columns(x, dim)
+    n = np.shape(y)[0]
+
+    # The residual is (f - y) * w, where the weight w is either fixed (loss_weights)
+    # or picked from y_up/y_down by the sign of the residual, so d(residual)/da = df/da * w.
+    if loss_weights is not None:
+        sqrt_weights = np.reshape(np.sqrt(np.reshape(np.array(loss_weights), (-1, 1))), -1)
+
+        def weights(params):
+            return sqrt_weights
+
+    elif y_up is not None and y_down is not None:
+        y_unc_pos = np.reshape(np.where(y_up != 0, y_up, y_down), -1)
+        y_unc_neg = np.reshape(np.where(y_down != 0, y_down, y_up), -1)
+
+        def weights(params):
+            residual = np.reshape(np.broadcast_to(func(params, *xs) - y, (n, 1)), -1)
+
+            return 1 / np.where(residual > 0, y_unc_pos, y_unc_neg)
+
+    else:
+
+        def weights(params):
+            return np.ones(n)
+
+    def jacobian(params, vary):
+        w = weights(params)
+
+        columns = [np.reshape(np.broadcast_to(d, (n, 1)), -1) * w for d, v in zip(gradient(params, *xs), vary) if v]
+
+        return np.stack(columns, axis=1)
+
+    return jacobian
+
+
+def vary_combinations(num_params):
+    """
+    Create a list that contains all possible combinations of varying/fixing parameters in a fit.
+    If there are two parameters in a function, then it will generate:
+    [[True, True], [True, False], [False, True], [False, False]].
+    """
+
+    # Start from a list with all True's.
+    vary_combo = [[True] * num_params]
+
+    # Create new combinations by turning some into False's.
+    for r in range(1, num_params + 1):
+        for combo in combinations(range(num_params), r):
+            temp_list = vary_combo[0].copy()
+
+            for index in combo:
+                temp_list[index] = False
+
+            vary_combo.append(temp_list)
+
+    return vary_combo
+
+
+def exhaustive_freezing(num_params):
+    """
+    Freezing strategy trying all 2^N combinations of varying/fixing parameters,
+    from all parameters varied to all fixed.
+
+    A freezing strategy is a generator function of the number of parameters.
+    It yields which parameters to vary in the next fit (list of bools),
+    and receives the relative errors (%) of the previous fit via send(),
+    as a list with None for the fixed parameters, or None if that fit failed.
+    """
+
+    # Not 'yield from', which would forward the values from send() to the list iterator.
+    for vary in vary_combinations(num_params):  # noqa: UP028
+        yield vary
+
+
+def greedy_freezing(num_params):
+    """
+    Freezing strategy by backward elimination: start with all parameters varied,
+    and after each unsuccessful fit, fix the parameter with the worst relative error.
+    If the fit itself failed, fix the last varied parameter.
+    At most N fits are tried.
+
+    See exhaustive_freezing() for the generator protocol.
+    """
+
+    vary = [True] * num_params
+
+    while any(vary):
+        rel_errors = yield vary.copy()
+
+        varied = [i for i in range(num_params) if vary[i]]
+
+        if rel_errors is None:
+            vary[varied[-1]] = False
+
+        else:
+            vary[max(varied, key=lambda i: rel_errors[i])] = False
+
+
+FREEZE_STRATEGIES = {"exhaustive": exhaustive_freezing, "greedy": greedy_freezing}
+
+
+def refit_single(
+    func_candidate,
+    x,
+    y,
+    y_up,
+    y_down,
+    max_stderr,
+    dim,
+    loss_weights=None,
+    analytic_jacobian=False,
+    freeze_strategy="exhaustive",
+    max_refits=None,
+    warm_start=False,
+    trials=None,
+):
+    """
+    After parameterizing a PySR function, fit it with LMFIT.
+    It contains a refit loop:
+        First allow all parameters to vary in the fit,
+        if the fit fails (no min found or any parameter returns a too high error)
+        then loosen the ndf (keep some of parameters fixed in fits) and refit again.
+
+    Arguments
+    ---------
+    func_candidate (pd.dataframe):
+        Contains one candidate function (one row).
+
+    x (np.ndarray):
+        Independent variable of data after processing.
+
+    y (np.ndarray):
+        Dependent variable of data after processing.
+
+    y_up (np.ndarray):
+        +1 sigma for y.
+
+    y_down (np.ndarray):
+        -1 sigma for y.
+
+    max_stderr (np.float):
+        Maximum standard error (%) allowed for all parameters in a fit.
+        If the fit returns any of the parameters with a stderr higher than that,
+        the fit is re-tried by loosening the ndf by fixing some of the parameters.
+
+    dim (int):
+        Dimension of the input data.
+
+    loss_weights (np.ndarray):
+        Per-bin weights of the loss, overriding y_up/y_down if provided.
+
+    analytic_jacobian (bool):
+        Pass the Jacobian from the symbolic derivatives of the function to the minimizer
+        instead of estimating it with finite differences.
+
+    freeze_strategy (str or callable):
+        How to pick the parameters to hold fixed when a fit fails:
+        'exhaustive' tries all 2^N vary/fix combinations (exhaustive_freezing()),
+        'greedy' freezes the parameter with the worst relative error one at a time (greedy_freezing()).
+        A custom generator function with the same protocol can be passed as well.
+
+    max_refits (int):
+        Maximum number of fits per candidate, None for no limit.
+
+    warm_start (bool):
+        Start each retry from the best converged parameter values of the previous fits
+        (fixed parameters included) instead of the initial values from PySR.
+
+    trials (list):
+        If provided, a record of each fit is appended to it:
+        {'vary': [...], 'nfev': ..., 'chi2': ..., 'rel. errors': [...]},
+        with None entries for fits that failed.
+
+
+    Returns
+    -------
+    result:
+        Full fit result returned by the LMFIT Minimizer.
+
+    covariance:
+        Covariance matrix of the fitted parameters.
+
+    correlation:
+        Correlation matrix of the fitted parameters.
+
+    ci:
+        Confidence intervals for the fitted parameters
+        (more robust than standard errors from Minimizer).
+    """
+    from lmfit import Minimizer, Parameters
+
+    # Define the minimization objective for LMFIT (it takes residual^2),
+    # compiled once for the candidate and evaluated on the plain parameter values.
+    residual = compile_residual(
+        func_str=func_candidate["Parameterized equation"],
+        x=x,
+        y=y,
+        y_up=y_up,
+        y_down=y_down,
+        loss_weights=loss_weights,
+        dim=dim,
+    )
+
+    def objective(params):
+        return residual([param.value for param in params.values()])
+
+    # Optionally provide the analytic Jacobian, falling back to finite differences
+    # if the function has no closed-form derivatives.
+    jacobian = None
+
+    if analytic_jacobian:
+        jacobian = compile_jacobian(
+            func_str=func_candidate["Parameterized equation"],
+            x=x,
+            y=y,
+            y_up=y_up,
+            y_down=y_down,
+            loss_weights=loss_weights,
+            dim=dim,
+        )
+
+    def dfun(params):
+        return jacobian([param.value for param in params.values()], [param.vary for param in params.values()])
+
+    num_params = len(func_candidate["Parameterization"])
+
+    # In case the function does not have any parameter to fit, e.g. y=1 or y=exp(x).
+    if num_params == 0:
+        return None
+
+    # In principle, we want to have all parameters being varied in a fit,
+    # but sometimes the fit fails due to instability or hitting infinities.
+    # In these cases, we fit with less ndf by keeping some parameters fixed in next fits.
+    # So start a fit with all parameters being variables.
+    # If it fails or any parameters have too high relative errors (> max_stderr),
+    # redo the fit by fixing one of more parameters until the fit succeeds.
+    # The freezing strategy decides which parameters to vary/fix in the next fit,
+    # and max_refits caps the number of fits for this candidate.
+    if isinstance(freeze_strategy, str):
+        if freeze_strategy not in FREEZE_STRATEGIES:
+            raise ValueError(
+                f"Unknown freeze_strategy '{freeze_strategy}', choose from {list(FREEZE_STRATEGIES.keys())}."
+            )
+
+        max_trials = 2**num_params if freeze_strategy == "exhaustive" else num_params
+        freeze_strategy = FREEZE_STRATEGIES[freeze_strategy]
+
+    else:
+        max_trials = None
+
+    if max_refits is not None:
+        max_trials = max_refits if max_trials is None else min(max_trials, max_refits)
+
+    vary_trials = freeze_strategy(num_params)
+    vary = next(vary_trials)
+    vary_trial = 0
+
+    result = None
+    rel_errors = []
+
+    # Starting values of the parameters, from PySR or, with warm_start,
+    # the best converged values (lowest chi2) from the previous fits of this candidate.
+    init_values = [func_candidate["Parameterization"][f"a{i + 1}"] for i in range(num_params)]
+    best_chisqr = np.inf
+
+    # Loop over the combinations of which parameters to vary/fixed in a fit.
+    while True:
+        vary_trial += 1
+        progress = f"{vary_trial}/{max_trials}" if max_trials is not None else f"{vary_trial}"
+
+        print(f"    >>> loop of re-parameterization with less NDF for bad fits {progress}...", end="\r")
+
+        params = Parameters()
+
+        for i in range(num_params):
+            # Define the LMFIT Parameter for the current fit,
+            # setting which parameters to vary/fixed from the freezing strategy,
+            # and their initial values.
+            params.add(name=f"a{i + 1}", value=init_values[i], vary=vary[i])
+
+        # Relative errors of all parameters passed back to the freezing strategy
+        # (None for the fixed ones, or None altogether if the fit fails).
+        trial_rel_errors = None
+
+        try:
+            # Fit the parameters with the LMFIT minimizer.
+            mini = Minimizer(userfcn=objective, params=params)
+
+            if jacobian is not None:
+                result = mini.minimize(Dfun=dfun)
+
+            else:
+                result = mini.minimize()
+
+        except Exception:
+            # The fit might not converge due to complex phase space,
+            # in that case we give up the current combination and
+            # retry another one (decreasing ndf by fixing more parameters).
+            if trials is not None:
+                trials.append({"vary": list(vary), "nfev": None, "chi2": None, "rel. errors": None})
+
+        else:
+            # If the above fit converges, get the standard errors in %.
+            trial_rel_errors = [
+                get_rel_err(param=result.params[f"a{i + 1}"])[2] if vary[i] else None for i in range(num_params)
+            ]
+
+            rel_errors = [rel_error for rel_error in trial_rel_errors if rel_error is not None]
+
+            if trials is not None:
+                trials.append(
+                    {
+                        "vary": list(vary),
+                        "nfev": int(result.nfev),
+                        "chi2": round_a_number(result.chisqr, 4),
+                        "rel. errors": [None if r is None else round_a_number(r, 4) for r in trial_rel_errors],
+                    }
+                )
+
+            # Seed the next fits from the best converged values so far, so the parameters
+            # frozen next keep their fitted values instead of going back to the PySR ones.
+            if warm_start and np.isfinite(result.chisqr) and result.chisqr < best_chisqr:
+                best_chisqr = result.chisqr
+                init_values = [result.params[f"a{i + 1}"].value for i in range(num_params)]
+
+            # Here, check if all relative errors are within the pre-set max_stderr,
+            # if it does, then stop the refit loop and go to confidence interval calculations,
+            # otherwise continue the loop (retry another combination).
+            # A finite/small max_stderr is to ensure bounded errors for the fitted parameters.
+            # Also, we don't want a too small max_stderr, since it would lead to only
+            # a small subset of parameters that float and survive the fit, and the
+            # errors would be too small for a meaningful uncertainty model.
+            if len(rel_errors) > 0 and all(rel_error < max_stderr for rel_error in rel_errors):
+                print(f"    >>> loop of re-parameterization with less NDF for bad fits {progress}...\n")
+
+                break
+
+        if max_refits is not None and vary_trial >= max_refits:
+            print(f"    >>> re-parameterization budget of {max_refits} fits reached for this candidate.\n")
+
+            break
+
+        try:
+            vary = vary_trials.send(trial_rel_errors)
+
+        except StopIteration:
+            break
+
+    # All combinations exhausted without a successful fit.
+    if result is None:
+        print("    >>> all re-parameterization combinations exhausted, no successful second-fit for this candidate.\n")
+        return None
+
+    # Compute the correlation for fitted parameters from the standard error estimation.
+    covariance, correlation = get_covariance_correlation(fit_result=result)
+
+    # Compute the confidence intervals for the fitted parameters,
+    # which are more robust estimation of the uncertainties than standard errors.
+    if len(rel_errors) > 1:
+        try:
+            # ci = lmfit.conf_interval(minimizer = mini,
+            #                         result = result
+            #                         )
+            ci = None
+
+        except Exception:
+            ci = None
+
+    else:
+        ci = None
+
+    return result, covariance, correlation, ci
+
+
+def get_val_err(param_str):
+    # Get relevant numbers from Parameter in string.
+    numbers = re.findall(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", param_str)
+    numbers = np.array(numbers, dtype=float)
+
+    # If fit returns, there will be 3 numbers.
+    # First is best-fit, then up and down unc.
+    if len(numbers) == 3:
+        value, error = numbers[1], numbers[2]
+
+    else:
+        value = numbers[1]
+        error = 0
+
+    return value, error
+
+
+def refit_candidate(
+    func_candidate,
+    x,
+    y,
+    y_up,
+    y_down,
+    max_stderr,
+    dim,
+    loss_weights=None,
+    analytic_jacobian=False,
+    freeze_strategy="exhaustive",
+    max_refits=None,
+    warm_start=False,
+):
+    """
+    Refit a single parameterized candidate function with refit_single()
+    and collect its refitted parameters.
+
+    Arguments are the same as in refit_single().
+
+
+    Returns
+    -------
+    refitted_param (dict):
+        Refitted parameters {'a1': (best-fit, +1, -1), ...}.
+
+    covariance (dict):
+        Covariance matrix of the fitted parameters.
+
+    correlation (dict):
+        Correlation matrix of the fitted parameters.
+
+    ci:
+        Confidence intervals for the fitted parameters.
+
+    trials (list):
+        Record of each fit tried for this candidate, see refit_single().
+    """
+
+    # Do nothing for candidate without any parameter to fit.
+    if func_candidate["Parameterization"] == {}:
+        return {}, {}, {}, None, []
+
+    refitted_param = {}
+    trials = []
+
+    # Run the refit.
+    refit_result = refit_single(
+        func_candidate=func_candidate,
+        x=x,
+        y=y,
+        y_up=y_up,
+        y_down=y_down,
+        max_stderr=max_stderr,
+        dim=dim,
+        loss_weights=loss_weights,
+        analytic_jacobian=analytic_jacobian,
+        freeze_strategy=freeze_strategy,
+        max_refits=max_refits,
+        warm_start=warm_start,
+        trials=trials,
+    )
+
+    # refit_single returns None when all parameter combinations
+    # fail to converge. Fall back to initial values with zero uncertainty.
+    if refit_result is None:
+        for j in range(len(func_candidate["Parameterization"])):
+            init_val = func_candidate["Parameterization"][f"a{j + 1}"]
+            refitted_param[f"a{j + 1}"] = (round_a_number(init_val), 0, 0)
+
+        return refitted_param, {}, {}, None, trials
+
+    result, covariance, correlation, ci = refit_result
+
+    # Either all from standard least-square or all from ci.
+    for j in range(len(result.params)):
+        # value, error = get_val_err(str(result.params[f'a{j+1}']))
+        # refitted_param[f'a{j+1}'] = (
+        #     round_a_number(value, sig_fig=6), round_a_number(error, sig_fig=6)
+        # )
+        try:
+            # See LMFIT confidence intervals output format.
+            central = ci[f"a{j + 1}"][3][1]
+            up = ci[f"a{j + 1}"][4][1] - central
+            down = ci[f"a{j + 1}"][2][1] - central
+
+            refitted_param[f"a{j + 1}"] = (
+                round_a_number(central),
+                round_a_number(up),
+                round_a_number(down),
+            )
+
+        except Exception:
+            central, std_err = get_val_err(param_str=str(result.params[f"a{j + 1}"]))
+
+            refitted_param[f"a{j + 1}"] = (
+                round_a_number(central),
+                round_a_number(std_err),
+                round_a_number(-std_err),
+            )
+
+    return refitted_param, covariance, correlation, ci, trials
+
+
+def refit_iter(
+    func_candidates,
+    x,
+    y,
+    y_up,
+    y_down,
+    max_stderr,
+    dim,
+    loss_weights=None,
+    analytic_jacobian=False,
+    freeze_strategy="exhaustive",
+    max_refits=None,
+    warm_start=False,
+    n_jobs=1,
+    parallel_backend="process",
+):
+    """
+    Refit all parameterized candidate functions with refit_candidate(),
+    yielding the result of each candidate as soon as it is available.
+
+    Arguments are the same as in refit_all().
+
+
+    Yields
+    ------
+    refit_result (tuple):
+        (refitted_param, covariance, correlation, ci, trials) of each candidate,
+        in the same order as in func_candidates, see refit_candidate().
+    """
+
+    refit_kwargs = dict(
+        x=x,
+        y=y,
+        y_up=y_up,
+        y_down=y_down,
+        max_stderr=max_stderr,
+        dim=dim,
+        loss_weights=loss_weights,
+        analytic_jacobian=analytic_jacobian,
+        freeze_strategy=freeze_strategy,
+        max_refits=max_refits,
+        warm_start=warm_start,
+    )
+
+    candidates = [func_candidates.iloc[i] for i in range(len(func_candidates))]
+
+    num_done = 0
+
+    # The candidates are independent, so they can be refitted in a process (or thread) pool.
+    # executor.map() keeps the input order, so the results are identical to the serial loop.
+    if n_jobs is not None and n_jobs != 1 and len(candidates) > 1:
+        if parallel_backend not in ("process", "thread"):
+            raise ValueError(f"Unknown parallel_backend '{parallel_backend}', choose from ['process', 'thread'].")
+
+        max_workers = os.cpu_count() if n_jobs == -1 else n_jobs
+        workers = "processes" if parallel_backend == "process" else "threads"
+
+        print(f"Re-optimizing {len(candidates)} parameterized candidate functions with {max_workers} {workers}...")
+
+        try:
+            if parallel_backend == "process":
+                # Spawned, not forked: this process has usually run the PySR search, and Julia does not support forking.
+                executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+            else:
+                executor = ThreadPoolExecutor(max_workers=max_workers)
+
+            try:
+                for refit_result in executor.map(functools.partial(refit_candidate, **refit_kwargs), candidates):
+                    num_done += 1
+                    yield refit_result
+
+            finally:
+                # Do not keep refitting the remaining candidates if the caller stops iterating early.
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        except (OSError, BrokenProcessPool) as e:
+            print(f"    >>> {parallel_backend} pool unavailable ({e}), falling back to serial re-optimization.")
+
+    # Serial loop, also picks up the remaining candidates if the pool broke down.
+    for i in range(num_done, len(candidates)):
+        print(f"Re-optimizing parameterized candidate function {i + 1}/{len(candidates)}...")
+
+        yield refit_candidate(func_candidate=candidates[i], **refit_kwargs)
+
+
+def add_refit_results(func_candidates, refit_results):
+    """
+    Add the results of refit_candidate() to the candidate dataframe.
+
+    Arguments
+    ---------
+    func_candidates (pd.dataframe):
+        Contains the parameterized candidate functions.
+
+    refit_results (list):
+        Outputs of refit_candidate(), one per candidate in the same order.
+
+
+    Returns
+    -------
+    func_candidates (pd.dataframe):
+        Update the dataframe by adding new columns:
+            1) 'Parameters: (best-fit, +1, -1)',
+            2) 'Covariance',
+            3) 'Correlation',
+            4) 'Confidence interval',
+            5) 'ROF trials': record of each fit tried (see refit_single()),
+            6) 'ROF nfev': total number of function evaluations over all fits.
+    """
+
+    refitted_params = [refit_result[0] for refit_result in refit_results]
+    covariances = [refit_result[1] for refit_result in refit_results]
+    correlations = [refit_result[2] for refit_result in refit_results]
+    confidence_intervals = [refit_result[3] for refit_result in refit_results]
+    trials = [refit_result[4] for refit_result in refit_results]
+
+    func_candidates["Parameters: (best-fit, +1, -1)"] = refitted_params
+    func_candidates["Covariance"] = covariances
+    func_candidates["Correlation"] = correlations
+    func_candidates["Confidence interval"] = confidence_intervals
+    func_candidates["ROF trials"] = trials
+    func_candidates["ROF nfev"] = [sum(trial["nfev"] or 0 for trial in trial_list) for trial_list in trials]
+
+    try:
+        func_candidates = func_candidates[
+            [
+                "Complexity",
+                "PySR template spec",
+                "PySR equation",
+                "Parameterized equation",
+                "Parameterization",
+                "Parameters: (best-fit, +1, -1)",
+                "Covariance",
+                "Correlation",
+                "ROF trials",
+                "ROF nfev",
+            ]
+        ]
+    except Exception:
+        func_candidates = func_candidates[
+            [
+                "Complexity",
+                "PySR equation",
+                "Parameterized equation",
+                "Parameterization",
+                "Parameters: (best-fit, +1, -1)",
+                "Covariance",
+                "Correlation",
+                "ROF trials",
+                "ROF nfev",
+            ]
+        ]
+
+    return func_candidates
+
+
+def refit_all(
+    func_candidates,
+    x,
+    y,
+    y_up,
+    y_down,
+    max_stderr,
+    dim,
+    loss_weights=None,
+    analytic_jacobian=False,
+    freeze_strategy="exhaustive",
+    max_refits=None,
+    warm_start=False,
+    n_jobs=1,
+    parallel_backend="process",
+):
+    """
+    Fit all parameterized candidate functions at once, using the
+    refit_single(func_candidate, x, y, y_up, y_down, max_stderr, dim, loss_weights) defined above.
+
+    Arguments
+    ---------
+    func_candidates (pd.dataframe):
+        Contains all candidate functions.
+
+    x (np.ndarray):
+        Independent variable of data after processing.
+
+    y (np.ndarray):
+        Dependent variable of data after processing.
+
+    y_up (np.ndarray):
+        +1 sigma for y.
+
+    y_down (np.ndarray):
+        -1 sigma for y.
+
+    max_stderr (np.float):
+        Maximum standard error (%) allowed for all parameters in a fit.
+        If the fit returns any of the parameters with a stderr higher than that,
+        the fit is re-tried by loosening the ndf by fixing some of the parameters.
+
+    dim (int):
+        Dimension of the input data.
+
+    loss_weights (np.ndarray):
+        Per-bin weights of the loss, overriding y_up/y_down if provided.
+
+    analytic_jacobian (bool):
+        Pass the Jacobian from the symbolic derivatives of the function to the minimizer
+        instead of estimating it with finite differences.
+
+    freeze_strategy (str or callable):
+        How to pick the parameters to hold fixed when a fit fails:
+        'exhaustive' tries all 2^N vary/fix combinations (exhaustive_freezing()),
+        'greedy' freezes the parameter with the worst relative error one at a time (greedy_freezing()).
+        A custom generator function with the same protocol can be passed as well.
+
+    max_refits (int):
+        Maximum number of fits per candidate, None for no limit.
+
+    warm_start (bool):
+        Start each retry from the best converged parameter values of the previous fits
+        (fixed parameters included) instead of the initial values from PySR.
+
+    n_jobs (int):
+        Number of worker processes to refit the candidates in parallel.
+        1 (or None) refits them one after another, -1 uses all CPU cores.
+
+    parallel_backend (str):
+        'process' for a process pool (started with spawn), or 'thread' for a thread pool when n_jobs != 1.
+
+
+    Returns
+    -------
+    func_candidates (pd.dataframe):
+        Update the dataframe by adding new columns:
+            1) 'Parameters: (best-fit, +1, -1)',
+            2) 'Covariance',
+            3) 'Correlation',
+            4) 'Confidence interval',
+            5) 'ROF trials': record of each fit tried (see refit_single()),
+            6) 'ROF nfev': total number of function evaluations over all fits.
+    """
+
+    refit_results = list(
+        refit_iter(
+            func_candidates=func_candidates,
+            x=x,
+            y=y,
+            y_up=y_up,
+            y_down=y_down,
+            max_stderr=max_stderr,
+            dim=dim,
+            loss_weights=loss_weights,
+            analytic_jacobian=analytic_jacobian,
+            freeze_strategy=freeze_strategy,
+            max_refits=max_refits,
+            warm_start=warm_start,
+            n_jobs=n_jobs,
+            parallel_backend=parallel_backend,
+        )
+    )
+
+    return add_refit_results(func_candidates=func_candidates, refit_results=refit_results)
@@ -0,0 +1,315 @@
+import ast
+import json
+import os
+import re
+
+import numpy as np
+
+# Bump when the layout of candidates.npz/candidates.json changes.
+STORAGE_VERSION = 1
+
+# Keys of the parameter dicts ('a3') and of the parameter pair dicts ('a1, a3').
+PARAM_KEY = re.compile(r"a(\d+)")
+PAIR_KEY = re.compile(r"a(\d+), a(\d+)")
+
+# Numbers in saved cells can be written as np.float64(1.2) with numpy >= 2.
+NUMBER_CALLS = {"float", "int", "np.float64", "np.float32", "np.int64", "np.int32", "numpy.float64", "numpy.int64"}
+
+
+def parse_literal(text):
+    """
+    Safely parse a dict/tuple/list cell saved by SymbolFit.save_to_csv(),
+    like "{'a1': (np.float64(1.2), np.float64(0.1), np.float64(-0.1))}",
+    without eval(): only literals, +/- signs, nan/inf and numpy scalar constructors are accepted.
+
+    Arguments
+    ---------
+    text (str):
+        Cell content.
+
+
+    Returns
+    -------
+    The parsed python object.
+    """
+
+    def convert(node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str, bool, type(None))):
+            return node.value
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            value = convert(node.operand)
+
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"Unsupported value in saved cell: {text}")
+
+            return -value if isinstance(node.op, ast.USub) else value
+
+        if isinstance(node, ast.Tuple):
+            return tuple(convert(e) for e in node.elts)
+
+        if isinstance(node, ast.List):
+            return [convert(e) for e in node.elts]
+
+        if isinstance(node, ast.Dict):
+            return {convert(k): convert(v) for k, v in zip(node.keys, node.values)}
+
+        if isinstance(node, ast.Name) and node.id in ("nan", "inf"):
+            return float(node.id)
+
+        if (
+            isinstance(node, ast.Call)
+            and ast.unparse(node.func) in NUMBER_CALLS
+            and len(node.args) == 1
+            and not node.keywords
+        ):
+            return float(convert(node.args[0]))
+
+        raise ValueError(f"Unsupported value in saved cell: {text}")
+
+    return convert(ast.parse(text.strip(), mode="eval").body)
+
+
+def is_number(value):
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
+def keyed_layout(values):
+    """
+    Layout of a column of parameter dicts like {'a1': 1.2,...}, {'a1': (1.2, 0.1, -0.1),...}
+    or {'a1, a2': 0.3,...}, or None if the column is not of this kind.
+
+    Returns
+    -------
+    (key_arity, value_width):
+        key_arity is 1 for 'a1' keys and 2 for 'a1, a2' keys,
+        value_width is None for scalar values or the length of the tuple values.
+    """
+
+    key_arity = None
+    value_width = None
+
+    for value in values:
+        if not isinstance(value, dict):
+            return None
+
+        for k, v in value.items():
+            match = PARAM_KEY.fullmatch(k) if isinstance(k, str) else None
+            arity = 1 if match else 2 if isinstance(k, str) and PAIR_KEY.fullmatch(k) else None
+
+            width = None if is_number(v) else len(v) if isinstance(v, tuple) and all(map(is_number, v)) else -1
+
+            if arity is None or width == -1:
+                return None
+
+            if key_arity is not None and (arity, width) != (key_arity, value_width):
+                return None
+
+            key_arity, value_width = arity, width
+
+    return (key_arity or 1), value_width
+
+
+def to_json(value):
+    """
+    Convert numpy scalars/arrays (in nested lists and dicts) to json types.
+    """
+
+    if isinstance(value, dict):
+        return {k: to_json(v) for k, v in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+
+    if isinstance(value, np.ndarray):
+        return to_json(value.tolist())
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    return value
+
+
+def save_candidates(columns, index, output_dir, data=None, settings=None):
+    """
+    Save the candidate table to output_dir/candidates.npz (numeric content)
+    and output_dir/candidates.json (metadata, equations and other text).
+
+    Numeric columns are stored as arrays, the parameter dicts ('Parameterization',
+    'Parameters: (best-fit, +1, -1)', 'Covariance', 'Correlation') as flat arrays of
+    parameter indices and values with per-candidate offsets, in their original order.
+    Columns of other objects (e.g., 'ROF trials') are stored as json.
+
+    Arguments
+    ---------
+    columns (dict):
+        {column name: list of values, one per candidate}, in the column order.
+
+    index (list):
+        Index of the candidate table.
+
+    output_dir (str):
+        Output directory, created if it does not exist.
+
+    data (dict):
+        Arrays saved along with the candidates, like {'x': x, 'y': y,...}.
+
+    settings (dict):
+        Json-serializable settings saved in the metadata.
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    arrays = {"index": np.asarray(index)}
+    column_info = []
+
+    for name, values in columns.items():
+        i = len(column_info)
+        layout = keyed_layout(values)
+
+        if len(values) > 0 and all(is_number(v) for v in values):
+            integer = all(isinstance(v, (int, np.integer)) for v in values)
+            arrays[f"column{i}"] = np.asarray(values, dtype=np.int64 if integer else np.float64)
+            column_info.append({"name": name, "kind": "array"})
+
+        elif len(values) > 0 and layout is not None:
+            key_arity, value_width = layout
+
+            keys, vals, offsets = [], [], [0]
+
+            for value in values:
+                for k, v in value.items():
+                    keys.append([int(a) for a in (PARAM_KEY if key_arity == 1 else PAIR_KEY).fullmatch(k).groups()])
+                    vals.append(v if value_width is not None else [v])
+
+                offsets.append(len(keys))
+
+            arrays[f"column{i}/keys"] = np.asarray(keys, dtype=np.int32).reshape(-1, key_arity)
+            arrays[f"column{i}/values"] = np.asarray(vals, dtype=np.float64).reshape(-1, value_width or 1)
+            arrays[f"column{i}/offsets"] = np.asarray(offsets, dtype=np.int64)
+
+            column_info.append({"name": name, "kind": "keyed", "key arity": key_arity, "value width": value_width})
+
+        else:
+            column_info.append({"name": name, "kind": "json", "values": to_json(list(values))})
+
+    for name, value in (data or {}).items():
+        if value is not None:
+            arrays[f"data/{name}"] = np.asarray(value)
+
+    metadata = {
+        "format": "symbolfit candidates",
+        "version": STORAGE_VERSION,
+        "num candidates": len(index),
+        "columns": column_info,
+        "data": [name for name, value in (data or {}).items() if value is not None],
+        "settings": to_json(settings or {}),
+    }
+
+    print(f"Saving full results >>> {os.path.join(output_dir, 'candidates.npz')}")
+
+    np.savez_compressed(os.path.join(output_dir, "candidates.npz"), **arrays)
+
+    # json.dumps() without indent uses the fast C encoder.
+    with open(os.path.join(output_dir, "candidates.json"), "w") as f:
+        f.write(json.dumps(metadata))
+
+
+def read_candidates(output_dir):
+    """
+    Read the candidate table saved by save_candidates(), with numpy only.
+
+    Arguments
+    ---------
+    output_dir (str):
+        Directory containing candidates.npz and candidates.json.
+
+
+    Returns
+    -------
+    columns (dict):
+        {column name: list of values}, the numeric columns as np.ndarray.
+
+    index (np.ndarray):
+        Index of the candidate table.
+
+    data (dict):
+        Arrays saved along with the candidates.
+
+    settings (dict):
+        Settings saved in the metadata.
+    """
+
+    with open(os.path.join(output_dir, "candidates.json")) as f:
+        metadata = json.load(f)
+
+    if metadata.get("format") != "symbolfit candidates" or metadata.get("version", 0) > STORAGE_VERSION:
+        raise ValueError(f"Unsupported candidates.json in {output_dir}, saved by a newer SymbolFit version?")
+
+    columns = {}
+
+    with np.load(os.path.join(output_dir, "candidates.npz"), allow_pickle=False) as arrays:
+        for i, info in enumerate(metadata["columns"]):
+            if info["kind"] == "array":
+                columns[info["name"]] = arrays[f"column{i}"]
+
+            elif info["kind"] == "keyed":
+                keys = arrays[f"column{i}/keys"]
+                vals = arrays[f"column{i}/values"]
+                offsets = arrays[f"column{i}/offsets"]
+
+                column = []
+
+                for start, stop in zip(offsets[:-1], offsets[1:]):
+                    value = {}
+
+                    for key, val in zip(keys[start:stop], vals[start:stop]):
+                        value[", ".join(f"a{a}" for a in key)] = val[0] if info["value width"] is None else tuple(val)
+
+                    column.append(value)
+
+                columns[info["name"]] = column
+
+            else:
+                columns[info["name"]] = info["values"]
+
+        index = arrays["index"]
+        data = {name: arrays[f"data/{name}"] for name in metadata["data"]}
+
+    return columns, index, data, metadata["settings"]
+
+
+def load_candidates(output_dir):
+    """
+    Load the candidate table saved by save_candidates() into a dataframe,
+    equal to the saved SymbolFit.func_candidates.
+    """
+
+    import pandas as pd
+
+    columns, index, _, _ = read_candidates(output_dir)
+
+    return pd.DataFrame(columns, index=index)
+
+
+# Columns of SymbolFit.save_to_csv() holding python objects written as str.
+CSV_OBJECT_COLUMNS = ["Parameterization", "Parameters: (best-fit, +1, -1)", "Covariance", "Correlation", "ROF trials"]
+
+
+def load_candidates_csv(path):
+    """
+    Load the candidate table saved by SymbolFit.save_to_csv() (candidates.csv) into a dataframe,
+    with the parameter dicts and ROF trials parsed back by parse_literal() instead of eval().
+    """
+
+    import pandas as pd
+
+    func_candidates = pd.read_csv(path, index_col=0)
+
+    for column in CSV_OBJECT_COLUMNS:
+        if column in func_candidates.columns:
+            func_candidates[column] = [
+                parse_literal(value) if isinstance(value, str) else value for value in func_candidates[column]
+            ]
+
+    return func_candidates
@@ -1,18 +1,26 @@
 import os
 import shutil
+import tempfile
+import time
 import warnings
-from itertools import combinations
 
-from lmfit import Minimizer, Parameters
+import pandas as pd
 
+from .cache import *
 from .evaluate import *
 from .math_defs import *
-from .plotting import *
 from .processing import *
+from .refit import *
+from .storage import *
 from .utils import *
 
+# The plotting functions (matplotlib) are imported in plot_to_pdf(), and PySR in fit().
+
 warnings.filterwarnings("ignore")
 
+pd.set_option("display.max_colwidth", None)
+pd.options.mode.chained_assignment = None
+
 
 class SymbolFit:
     """
@@ -54,8 +62,11 @@ class SymbolFit:
         and `y_down` when negative. The initial PySR search stage weights
         symmetrically by `1 / y_up^2` (using `y_down` where `y_up` is 0).
 
-    pysr_config : pysr.PySRRegressor
+    pysr_config : pysr.PySRRegressor | None
         Configuration for the PySR symbolic regression search.
+        `None` for a default configuration with the `+`, `*`, `/` and `^`
+        operators (see `default_pysr_config()` in `symbolfit/utils.py`),
+        created when the search starts.
         This controls which mathematical operators are available, how many
         iterations to run, population size, and other search hyperparameters.
         See [PySR documentation](https://github.com/MilesCranmer/PySR) for
@@ -136,6 +147,9 @@ class SymbolFit:
             (more parameters may be frozen), higher values are more permissive.
             If many of your candidates show frozen parameters, try increasing this.
 
+        Which parameters are frozen in the retries is controlled by
+        `freeze_strategy` and `max_refits`.
+
     fit_y_unc : bool
         Whether to use `y_up` / `y_down` as weights in the fit loss function.
         When True, the loss is chi2-weighted: `(y_pred - y_true)^2 / y_unc^2`.
@@ -164,6 +178,114 @@ class SymbolFit:
 
         This is useful when you want to emphasize certain regions of the data
         (e.g., assign higher weights to a signal region) or de-emphasize others.
+
+    analytic_jacobian : bool
+        Whether to differentiate each candidate symbolically with respect to its
+        parameters and pass the exact Jacobian to the LMFIT re-optimization fit,
+        instead of letting LMFIT estimate it with finite differences
+        (one extra function evaluation per parameter at each iteration).
+        Candidates whose derivatives cannot be written in closed form fall
+        back to finite differences.
+
+        !!! tip
+            Enable this for candidates with many parameters or datasets with many
+            bins, where the finite-difference Jacobian dominates the fit time.
+
+    n_jobs : int | None
+        Number of worker processes used to re-optimize the candidate functions
+        in parallel with LMFIT. The candidates are independent, so they are
+        distributed over a process pool and the results are collected in the
+        original order, identical to the serial run.
+
+        `1` (the default) or `None` refits the candidates one after another,
+        `-1` uses all available CPU cores.
+
+    parallel_backend : str
+        Pool used when `n_jobs` is not 1: `'process'` (the default) or
+        `'thread'`. Candidate evaluation and re-optimization keep no global
+        state, so refitting in threads is safe; threads avoid the cost of
+        starting processes and copying the data, but only run in parallel
+        where NumPy releases the GIL (large datasets).
+        The processes are spawned (not forked, which Julia does not support),
+        so scripts call `fit()` under `if __name__ == '__main__':`.
+
+    freeze_strategy : str
+        How to choose the parameters held fixed when a re-optimization fit
+        fails or exceeds `max_stderr`:
+
+        - `'exhaustive'` (the default): try all 2^N combinations of varying/fixing
+          the N parameters, starting from all parameters varied.
+        - `'greedy'`: backward elimination, fixing the parameter with the worst
+          relative error after each unsuccessful fit (at most N fits).
+
+        A custom strategy can also be passed as a generator function, see
+        `symbolfit.refit.exhaustive_freezing` for the protocol.
+
+    max_refits : int | None
+        Maximum number of re-optimization fits per candidate, for any
+        `freeze_strategy`. When the budget is used up, the last successful fit
+        is kept. `None` means no limit.
+
+        !!! tip
+            A candidate with 12 parameters can need up to 4096 fits with the
+            exhaustive search. Use `freeze_strategy = 'greedy'` and/or a budget
+            like `max_refits = 50` to keep high-complexity candidates from
+            stalling the fit.
+
+    refit_warm_start : bool
+        Whether to start each re-optimization retry from the best converged
+        parameter values of the previous fits of the same candidate, instead
+        of the initial values from PySR. Parameters frozen in a retry then keep
+        their fitted values, and later fits usually converge in fewer function
+        evaluations.
+
+        Each fit tried is recorded in the `ROF trials` column of the results
+        (which parameters were varied, number of function evaluations, chi2 and
+        relative errors), and `ROF nfev` sums the function evaluations of all
+        fits of a candidate.
+
+    pysr_cache : str | None
+        Directory of an on-disk cache of PySR search results (opt-in, `None`
+        disables it). Searches are identified by a hash of the data given to
+        PySR (x, y and weights after rescaling), the `pysr_config` settings,
+        `max_complexity` and `random_seed`; an identical search is then skipped
+        and its candidate functions are taken from the cache. Without a
+        `random_seed`, a cache hit returns the candidates of the earlier
+        (non-deterministic) search. See `pysr_cache_stats()`.
+
+    pysr_cache_max_size : int | None
+        Maximum size of the PySR cache in bytes. The least recently used
+        entries are removed when it is exceeded, `None` means no limit.
+
+    work_dir : str | None
+        Location of the working directories for the PySR outputs. Each
+        instance writes to its own unique directory inside (created with
+        `tempfile.mkdtemp`, path in `pysr_output_directory`), so several fits
+        can run at the same time in the same place. `None` uses the system
+        temporary directory.
+
+    work_dir_cleanup : str
+        When to remove the working directory after a search:
+        `'always'` (the default), `'on_success'` (keep the outputs of a failed
+        search for inspection) or `'never'`. The directory is kept across
+        searches while `pysr_warm_start` is enabled.
+
+    pysr_warm_start : bool
+        Incremental mode: keep the PySR working directory between fits, and
+        resume each new search (e.g., after new data arrived for the same
+        spectrum) from the population of the previous search with the same
+        `pysr_config` (PySR `warm_start`), instead of starting from scratch.
+        The first search is a cold start. Warm-started searches are not
+        cached in `pysr_cache`.
+
+        Each search is recorded in `pysr_searches` (warm or cold start,
+        number of iterations and wall time), and the iterations and time saved
+        compared with the last cold start are reported after a warm start.
+
+    pysr_warm_start_niterations : int | None
+        Number of PySR iterations for the warm-started searches, usually
+        fewer than for the cold start since the population is already evolved.
+        `None` uses `niterations` of `pysr_config`.
     """
 
     def __init__(
@@ -172,13 +294,7 @@ class SymbolFit:
         y=None,
         y_up=1,
         y_down=1,
-        pysr_config=PySRRegressor(
-            model_selection="accuracy",
-            niterations=100,
-            maxsize=40,
-            binary_operators=["+", "*", "/", "^"],
-            elementwise_loss="loss(y, y_pred, weights) = (y - y_pred)^2 * weights",
-        ),
+        pysr_config=None,
         max_complexity=40,
         input_rescale=True,
         scale_y_by="mean",
@@ -186,6 +302,18 @@ class SymbolFit:
         fit_y_unc=True,
         random_seed=None,
         loss_weights=None,
+        analytic_jacobian=False,
+        n_jobs=1,
+        parallel_backend="process",
+        freeze_strategy="exhaustive",
+        max_refits=None,
+        refit_warm_start=False,
+        pysr_cache=None,
+        pysr_cache_max_size=2**30,
+        work_dir=None,
+        work_dir_cleanup="always",
+        pysr_warm_start=False,
+        pysr_warm_start_niterations=None,
         func_candidates=pd.DataFrame(),
     ):
         self.x = x
@@ -200,6 +328,21 @@ class SymbolFit:
         self.fit_y_unc = fit_y_unc
         self.random_seed = random_seed
         self.loss_weights = loss_weights
+        self.analytic_jacobian = analytic_jacobian
+        self.n_jobs = n_jobs
+        self.parallel_backend = parallel_backend
+        self.freeze_strategy = freeze_strategy
+        self.max_refits = max_refits
+        self.refit_warm_start = refit_warm_start
+        self.pysr_cache = pysr_cache
+        self.pysr_cache_max_size = pysr_cache_max_size
+        self.work_dir = work_dir
+        self.work_dir_cleanup = work_dir_cleanup
+        self.pysr_output_directory = None
+        self.pysr_warm_start = pysr_warm_start
+        self.pysr_warm_start_niterations = pysr_warm_start_niterations
+        self.pysr_searches = []
+        self.timings = {}
         self.func_candidates = func_candidates
 
     def fit(self):
@@ -211,13 +354,91 @@ class SymbolFit:
            (replaces them with named parameters `a1`, `a2`, ...).
         3. Re-optimizes each candidate with LMFIT to refine parameter values
            and provide uncertainty estimation (re-optimization fit, or ROF).
+
+        The results are stored in `func_candidates`, see also `fit_iter()`
+        to process the candidates one at a time. The wall time of each stage
+        (data processing, PySR search, parse, parameterize, refit, unscale,
+        goodness of fit) is stored in the `timings` dict.
+        """
+
+        for _ in self.fit_iter():
+            pass
+
+    def refit_from(self, hall_of_fame):
+        """
+        Re-runs the pipeline of `fit()` on candidate functions from an existing
+        hall of fame, skipping the PySR search: only the parameterization, ROF,
+        unscaling and goodness-of-fit steps are done, with the current settings
+        (`max_stderr`, `fit_y_unc`, `loss_weights`, `scale_y_by`, ...).
+
+        Parameters
+        ----------
+        hall_of_fame : str | list | DataFrame
+            One of:
+
+            - a PySR run directory (containing `hall_of_fame.csv` and `checkpoint.pkl`),
+              or a PySR output directory containing run directories (the latest one is used),
+            - a `candidates.csv` file saved by `save_to_csv()`,
+            - a list of equations like `['1.2*x0 + exp(3.4*x0)', ...]`,
+            - a dataframe with a `PySR equation` column, e.g., `func_candidates` of a previous fit.
+
+            The equations are in terms of the inputs seen by PySR, i.e., after
+            the rescaling if `input_rescale=True` (as in the `PySR equation` column).
+            The complexity of equations given as a list is the number of nodes
+            in their expression trees.
+
+        !!! tip
+            ```python
+            model.fit()
+            previous = model.func_candidates
+
+            model.max_stderr = 40
+            model.refit_from(previous)
+            ```
+        """
+
+        for _ in self.fit_iter(hall_of_fame=hall_of_fame):
+            pass
+
+    def fit_iter(self, hall_of_fame=None):
+        """
+        Same pipeline as `fit()`, but yields each candidate function as soon as
+        it has been re-optimized, unscaled and scored, instead of waiting for
+        all candidates to be done.
+
+        The candidates are yielded in the order of the PySR hall of fame, and
+        each one is also appended to `func_candidates`, so `save_to_csv()` and
+        `plot_to_pdf()` can be called in between to write the results so far.
+
+        Parameters
+        ----------
+        hall_of_fame : str | list | DataFrame
+            Skip the PySR search and use the candidate functions from an existing
+            hall of fame instead, see `refit_from()`.
+
+        Yields
+        ------
+        func_candidate : Series
+            One row of `func_candidates` with all its columns.
+
+        !!! tip
+            ```python
+            for func_candidate in model.fit_iter():
+                print(func_candidate["Parameterized equation, unscaled"], func_candidate["Chi2/NDF"])
+                model.save_to_csv(output_dir="results/")
+            ```
         """
 
+        # Wall time of each stage (summed over candidates for the per-candidate stages).
+        self.timings = dict.fromkeys(
+            ["data processing", "PySR search", "parse", "parameterize", "refit", "unscale", "goodness of fit"], 0.0
+        )
+        stage_start = time.perf_counter()
+
         x = self.x
         y = self.y
         y_up = self.y_up
         y_down = self.y_down
-        pysr_model = self.pysr_config
         max_complexity = self.max_complexity
         input_rescale = self.input_rescale
         scale_y_by = self.scale_y_by
@@ -239,666 +460,220 @@ class SymbolFit:
         else:
             X, Y, Y_up, Y_down, y_scale = x, y, y_up, y_down, 1.0
 
-        # Remove output files from previous PySR fits before starting new one below.
-        # pklfiles = glob('hall*')
-        # for f in pklfiles:
-        #    os.remove(f)
-        if os.path.exists("outputs_tmp"):
-            shutil.rmtree("outputs_tmp")
-
-        # In PySR, set weighted loss = (y_model - y_label)^2 * loss_weights.
-        if loss_weights is not None:
-            pysr_weights = np.reshape(np.array(loss_weights), (-1, 1))
-
-        elif y_up is not None and y_down is not None:
-            pysr_weights = np.where(Y_up != 0, Y_up, Y_down)
-            pysr_weights = 1 / pysr_weights**2
-
-        else:
-            pysr_weights = np.ones(y.shape)
-
-        # Run PySR fit.
-        if self.random_seed is not None:
-            pysr_model.set_params(parallelism="serial", random_state=self.random_seed, deterministic=True)
+        self.timings["data processing"] = time.perf_counter() - stage_start
+        stage_start = time.perf_counter()
 
-        if self.max_complexity is not None:
-            pysr_model.set_params(maxsize=max_complexity)
+        if hall_of_fame is None:
+            # Only build the default PySR model (importing PySR and starting Julia) when searching.
+            if self.pysr_config is None:
+                self.pysr_config = default_pysr_config()
 
-        pysr_model.set_params(output_directory="outputs_tmp")
+            pysr_model = self.pysr_config
 
-        pysr_model.fit(X, Y, weights=pysr_weights.flatten())
-
-        print("\n")
-
-        # Get essential info from the PySR output file (hall_.pkl),
-        # and save to a df for later processing/refit.
-        # os.rename(glob('hall*.pkl')[0],'pysr_model_temp.pkl')
-
-        # func_candidates = parse_pysr_equ(pysr_pkl = 'pysr_model_temp.pkl', x = X)
-        hash_subdir = [d for d in os.listdir("outputs_tmp") if os.path.isdir(os.path.join("outputs_tmp", d))]
-        run_directory = os.path.join("outputs_tmp", hash_subdir[0])
-
-        func_candidates = parse_pysr_equ(pysr_dir=run_directory, x=X)
-
-        print("\n")
-
-        # The constants in the fitted functions from PySR do not have uncert. estimation,
-        # so we fix the functional forms, parameterize all constants, and refit them with LMFIT.
-        # The first step is to parameterize the fitted functions from PySR.
-        def parameterize_func_single(func_str, dim):
-            """
-            Parameterizing a function like: '1.2*x0 + exp(3.4*x0)' -> 'a1*x0 + exp(a2*x0)'.
-            Set the constants as initial conditions for the parameters in the second fits:
-                e.g., {'a1': 1.2, 'a2': 3.4}.
-
-            Arguments
-            ---------
-            func_str (str):
-                Function in str like '1.2*x0 + exp(3.4*x0)'.
-
-
-            Returns
-            -------
-            function (str):
-                E.g., '1.2*x0 + exp(3.4*x0)' same as input
-
-            parameterized function (str):
-                E.g., 'a1*x0 + exp(a2*x0)'
-
-            parameterization (dict):
-                E.g., {'a1': 1.2, 'a2': 3.4}
-            """
-
-            # Define the independent variable (x0, x1, x2,...),
-            # parse the input function str into a SymPy equation.
-            for i in range(dim):
-                func = sympy.sympify(func_str, locals={f"x{i}": sympy.symbols(f"x{i}")})
-
-            # Loop over all constants in the function using SymPy's tree traversal method.
-            # If there are 3 constants (1.2, 3.4, 5.6), then create {1.2: 'a1', 3.4: 'a2', 5.6: 'a3'} for them.
-            parameterization = {}
-            variable_counter = 0
-
-            for a in sympy.preorder_traversal(func):
-                # Replace non-integer constants only,
-                # as sometimes constants like 1 are trivial.
-                if isinstance(a, sympy.Number) and not a.is_Integer:
-                    variable_counter += 1
-                    parameterization[a] = sympy.Symbol(f"a{variable_counter}")
-
-            # In case there are constants belonging to more than one subtree,
-            # the earlier variable_counter will be overriden,
-            # creating {1.2: 'a1', 3.4: 'a3', 5.6: 'a4'} instead of {1.2: 'a1', 3.4: 'a2', 5.6: 'a3'}.
-            # We don't want that since it will cause problem in later processing.
-            # Here, we rename the variables with ascending subscripts {'a1', 'a2', 'a3',...}.
-            def rename_ascending_variables(param_dict):
-                # parameterization was created with float keys and sympy symbols as values.
-                # First sort the items by the constants (keys).
-                sorted_items = sorted(param_dict.items(), key=lambda x: x[0])
-
-                # Loop over the sorted items, rename the variables,
-                # and store to a new dictionary.
-                param_dict_renamed = {}
-                for i, (key, value) in enumerate(sorted_items, start=1):
-                    renamed_variable = f"a{i}"
-
-                    if value.name != renamed_variable:
-                        value = sympy.symbols(renamed_variable)
-
-                    param_dict_renamed[key] = value
-
-                return param_dict_renamed
-
-            parameterization = rename_ascending_variables(parameterization)
-
-            # Replace constants by their corresponding parameters in the function.
-            func_parameterized = func.subs(parameterization)
-
-            return (
-                str(func),
-                str(func_parameterized),
-                {str(value): float(key) for key, value in parameterization.items()},
-            )
-
-        def parameterize_func_all(func_candidates, dim):
-            """
-            Parameterize all candidate functions at once.
-
-            Arguments
-            ---------
-            func_candidates (pd.dataframe):
-                Contains all PySR functions to be parameterized.
-
-
-            Returns
-            -------
-            func_candidates (pd.dataframe):
-                Add new columns for the parameterized functions
-                and the parameterization that stores the initial values.
-            """
-
-            # Loop over all candidate functions, parameterize them,
-            # and store as new columns.
-            func_param_all = []
-            param_all = []
-
-            for i in range(len(func_candidates)):
-                _, func_param, param = parameterize_func_single(func_str=func_candidates["PySR equation"][i], dim=dim)
-
-                func_param_all.append(func_param)
-                param_all.append(param)
-
-            func_candidates["Parameterized equation"] = func_param_all
-
-            func_candidates["Parameterization"] = param_all
-
-            try:
-                func_candidates = func_candidates[
-                    ["PySR template spec", "PySR equation", "Parameterized equation", "Parameterization", "Complexity"]
-                ]
-            except Exception:
-                func_candidates = func_candidates[
-                    ["PySR equation", "Parameterized equation", "Parameterization", "Complexity"]
-                ]
+            # In PySR, set weighted loss = (y_model - y_label)^2 * loss_weights.
+            if loss_weights is not None:
+                pysr_weights = np.reshape(np.array(loss_weights), (-1, 1))
 
-            return func_candidates
+            elif y_up is not None and y_down is not None:
+                pysr_weights = np.where(Y_up != 0, Y_up, Y_down)
+                pysr_weights = 1 / pysr_weights**2
 
-        def get_rel_err(param):
-            """
-            Get relative error of a fitted parameter from the LMFIT result.
-
-            Arguments
-            ---------
-            param (LMFIT.Param):
-                Parameter instance of LMFIT after fit.
-
-
-            Returns
-            -------
-            value (np.float):
-                Best-fit.
-
-            std_err (np.float):
-                Standard error.
-
-            ratio (np.float):
-                (standard error / best-fit value) * 100, in absolute value.
-            """
-
-            # Get numbers of a fitted parameter from the LMFIT result
-            numbers = re.findall(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", str(param))
-            numbers = np.array(numbers, dtype=float)
-
-            value = None
-            std_err = None
-            ratio = 99999
-
-            # If the fit succeeds, LMFIT parameter returns something like
-            # "... a1 ... [best-fit] ... [standard error]...", 3 numbers in total,
-            # we need the last two to calculate the relative error.
-            # Otherwise the parameter has been held fixed or sent to inf,
-            # which we assign 99999 for the relative error and ignore it for later.
-            if len(numbers) == 3:
-                value, std_err = numbers[1], numbers[2]
-                ratio = std_err / np.abs(value) * 100
-
-            return value, std_err, ratio
-
-        def get_covariance_correlation(fit_result):
-            """
-            Get correlation of all fitted parameters from the LMFIT result.
-
-            Arguments
-            ---------
-            fit_result:
-                Fit result from LMFIT.
-
-
-            Returns
-            -------
-            correlation (dict):
-                Correlation matrix of fitted parameters {'a1, a2': 0.1, ...}.
-            """
-
-            # Get the number of fitted parameters that were not held fixed.
-            num_param = len(fit_result.params)
-            param_varied = []
-
-            for i in range(num_param):
-                if "fixed" not in str(fit_result.params[f"a{i + 1}"]):
-                    param_varied.append(f"a{i + 1}")
-
-            num_param_varied = len(param_varied)
-
-            # Store diagonal and upper or lower triangular elements.
-            covariance = {}
-
-            # Calculate correlation as covariance(x, y) / (stderr_x * stderr_y).
-            correlation = {}
-
-            # Correlation only when at least one pair of parameters exist.
-            if num_param_varied > 1:
-                # All possible pairs.
-                for i in range(num_param_varied - 1):
-                    for j in range(i + 1, num_param_varied):
-                        # Get a pair of parameters.
-                        pair = f"{param_varied[i]}, {param_varied[j]}"
-
-                        # Get standard errors from covariance matrix.
-                        _, error_i, _ = get_rel_err(param=fit_result.params[param_varied[i]])
-                        _, error_j, _ = get_rel_err(param=fit_result.params[param_varied[j]])
-
-                        # Compute the correlation value.
-                        corr = round_a_number(number=fit_result.covar[i][j] / (error_i * error_j), sig_fig=4)
-
-                        # Numerical rounding causing correlation slightly > 1 or < 1.
-                        if corr > 1:
-                            corr = 1
-
-                        elif corr < -1:
-                            corr = -1
-
-                        correlation[pair] = corr
-
-                        # Off diagonal elements of the covariance matrix.
-                        covariance[pair] = fit_result.covar[i][j]
-
-                # Diagonal elements of the covariance matrix.
-                for i in range(num_param_varied):
-                    pair = f"{param_varied[i]}, {param_varied[i]}"
-                    covariance[pair] = fit_result.covar[i][i]
-
-            return covariance, correlation
-
-        def refit_single(func_candidate, x, y, y_up, y_down, max_stderr, dim):
-            """
-            After parameterizing a PySR function, fit it with LMFIT.
-            It contains a refit loop:
-                First allow all parameters to vary in the fit,
-                if the fit fails (no min found or any parameter returns a too high error)
-                then loosen the ndf (keep some of parameters fixed in fits) and refit again.
-
-            Arguments
-            ---------
-            func_candidate (pd.dataframe):
-                Contains one candidate function (one row).
-
-            x (np.ndarray):
-                Independent variable of data after processing.
-
-            y (np.ndarray):
-                Dependent variable of data after processing.
-
-            y_up (np.ndarray):
-                +1 sigma for y.
-
-            y_down (np.ndarray):
-                -1 sigma for y.
-
-            max_stderr (np.float):
-                Maximum standard error (%) allowed for all parameters in a fit.
-                If the fit returns any of the parameters with a stderr higher than that,
-                the fit is re-tried by loosening the ndf by fixing some of the parameters.
+            else:
+                pysr_weights = np.ones(y.shape)
 
+            # Run PySR fit.
+            if self.random_seed is not None:
+                pysr_model.set_params(parallelism="serial", random_state=self.random_seed, deterministic=True)
 
-            Returns
-            -------
-            result:
-                Full fit result returned by the LMFIT Minimizer.
+            if self.max_complexity is not None:
+                pysr_model.set_params(maxsize=max_complexity)
 
-            covariance:
-                Covariance matrix of the fitted parameters.
+            # Continue from the population of the previous search with the same PySR model (in memory).
+            warm_start = self.pysr_warm_start and getattr(pysr_model, "julia_state_stream_", None) is not None
 
-            correlation:
-                Correlation matrix of the fitted parameters.
+            if self.pysr_warm_start:
+                pysr_model.set_params(warm_start=warm_start)
 
-            ci:
-                Confidence intervals for the fitted parameters
-                (more robust than standard errors from Minimizer).
-            """
+            # Look up an identical earlier search in the PySR cache,
+            # not for warm starts since their results depend on the previous searches.
+            func_candidates = None
 
-            # Define the minimization objective for LMFIT (it takes residual^2).
-            def residual(params, x, data, y_up, y_down, dim):
-                if dim > 1:
-                    for i in range(dim):
-                        globals()[f"x{i}"] = np.reshape(x[:, i], (-1, 1))
+            if self.pysr_cache is not None and not warm_start:
+                key = cache_key(
+                    x=X,
+                    y=Y,
+                    weights=pysr_weights.flatten(),
+                    pysr_params=pysr_model.get_params(),
+                    max_complexity=max_complexity,
+                    random_seed=self.random_seed,
+                )
 
-                else:
-                    x0 = x  # noqa: F841 -- used by eval(model) below
+                func_candidates = cache_load(cache_dir=self.pysr_cache, key=key)
 
-                # LMFIT uses Parameter object to represent a variable,
-                # substitute a1, a2,... by their Parameter object defined in the input params.
-                model = re.sub(r"\b(a\d+)\b", r"params['\1']", func_candidate["Parameterized equation"])
-                residual = eval(model) - data
+                if func_candidates is not None:
+                    print(f"Found the PySR search in the cache ({key[:12]}), skipping the search.\n")
 
-                # Scale residual by +/-1 sigma in the fit if they exist.
-                # If the residual is +ve in a bin, scale by +1 sigma,
-                # otherwise scale by -1 sigma.
-                # Also replace with one another if either is zero in a bin.
-                if loss_weights is not None:
-                    residual = residual * np.sqrt(loss_weights)
-
-                elif y_up is not None and y_down is not None:
-                    y_unc = np.where(
-                        residual > 0, np.where(y_up != 0, y_up, y_down), np.where(y_down != 0, y_down, y_up)
+            if func_candidates is None:
+                if self.work_dir_cleanup not in ("always", "on_success", "never"):
+                    raise ValueError(
+                        f"Unknown work_dir_cleanup '{self.work_dir_cleanup}',"
+                        " choose from ['always', 'on_success', 'never']."
                     )
 
-                    residual = residual / y_unc
-
-                return residual
-
-            # In principle, we want to have all parameters being varied in a fit,
-            # but sometimes the fit fails due to instability or hitting infinities.
-            # In these cases, we fit with less ndf by keeping some parameters fixed in next fits.
-            # So start a fit with all parameters being variables.
-            # If it fails or any parameters have too high relative errors (> max_stderr),
-            # redo the fit by fixing one of more parameters until the fit succeeds.
-
-            # Here, we create a list that contains all possible combinations of
-            # varying/fixing parameters in a fit.
-            # If there are two parameters in a function, then it will generate:
-            # [[True, True], [True, False], [False, True], [False, False]].
-            def vary_combinations(num_params):
-                # Start from a list with all True's.
-                vary_combo = [[True] * num_params]
-
-                # Create new combinations by turning some into False's.
-                for r in range(1, num_params + 1):
-                    for combo in combinations(range(num_params), r):
-                        temp_list = vary_combo[0].copy()
-
-                        for index in combo:
-                            temp_list[index] = False
-
-                        vary_combo.append(temp_list)
-
-                return vary_combo
-
-            num_params = len(func_candidate["Parameterization"])
-
-            # In case the function does not have any parameter to fit, e.g. y=1 or y=exp(x).
-            if num_params == 0:
-                return None
-
-            vary_combo = vary_combinations(num_params)
+                # Each instance writes the PySR outputs to its own unique directory,
+                # so that fits running at the same time in the same place do not collide.
+                # The directory is kept across searches for warm starts.
+                if not (
+                    self.pysr_warm_start
+                    and self.pysr_output_directory is not None
+                    and os.path.isdir(self.pysr_output_directory)
+                ):
+                    if self.work_dir is not None:
+                        os.makedirs(self.work_dir, exist_ok=True)
 
-            result = None
-            rel_errors = []
+                    self.pysr_output_directory = tempfile.mkdtemp(prefix="symbolfit_", dir=self.work_dir)
 
-            # Loop over the possible combinations of which parameters to vary/fixed in a fit.
-            for vary_trial in range(len(vary_combo)):
-                print(
-                    "    >>> loop of re-parameterization with less NDF"
-                    f" for bad fits {vary_trial + 1}/{len(vary_combo)}...",
-                    end="\r",
-                )
-
-                params = Parameters()
+                niterations = pysr_model.get_params()["niterations"]
 
-                for i in range(num_params):
-                    # Define the LMFIT Parameter for the current fit,
-                    # setting which parameters to vary/fixed from the vary_combo,
-                    # and their initial values from the parameterization.
-                    init_value = func_candidate["Parameterization"][f"a{i + 1}"]
+                if warm_start and self.pysr_warm_start_niterations is not None:
+                    pysr_model.set_params(niterations=self.pysr_warm_start_niterations)
 
-                    # LMFIT Parameter class method add().
-                    params.add(name=f"a{i + 1}", value=init_value, vary=vary_combo[vary_trial][i])
+                start = time.perf_counter()
 
                 try:
-                    # Fit the parameters with the LMFIT minimizer.
-                    mini = Minimizer(userfcn=residual, params=params, fcn_args=(x, y, y_up, y_down, dim))
-                    # ^ arguments for residual()
-
-                    result = mini.minimize()
-
-                except Exception:
-                    # The fit might not converge due to complex phase space,
-                    # in that case we give up the current vary_combo and
-                    # retry another one (decreasing ndf by fixing more parameters).
-                    continue
-
-                # If the above fit converges, get the standard errors in %.
-                rel_errors = []
-
-                for i in range(num_params):
-                    if vary_combo[vary_trial][i]:
-                        _, _, ratio = get_rel_err(param=result.params[f"a{i + 1}"])
-
-                        rel_errors.append(ratio)
-
-                # Here, check if all relative errors are within the pre-set max_stderr,
-                # if it does, then stop the refit loop and go to confidence interval calculations,
-                # otherwise continue the loop (retry another vary_combo).
-                # A finite/small max_stderr is to ensure bounded errors for the fitted parameters.
-                # Also, we don't want a too small max_stderr, since it would lead to only
-                # a small subset of parameters that float and survive the fit, and the
-                # errors would be too small for a meaningful uncertainty model.
-                if len(rel_errors) > 0 and all(rel_error < max_stderr for rel_error in rel_errors):
-                    print(
-                        "    >>> loop of re-parameterization with less NDF"
-                        f" for bad fits {vary_trial + 1}/{len(vary_combo)}...\n"
+                    run_directory = run_pysr(
+                        pysr_model=pysr_model,
+                        X=X,
+                        Y=Y,
+                        weights=pysr_weights.flatten(),
+                        output_directory=self.pysr_output_directory,
                     )
 
-                    break
-
-            # All combinations exhausted without a successful fit.
-            if result is None:
-                print(
-                    "    >>> all re-parameterization combinations exhausted,"
-                    " no successful second-fit for this candidate.\n"
-                )
-                return None
-
-            # Compute the correlation for fitted parameters from the standard error estimation.
-            covariance, correlation = get_covariance_correlation(fit_result=result)
-
-            # Compute the confidence intervals for the fitted parameters,
-            # which are more robust estimation of the uncertainties than standard errors.
-            if len(rel_errors) > 1:
-                try:
-                    # ci = lmfit.conf_interval(minimizer = mini,
-                    #                         result = result
-                    #                         )
-                    ci = None
+                    print("\n")
 
-                except Exception:
-                    ci = None
+                    self.timings["PySR search"] = time.perf_counter() - stage_start
+                    stage_start = time.perf_counter()
 
-            else:
-                ci = None
+                    # Get essential info from the PySR output files,
+                    # and save to a df for later processing/refit.
+                    func_candidates = parse_pysr_equ(pysr_dir=run_directory, x=X)
 
-            return result, covariance, correlation, ci
+                except BaseException:
+                    # Keep the outputs of a failed search for inspection, unless always cleaning up.
+                    if self.work_dir_cleanup == "always" and not self.pysr_warm_start:
+                        shutil.rmtree(self.pysr_output_directory, ignore_errors=True)
 
-        def refit_all(func_candidates, x, y, y_up, y_down, max_stderr, dim):
-            """
-            Fit all parameterized candidate functions at once, using the
-            refit_single(func_candidate, x, y, y_up, y_down, max_stderr) defined above.
+                    raise
 
-            Arguments
-            ---------
-            func_candidates (pd.dataframe):
-                Contains all candidate functions.
+                finally:
+                    search_niterations = pysr_model.get_params()["niterations"]
+                    pysr_model.set_params(niterations=niterations)
 
-            x (np.ndarray):
-                Independent variable of data after processing.
-
-            y (np.ndarray):
-                Dependent variable of data after processing.
-
-            y_up (np.ndarray):
-                +1 sigma for y.
+                self.pysr_searches.append(
+                    {
+                        "warm start": warm_start,
+                        "niterations": search_niterations,
+                        "time": time.perf_counter() - start,
+                    }
+                )
 
-            y_down (np.ndarray):
-                -1 sigma for y.
+                if warm_start:
+                    savings = warm_start_savings(pysr_searches=self.pysr_searches)
+                    self.pysr_searches[-1].update(savings or {})
 
-            max_stderr (np.float):
-                Maximum standard error (%) allowed for all parameters in a fit.
-                If the fit returns any of the parameters with a stderr higher than that,
-                the fit is re-tried by loosening the ndf by fixing some of the parameters.
+                    search = self.pysr_searches[-1]
+                    print(f"PySR warm start: {search['niterations']} iterations in {search['time']:.1f} s", end="")
 
+                    if savings is not None:
+                        print(
+                            f", saved {savings['iterations saved']} iterations"
+                            f" and {savings['time saved']:.1f} s compared with the cold start."
+                        )
 
-            Returns
-            -------
-            func_candidates (pd.dataframe):
-                Update the dataframe by adding new columns:
-                    1) 'Parameters: (best-fit, +1, -1)',
-                    2) 'Covariance',
-                    3) 'Correlation',
-                    4) 'Confidence interval'.
-            """
+                    else:
+                        print(".")
 
-            def get_val_err(param_str):
-                # Get relevant numbers from Parameter in string.
-                numbers = re.findall(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", param_str)
-                numbers = np.array(numbers, dtype=float)
+                # Remove intermediate files, everything needed is in func_candidates now.
+                if self.work_dir_cleanup != "never" and not self.pysr_warm_start:
+                    shutil.rmtree(self.pysr_output_directory)
 
-                # If fit returns, there will be 3 numbers.
-                # First is best-fit, then up and down unc.
-                if len(numbers) == 3:
-                    value, error = numbers[1], numbers[2]
+                print("\n")
 
-                else:
-                    value = numbers[1]
-                    error = 0
+                if self.pysr_cache is not None and not warm_start:
+                    cache_store(
+                        cache_dir=self.pysr_cache,
+                        key=key,
+                        func_candidates=func_candidates,
+                        max_size=self.pysr_cache_max_size,
+                    )
 
-                return value, error
+        else:
+            # Skip the PySR search and take the candidate functions from an existing hall of fame.
+            func_candidates = load_hall_of_fame(hall_of_fame=hall_of_fame, x=X)
 
-            refitted_params = []
-            covariances = []
-            correlations = []
-            confidence_intervals = []
+        self.timings["parse"] = time.perf_counter() - stage_start
+        stage_start = time.perf_counter()
 
-            for i in range(len(func_candidates)):
-                print(f"Re-optimizing parameterized candidate function {i + 1}/{len(func_candidates)}...")
-
-                # Do nothing for candidate without any parameter to fit.
-                if func_candidates["Parameterization"][i] == {}:
-                    refitted_params.append({})
-
-                    covariances.append({})
-                    correlations.append({})
-                    confidence_intervals.append(None)
-
-                else:
-                    refitted_param = {}
-
-                    # Run the refit.
-                    refit_result = refit_single(
-                        func_candidate=func_candidates.iloc[i],
-                        x=x,
-                        y=y,
-                        y_up=y_up,
-                        y_down=y_down,
-                        max_stderr=max_stderr,
-                        dim=dim,
-                    )
+        # The constants in the fitted functions from PySR do not have uncert. estimation,
+        # so we fix the functional forms, parameterize all constants, and refit them with LMFIT.
+        # The first step is to parameterize the fitted functions from PySR.
+        func_candidates = parameterize_func_all(func_candidates=func_candidates, dim=dim)
 
-                    # refit_single returns None when all parameter combinations
-                    # fail to converge. Fall back to initial values with zero uncertainty.
-                    if refit_result is None:
-                        for j in range(len(func_candidates["Parameterization"][i])):
-                            init_val = func_candidates["Parameterization"][i][f"a{j + 1}"]
-                            refitted_param[f"a{j + 1}"] = (round_a_number(init_val), 0, 0)
+        self.timings["parameterize"] = time.perf_counter() - stage_start
 
-                        refitted_params.append(refitted_param)
-                        covariances.append({})
-                        correlations.append({})
-                        confidence_intervals.append(None)
+        # Start from an empty dataframe and fill it up as the candidates are done.
+        self.func_candidates = pd.DataFrame()
+        done = []
 
-                    else:
-                        result, covariance, correlation, ci = refit_result
-
-                        # Either all from standard least-square or all from ci.
-                        for j in range(len(result.params)):
-                            # value, error = get_val_err(str(result.params[f'a{j+1}']))
-                            # refitted_param[f'a{j+1}'] = (
-                            #     round_a_number(value, sig_fig=6), round_a_number(error, sig_fig=6)
-                            # )
-                            try:
-                                # See LMFIT confidence intervals output format.
-                                central = ci[f"a{j + 1}"][3][1]
-                                up = ci[f"a{j + 1}"][4][1] - central
-                                down = ci[f"a{j + 1}"][2][1] - central
-
-                                refitted_param[f"a{j + 1}"] = (
-                                    round_a_number(central),
-                                    round_a_number(up),
-                                    round_a_number(down),
-                                )
+        # Re-optimization loop (ROF) to improve constants and provide unc estimation.
+        refit_results = refit_iter(
+            func_candidates=func_candidates,
+            x=X,
+            y=Y,
+            y_up=Y_up,
+            y_down=Y_down,
+            max_stderr=max_stderr,
+            dim=dim,
+            loss_weights=loss_weights,
+            analytic_jacobian=self.analytic_jacobian,
+            freeze_strategy=self.freeze_strategy,
+            max_refits=self.max_refits,
+            warm_start=self.refit_warm_start,
+            n_jobs=self.n_jobs,
+            parallel_backend=self.parallel_backend,
+        )
 
-                            except Exception:
-                                central, std_err = get_val_err(param_str=str(result.params[f"a{j + 1}"]))
+        # The time spent by the caller between the candidates is not counted.
+        stage_start = time.perf_counter()
 
-                                refitted_param[f"a{j + 1}"] = (
-                                    round_a_number(central),
-                                    round_a_number(std_err),
-                                    round_a_number(-std_err),
-                                )
+        for i, refit_result in enumerate(refit_results):
+            func_candidate = func_candidates.iloc[[i]].reset_index(drop=True)
 
-                        refitted_params.append(refitted_param)
-                        covariances.append(covariance)
-                        correlations.append(correlation)
-                        confidence_intervals.append(ci)
-
-            func_candidates["Parameters: (best-fit, +1, -1)"] = refitted_params
-            func_candidates["Covariance"] = covariances
-            func_candidates["Correlation"] = correlations
-            func_candidates["Confidence interval"] = confidence_intervals
-
-            try:
-                func_candidates = func_candidates[
-                    [
-                        "Complexity",
-                        "PySR template spec",
-                        "PySR equation",
-                        "Parameterized equation",
-                        "Parameterization",
-                        "Parameters: (best-fit, +1, -1)",
-                        "Covariance",
-                        "Correlation",
-                    ]
-                ]
-            except Exception:
-                func_candidates = func_candidates[
-                    [
-                        "Complexity",
-                        "PySR equation",
-                        "Parameterized equation",
-                        "Parameterization",
-                        "Parameters: (best-fit, +1, -1)",
-                        "Covariance",
-                        "Correlation",
-                    ]
-                ]
+            func_candidate = add_refit_results(func_candidates=func_candidate, refit_results=[refit_result])
 
-            return func_candidates
+            self.timings["refit"] += time.perf_counter() - stage_start
+            stage_start = time.perf_counter()
 
-        # Parameterize all functional forms from PySR outputs.
-        func_candidates = parameterize_func_all(func_candidates=func_candidates, dim=dim)
+            # Undo the input rescaling after the fit.
+            func_candidate = functions_unscale(
+                func_candidates=func_candidate, x=x, X=X, y_scale=y_scale, input_scale=input_rescale, dim=dim
+            )
 
-        # Re-optimization loop (ROF) to improve constants and provide unc estimation.
-        func_candidates = refit_all(
-            func_candidates=func_candidates, x=X, y=Y, y_up=Y_up, y_down=Y_down, max_stderr=max_stderr, dim=dim
-        )
+            self.timings["unscale"] += time.perf_counter() - stage_start
+            stage_start = time.perf_counter()
 
-        # Undo the input rescaling after all the fits.
-        func_candidates = functions_unscale(
-            func_candidates=func_candidates, x=x, X=X, y_scale=y_scale, input_scale=input_rescale, dim=dim
-        )
+            # Compute goodness-of-fit scores.
+            func_candidate = add_gof(func_candidates=func_candidate, x=x, y=y, y_up=y_up, y_down=y_down, dim=dim)
 
-        # Compute goodness-of-fit scores.
-        func_candidates = add_gof(func_candidates=func_candidates, x=x, y=y, y_up=y_up, y_down=y_down, dim=dim)
+            self.timings["goodness of fit"] += time.perf_counter() - stage_start
 
-        # Remove intermediate files.
-        # intermediate_files = glob('hall*')
-        # for f in intermediate_files:
-        #    os.remove(f)
+            # Update the full func_candidates dataframe containing all results so far.
+            done.append(func_candidate)
+            self.func_candidates = pd.concat(done, ignore_index=True)
 
-        # os.remove('pysr_model_temp.pkl')
-        shutil.rmtree("outputs_tmp")
+            yield self.func_candidates.iloc[-1]
 
-        # Update the full func_candidates dataframe containing all results.
-        self.func_candidates = func_candidates
+            stage_start = time.perf_counter()
 
     def save_to_csv(
         self,
@@ -965,6 +740,98 @@ class SymbolFit:
                 ]
             ].to_csv(output_dir + "candidates_compact.csv")
 
+    def save_to_npz(
+        self,
+        output_dir="./",
+    ):
+        """
+        Saves all candidate functions and their evaluation metrics in a binary format,
+        faster to write and read and smaller on disk than the CSV files:
+
+        1. `candidates.npz`: numeric content as numpy arrays, i.e., the
+           parameter values and uncertainties, covariance and correlation
+           matrix elements, goodness-of-fit metrics, and the input data.
+        2. `candidates.json`: metadata, equations and the other columns.
+
+        `SymbolFit.load(output_dir)` loads the results back, with
+        `func_candidates` equal to the saved one.
+
+        Parameters
+        ----------
+        output_dir : str
+            Output directory. Created automatically if it does not exist.
+        """
+
+        func_candidates = self.func_candidates
+
+        save_candidates(
+            columns={column: list(func_candidates[column]) for column in func_candidates.columns},
+            index=list(func_candidates.index),
+            output_dir=output_dir,
+            data={"x": self.x, "y": self.y, "y_up": self.y_up, "y_down": self.y_down},
+            settings={
+                "max_complexity": self.max_complexity,
+                "input_rescale": self.input_rescale,
+                "scale_y_by": self.scale_y_by,
+                "max_stderr": self.max_stderr,
+                "fit_y_unc": self.fit_y_unc,
+                "random_seed": self.random_seed,
+            },
+        )
+
+    @classmethod
+    def load(
+        cls,
+        output_dir="./",
+        **kwargs,
+    ):
+        """
+        Rebuilds a SymbolFit object from saved results, without refitting,
+        e.g., to rerun `plot_to_pdf()` or `print_candidate()` in a new session.
+
+        `candidates.npz` from `save_to_npz()` is read if found, which also
+        restores the input data and the fit settings. Otherwise `candidates.csv`
+        from `save_to_csv()` is read, and the data must be passed again.
+
+        Parameters
+        ----------
+        output_dir : str
+            Output directory of `save_to_npz()` or `save_to_csv()`.
+        **kwargs
+            SymbolFit arguments overriding the saved ones,
+            e.g., `x`, `y`, `y_up` and `y_down` when loading from csv.
+
+        Returns
+        -------
+        model : SymbolFit
+            With `func_candidates` loaded.
+
+        !!! tip
+            ```python
+            model = SymbolFit.load('output_dir/')
+            model.print_candidate(candidate_number=10)
+            model.plot_to_pdf(output_dir='output_dir/')
+            ```
+        """
+
+        if os.path.exists(os.path.join(output_dir, "candidates.npz")):
+            columns, index, data, settings = read_candidates(output_dir)
+
+            func_candidates = pd.DataFrame(columns, index=index)
+
+            # Back to python lists (and scalars for the default y_up = y_down = 1) as given originally.
+            arguments = {**settings, **{name: value.tolist() for name, value in data.items()}}
+
+        elif os.path.exists(os.path.join(output_dir, "candidates.csv")):
+            func_candidates = load_candidates_csv(os.path.join(output_dir, "candidates.csv"))
+
+            arguments = {}
+
+        else:
+            raise FileNotFoundError(f"No candidates.npz or candidates.csv found in {output_dir}.")
+
+        return cls(**{**arguments, **kwargs}, func_candidates=func_candidates)
+
     def plot_to_pdf(
         self,
         output_dir="./",
@@ -979,6 +846,11 @@ class SymbolFit:
         cmap=None,
         contour=None,
         sampling_95quantile=False,
+        band_method="mc",
+        sampler="random",
+        n_samples=2000,
+        sampling_rtol=None,
+        max_samples=32768,
     ):
         """
         Generates diagnostic plots for all candidate functions:
@@ -987,8 +859,11 @@ class SymbolFit:
            parameter-by-parameter uncertainty variations, plus residual and
            ratio panels.
         2. `candidates_sampling.pdf`: total uncertainty coverage bands generated
-           by Monte Carlo sampling of parameters using their covariance matrix
-           (1D only).
+           by Monte Carlo sampling of parameters using their covariance matrix.
+           For 2D data: the sample mean and relative quantile range on a finer grid,
+           the residuals and the data bins covered by the 68%/95% quantile ranges.
+           The number of samples used for each candidate is recorded in the
+           `'Band samples'` column of `func_candidates` (0 if not sampled).
         3. `candidates_gof.pdf`: summary of goodness-of-fit metrics
            (Chi2/NDF, RMSE, R2, p-value) across all candidates for comparison.
         4. `candidates_correlation.pdf`: parameter correlation matrices for
@@ -1046,11 +921,54 @@ class SymbolFit:
             value of the function on the 2D plots.
 
         sampling_95quantile : bool
-            *(1D data)* Whether to include the 95% quantile range (in addition
+            Whether to include the 95% quantile range (in addition
             to the default 68% range) when plotting total uncertainty coverage
             in candidates_sampling.pdf. Enable this to visualize wider
             uncertainty bands.
+
+        band_method : str
+            How the total uncertainty bands in candidates_sampling.pdf are computed:
+            `'mc'` by sampling the parameters (see `sampler`, `n_samples` and `sampling_rtol`),
+            or `'linear'` by propagating the covariance matrix through the gradient of the function
+            (delta method), a single evaluation per candidate. The linearized bands are only
+            accurate for candidates close to linear within their parameter uncertainties,
+            see `check_linear_bands()`. Candidates that cannot be differentiated in closed
+            form are sampled.
+
+        sampler : str
+            How the parameters are sampled for `band_method='mc'`: `'random'` (pseudo-random),
+            or `'sobol'`/`'halton'` (scrambled quasi-Monte Carlo points), which give more precise
+            percentiles for the same number of samples, see `band_precision()`.
+            With `'sobol'`, the number of samples is rounded up to a power of 2.
+
+        n_samples : int
+            Number of parameter samples per candidate for `band_method='mc'`.
+
+        sampling_rtol : float
+            If provided, the number of samples is chosen per candidate instead: starting from 256,
+            it is doubled until the 16/84 percentiles (and the 2.5/97.5 ones with
+            `sampling_95quantile`) at every data point change by less than `sampling_rtol` times
+            the half-width of the 68% range, e.g., `0.05`. Candidates with well-determined bands
+            stop early, others use up to `max_samples`.
+
+        max_samples : int
+            Hard cap on the number of samples per candidate with `sampling_rtol`.
         """
+        from .plotting import (
+            plot_all_corr,
+            plot_all_gof,
+            plot_all_syst_all_func_1D,
+            plot_all_syst_all_func_2D,
+            plot_total_unc_coverage_all_func_1D,
+            plot_total_unc_coverage_all_func_2D,
+        )
+
+        # Checked before plotting, since the pages fall back to no bands on sampling failures.
+        if band_method not in ("mc", "linear"):
+            raise ValueError(f"band_method must be 'mc' or 'linear', got {band_method!r}.")
+
+        if sampler not in ("random", "sobol", "halton"):
+            raise ValueError(f"sampler must be 'random', 'sobol' or 'halton', got {sampler!r}.")
 
         x = self.x
         y = self.y
@@ -1095,20 +1013,26 @@ class SymbolFit:
                 logx=plot_logx,
             )
 
-            plot_total_unc_coverage_all_func_1D(
+            samples_used = plot_total_unc_coverage_all_func_1D(
                 func_candidates=func_candidates,
                 x=x,
                 bin_widths_1d=bin_widths_1d,
                 y=y,
                 y_up=y_up,
                 y_down=y_down,
-                n_samples=2000,
+                n_samples=n_samples,
                 sampling_95quantile=sampling_95quantile,
                 pdf_path=output_dir + "candidates_sampling.pdf",
                 logy=plot_logy,
                 logx=plot_logx,
+                band_method=band_method,
+                sampler=sampler,
+                sampling_rtol=sampling_rtol,
+                max_samples=max_samples,
             )
 
+            self.func_candidates["Band samples"] = samples_used
+
         elif dim == 2:
             if bin_edges_2d is not None:
                 if not isinstance(bin_edges_2d, (list, np.ndarray)):
@@ -1131,6 +1055,30 @@ class SymbolFit:
                 contour=contour,
             )
 
+            samples_used = plot_total_unc_coverage_all_func_2D(
+                func_candidates=func_candidates,
+                x=x,
+                bin_edges_2d=bin_edges_2d,
+                y=y,
+                y_up=y_up,
+                y_down=y_down,
+                n_samples=n_samples,
+                sampling_95quantile=sampling_95quantile,
+                pdf_path=output_dir + "candidates_sampling.pdf",
+                logx0=plot_logx0,
+                logx1=plot_logx1,
+                logy=plot_logy,
+                cbar_min=cbar_min,
+                cbar_max=cbar_max,
+                cmap=cmap,
+                band_method=band_method,
+                sampler=sampler,
+                sampling_rtol=sampling_rtol,
+                max_samples=max_samples,
+            )
+
+            self.func_candidates["Band samples"] = samples_used
+
         plot_all_corr(
             func_candidates=func_candidates,
             y_up=y_up,
@@ -1269,3 +1217,162 @@ class SymbolFit:
                 print("<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<\n")
             else:
                 print(f"Error: candidate_number must be 0-{str(len(func_candidates) - 1)}")
+
+    def check_linear_bands(self, n_samples=2000, tolerance=0.2):
+        """
+        Compares the linearized uncertainty bands (`band_method='linear'`) of each candidate
+        with the sampled ones (`band_method='mc'`) at the data points, and flags the candidates
+        where they disagree, i.e., where the function is not close to linear within
+        the parameter uncertainties.
+
+        Parameters
+        ----------
+        n_samples : int
+            Number of parameter samples for the sampled bands.
+        tolerance : float
+            Largest accepted difference between the linearized and the sampled 16/84 percentiles,
+            relative to the half-width of the sampled 68% range. The sampling alone gives up to
+            about 0.1 with 2000 samples.
+
+        Returns
+        -------
+        diagnostics : DataFrame
+            One row per candidate with its `'Band disagreement'`, and `'Linear bands OK'`
+            if it is within the tolerance (always False for candidates that cannot be
+            differentiated in closed form).
+        """
+
+        x, _, _, _, _, dim = dataset_formatting(
+            x=self.x, y=self.y, y_up=self.y_up, y_down=self.y_down, fit_y_unc=self.fit_y_unc
+        )
+
+        disagreements = []
+
+        for i in range(len(self.func_candidates)):
+            func_candidate = self.func_candidates.iloc[i]
+            param = func_candidate["Parameters: (best-fit, +1, -1)"]
+
+            # Nothing to compare without any varied parameter.
+            if not any(values[1] > 0 for values in param.values()):
+                disagreements.append(0.0)
+                continue
+
+            disagreements.append(
+                band_disagreement(
+                    func_str=func_candidate["Parameterized equation, unscaled"],
+                    param=param,
+                    cov=func_candidate["Covariance"],
+                    x=x,
+                    dim=dim,
+                    n_samples=n_samples,
+                )
+            )
+
+        diagnostics = pd.DataFrame(
+            {
+                "Parameterized equation, unscaled": self.func_candidates["Parameterized equation, unscaled"],
+                "Band disagreement": disagreements,
+            },
+            index=self.func_candidates.index,
+        )
+        diagnostics["Linear bands OK"] = diagnostics["Band disagreement"] <= tolerance
+
+        for i in np.flatnonzero(~diagnostics["Linear bands OK"].to_numpy()):
+            print(
+                f"Candidate #{i}: linearized and sampled bands disagree by "
+                f"{diagnostics['Band disagreement'].iloc[i]:.2f} > {tolerance}, use band_method='mc'."
+            )
+
+        return diagnostics
+
+    def band_precision(self, n_samples=512, sampler="sobol", n_replicates=8):
+        """
+        Estimates the precision of the sampled uncertainty bands of each candidate at the data points,
+        to choose the number of samples (and the sampler) of `plot_to_pdf()` and `inference.Candidate.bands()`.
+
+        The samples are split into independent replicates, and the standard error of each
+        percentile is the spread of the replicates divided by `sqrt(n_replicates)`
+        (conservative for the quasi-Monte Carlo samplers).
+
+        Parameters
+        ----------
+        n_samples : int
+            Total number of samples per candidate (rounded up to `n_replicates` times
+            a power of 2 for `'sobol'`).
+        sampler : str
+            `'random'`, `'sobol'` or `'halton'`, see `plot_to_pdf()`.
+        n_replicates : int
+            Number of independent replicates.
+
+        Returns
+        -------
+        precision : DataFrame
+            One row per candidate with the standard error of the 16/84 and 2.5/97.5 percentiles,
+            relative to the half-width of the 68% range at the same data point, and the median over
+            the data points (e.g., 0.02 means the band edges are typically known to 2% of the band width).
+
+        !!! tip
+            ```python
+            # Typically as precise as about 4 times more random samples.
+            print(model.band_precision(n_samples=512, sampler='sobol'))
+            model.plot_to_pdf(sampler='sobol')
+            ```
+        """
+
+        x, _, _, _, _, dim = dataset_formatting(
+            x=self.x, y=self.y, y_up=self.y_up, y_down=self.y_down, fit_y_unc=self.fit_y_unc
+        )
+
+        rows = []
+
+        for i in range(len(self.func_candidates)):
+            func_candidate = self.func_candidates.iloc[i]
+            param = func_candidate["Parameters: (best-fit, +1, -1)"]
+
+            row = {"Parameterized equation, unscaled": func_candidate["Parameterized equation, unscaled"]}
+
+            # No band without any varied parameter.
+            if not any(values[1] > 0 for values in param.values()):
+                rows.append(row)
+                continue
+
+            (_, _, lower_1sigma, upper_1sigma, _), errors = band_errors(
+                func_str=func_candidate["Parameterized equation, unscaled"],
+                param=param,
+                cov=func_candidate["Covariance"],
+                x=x,
+                dim=dim,
+                n_samples=n_samples,
+                sampler=sampler,
+                n_replicates=n_replicates,
+            )
+
+            half_width = np.reshape((upper_1sigma - lower_1sigma) / 2, -1)
+            valid = half_width > 0
+
+            relative_errors = [np.reshape(error, -1)[valid] / half_width[valid] for error in errors]
+
+            if np.any(valid):
+                row["Rel. error: 16/84"] = np.median(np.concatenate([relative_errors[1], relative_errors[2]]))
+                row["Rel. error: 2.5/97.5"] = np.median(np.concatenate([relative_errors[0], relative_errors[3]]))
+
+            rows.append(row)
+
+        return pd.DataFrame(rows, index=self.func_candidates.index)
+
+    def pysr_cache_stats(self):
+        """
+        Report of the PySR cache set by `pysr_cache`.
+
+        Returns
+        -------
+        stats : dict
+            Number of cached searches (`entries`), their total `size` in bytes,
+            number of cache `hits` and `misses`, the `hit rate`, and number of
+            `evictions` to keep the cache under `pysr_cache_max_size`.
+        """
+
+        if self.pysr_cache is None:
+            raise ValueError("No PySR cache, set pysr_cache to a directory to enable it.")
+
+        return cache_stats(cache_dir=self.pysr_cache)
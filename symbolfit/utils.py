@@ -1,14 +1,11 @@
 import os  # noqa: F401 -- re-exported via star imports to other modules
 import re
 
-import pandas as pd
-import sympy
-from pysr import PySRRegressor
-
 from .math_defs import *
 
-pd.set_option("display.max_colwidth", None)
-pd.options.mode.chained_assignment = None
+# pandas, sympy and pysr are imported in the functions using them,
+# so that evaluating saved candidates does not load them (nor start Julia).
+
 np.seterr(divide="ignore", invalid="ignore")
 
 
@@ -29,6 +26,8 @@ def round_numbers_in_sympy_expr(sympy_expr, sig_fig=3):
     Round all numbers in a sympy expression to a certain significant figure.
     """
 
+    import sympy
+
     def rounding(x, sig=sig_fig):
         if x.is_Number and not x.is_Integer:
             return x.round(sig - 1 - int(sympy.floor(sympy.log(abs(x), 10))))
@@ -41,6 +40,22 @@ def round_numbers_in_sympy_expr(sympy_expr, sig_fig=3):
     return rounded_expr
 
 
+def default_pysr_config():
+    """
+    Default PySR configuration of SymbolFit (when pysr_config=None).
+    """
+
+    from pysr import PySRRegressor
+
+    return PySRRegressor(
+        model_selection="accuracy",
+        niterations=100,
+        maxsize=40,
+        binary_operators=["+", "*", "/", "^"],
+        elementwise_loss="loss(y, y_pred, weights) = (y - y_pred)^2 * weights",
+    )
+
+
 def parse_pysr_equ(pysr_dir, x):
     """
     Extract the function candidates from the PySR output file (.pkl) and create a dataframe for them.
@@ -59,6 +74,10 @@ def parse_pysr_equ(pysr_dir, x):
     A dataframe containing the function candidates, complexity, and loss from the PySR fit.
     """
 
+    import pandas as pd
+    import sympy
+    from pysr import PySRRegressor
+
     model = PySRRegressor.from_file(run_directory=pysr_dir)
 
     equation = []
@@ -205,3 +224,160 @@ def parse_pysr_equ(pysr_dir, x):
         )
 
     return df
+
+
+def equation_complexity(equ):
+    """
+    Complexity of an equation as the number of nodes in its expression tree
+    (constants, variables and operators), close to the default complexity in PySR.
+    """
+
+    import sympy
+
+    return sum(1 for _ in sympy.preorder_traversal(sympy.sympify(equ)))
+
+
+def load_hall_of_fame(hall_of_fame, x):
+    """
+    Create the dataframe of function candidates, as from parse_pysr_equ(),
+    from an existing PySR hall of fame instead of a new PySR fit.
+
+    Arguments
+    ---------
+    hall_of_fame (str, list or pd.dataframe):
+        One of:
+            1) a PySR run directory (containing hall_of_fame.csv and checkpoint.pkl),
+               or a PySR output directory containing run directories (the latest one is used),
+            2) a csv file saved by SymbolFit.save_to_csv() (candidates.csv),
+            3) a list of equations in str like ['1.2*x0 + exp(3.4*x0)', ...],
+            4) a dataframe with a 'PySR equation' column, like SymbolFit.func_candidates.
+        The equations are in terms of the scaled x (the inputs given to PySR).
+
+    x (np.ndarray):
+        Independent variable (scaled).
+
+
+    Returns
+    -------
+    A dataframe containing the function candidates and complexity,
+    computed with equation_complexity() if not provided.
+    """
+
+    import pandas as pd
+
+    if isinstance(hall_of_fame, (str, os.PathLike)):
+        hall_of_fame = os.fspath(hall_of_fame)
+
+        if os.path.isdir(hall_of_fame):
+            if os.path.exists(os.path.join(hall_of_fame, "hall_of_fame.csv")):
+                return parse_pysr_equ(pysr_dir=hall_of_fame, x=x)
+
+            run_directories = [
+                os.path.join(hall_of_fame, d)
+                for d in os.listdir(hall_of_fame)
+                if os.path.exists(os.path.join(hall_of_fame, d, "hall_of_fame.csv"))
+            ]
+
+            if len(run_directories) == 0:
+                raise FileNotFoundError(f"No PySR run directory (with hall_of_fame.csv) found in {hall_of_fame}.")
+
+            return parse_pysr_equ(pysr_dir=max(run_directories, key=os.path.getmtime), x=x)
+
+        hall_of_fame = pd.read_csv(hall_of_fame)
+
+    if isinstance(hall_of_fame, pd.DataFrame):
+        if "PySR equation" not in hall_of_fame.columns:
+            raise ValueError("The hall of fame dataframe must have a 'PySR equation' column.")
+
+        columns = [c for c in ["PySR template spec", "PySR equation", "Complexity"] if c in hall_of_fame.columns]
+        func_candidates = hall_of_fame[columns].reset_index(drop=True)
+
+    elif isinstance(hall_of_fame, (list, tuple)):
+        func_candidates = pd.DataFrame({"PySR equation": [str(equ) for equ in hall_of_fame]})
+
+    else:
+        raise TypeError(
+            "hall_of_fame must be a PySR run directory, a candidates csv file, a list of equations or a dataframe."
+        )
+
+    # Same format as the equations from parse_pysr_equ().
+    func_candidates["PySR equation"] = [equ.replace("^", "**") for equ in func_candidates["PySR equation"]]
+
+    if "Complexity" not in func_candidates.columns:
+        func_candidates["Complexity"] = [equation_complexity(equ) for equ in func_candidates["PySR equation"]]
+
+    return func_candidates
+
+
+def warm_start_savings(pysr_searches):
+    """
+    Iterations and time saved by the last (warm-started) PySR search,
+    compared with the last cold start.
+
+    Arguments
+    ---------
+    pysr_searches (list):
+        Record of the PySR searches [{'warm start': bool, 'niterations': int, 'time': float}, ...].
+
+
+    Returns
+    -------
+    A dict with the iterations and time saved (negative if the warm start took longer),
+    or None if there was no cold start to compare with.
+    """
+
+    cold_starts = [search for search in pysr_searches[:-1] if not search["warm start"]]
+
+    if len(cold_starts) == 0:
+        return None
+
+    return {
+        "iterations saved": cold_starts[-1]["niterations"] - pysr_searches[-1]["niterations"],
+        "time saved": cold_starts[-1]["time"] - pysr_searches[-1]["time"],
+    }
+
+
+def run_pysr(pysr_model, X, Y, weights, output_directory):
+    """
+    Run the PySR search and locate its run directory.
+
+    Arguments
+    ---------
+    pysr_model (PySRRegressor):
+        PySR model to fit.
+
+    X, Y (np.ndarray):
+        Data to fit (scaled).
+
+    weights (np.ndarray):
+        Loss weights.
+
+    output_directory (str):
+        Directory where PySR creates the run directory.
+
+
+    Returns
+    -------
+    run_directory (str):
+        The run directory (with hall_of_fame.csv and checkpoint.pkl) of this search,
+        or the latest modified one if PySR continued in the directory of a previous run (warm start).
+    """
+
+    previous_runs = set(os.listdir(output_directory)) if os.path.exists(output_directory) else set()
+
+    pysr_model.set_params(output_directory=output_directory)
+
+    pysr_model.fit(X, Y, weights=weights)
+
+    run_directories = [
+        os.path.join(output_directory, d)
+        for d in os.listdir(output_directory)
+        if os.path.isdir(os.path.join(output_directory, d))
+    ]
+
+    new_run_directories = [d for d in run_directories if os.path.basename(d) not in previous_runs]
+
+    if len(new_run_directories) == 1:
+        return new_run_directories[0]
+
+    return max(run_directories, key=os.path.getmtime)
@@ -0,0 +1,344 @@
+import copy
+import importlib
+import multiprocessing
+import queue
+import tempfile
+import time
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from .batch import fit_dataset
+from .utils import default_pysr_config, run_pysr
+
+
+def warm_up_pysr(pysr_config, warm_up=True):
+    """
+    Start the Julia runtime and compile the PySR search with a tiny search on toy data,
+    so that the fits served afterwards in this process only pay for the search itself.
+
+    Arguments
+    ---------
+    pysr_config (PySRRegressor):
+        PySR configuration of the fits to be served, the warm-up runs a copy of it with niterations=1.
+        None for the SymbolFit default.
+
+    warm_up (bool):
+        If False, only start Julia.
+
+
+    Returns
+    -------
+    timings (dict):
+        Wall time [s] of 'import' (PySR and Julia startup) and 'warm-up' (compilation of the search).
+    """
+
+    start = time.perf_counter()
+
+    importlib.import_module("pysr")
+
+    timings = {"import": time.perf_counter() - start}
+
+    start = time.perf_counter()
+
+    if warm_up:
+        pysr_model = copy.deepcopy(pysr_config) if pysr_config is not None else default_pysr_config()
+        pysr_model.set_params(niterations=1)
+
+        X = np.linspace(0, 1, 16).reshape(-1, 1)
+        Y = 1 + X**2
+
+        with tempfile.TemporaryDirectory(prefix="symbolfit_warm_up_") as output_directory:
+            run_pysr(pysr_model, X, Y, np.ones_like(Y), output_directory)
+
+    timings["warm-up"] = time.perf_counter() - start
+
+    return timings
+
+
+def serve(jobs, results, pysr_config, warm_up):
+    """
+    Main loop of the worker process: warm up, then fit the datasets from the jobs queue
+    until a None job is received.
+
+    Arguments
+    ---------
+    jobs (multiprocessing.Queue):
+        Jobs (dict of fit_dataset() arguments and 'submit time'), None to stop.
+
+    results (multiprocessing.Queue):
+        The startup report first, then the fit_dataset() result of each job, in order.
+
+    pysr_config (PySRRegressor):
+        PySR configuration used by default for the fits (and the warm-up), None for the SymbolFit default.
+
+    warm_up (bool):
+        If True, compile the PySR search before serving any job.
+    """
+
+    try:
+        startup_timings = warm_up_pysr(pysr_config, warm_up=warm_up)
+        results.put({"startup timings": startup_timings, "error": None})
+
+    except Exception:
+        results.put({"startup timings": None, "error": traceback.format_exc()})
+        return
+
+    while True:
+        job = jobs.get()
+
+        if job is None:
+            break
+
+        submit_time = job.pop("submit time")
+        queue_time = time.time() - submit_time
+
+        if job["pysr_config"] is None:
+            job["pysr_config"] = pysr_config
+
+        result = fit_dataset(**job)
+        result["queue time"] = queue_time
+
+        results.put(result)
+
+
+def receive(results, process, poll_interval=1.0):
+    """
+    Waits for the next message of the worker process, without hanging if the worker dies
+    (e.g., a crash of Julia or killed for running out of memory).
+
+    Arguments
+    ---------
+    results (multiprocessing.Queue):
+        Results queue of the worker.
+
+    process (multiprocessing.Process):
+        The worker process.
+
+    poll_interval (float):
+        Time [s] between the checks of the worker process.
+
+
+    Returns
+    -------
+    message (dict):
+        The next message from the results queue, RuntimeError is raised if the worker died.
+    """
+
+    while True:
+        # Checked before waiting, so that the results sent before the worker exited are still received.
+        alive = process.is_alive()
+
+        try:
+            return results.get(timeout=poll_interval)
+
+        except queue.Empty:
+            if not alive:
+                raise RuntimeError(f"The PySR worker died (exit code {process.exitcode}).") from None
+
+
+class FitWorker:
+    """
+    A persistent worker process holding a warmed-up PySR/Julia runtime,
+    which serves successive SymbolFit fits from a queue.
+
+    Every new python process fitting with PySR first pays for the Julia startup
+    and the compilation of the search. The worker pays for them once, so that
+    short searches (small `niterations`) are not dominated by this fixed cost.
+
+    Parameters
+    ----------
+    pysr_config : PySRRegressor | None
+        PySR configuration used for the warm-up and, by default, for the fits.
+        `None` for the SymbolFit default.
+    warm_up : bool
+        If `True`, run a tiny search (`niterations=1`) on toy data at startup to
+        compile the PySR search before the first fit, otherwise only start Julia.
+    start_method : str
+        `multiprocessing` start method of the worker process (`'spawn'` or `'forkserver'`).
+        Avoid `'fork'` once PySR is imported in this process, as Julia does not support forking.
+        With `'spawn'`, scripts start the worker under `if __name__ == '__main__':`.
+
+    !!! tip
+        ```python
+        from symbolfit.worker import FitWorker
+
+        with FitWorker(pysr_config=pysr_config) as worker:
+            for name, dataset in datasets.items():
+                worker.submit(dataset, name=name, max_stderr=20)
+
+            for _ in datasets:
+                result = worker.result()
+                print(result['name'], result['timings']['PySR search'])
+
+            print(worker.timing_summary())
+        ```
+
+    The startup time is reported in `worker.startup_timings`, separately from
+    the time of each fit (`result['timings']`, see `SymbolFit.fit()`).
+    """
+
+    def __init__(self, pysr_config=None, warm_up=True, start_method="spawn"):
+        # The default PySR configuration is built in the worker, so that this process does not start Julia.
+        self.pysr_config = pysr_config
+        self.warm_up = warm_up
+        self.fit_results = []
+        self.num_pending = 0
+
+        context = multiprocessing.get_context(start_method)
+
+        self.jobs = context.Queue()
+        self.results = context.Queue()
+        self.process = context.Process(target=serve, args=(self.jobs, self.results, pysr_config, warm_up), daemon=True)
+
+        print("Starting the PySR worker...")
+
+        start = time.perf_counter()
+
+        self.process.start()
+
+        ready = receive(self.results, self.process)
+
+        if ready["error"] is not None:
+            self.process.join()
+            raise RuntimeError(f"The PySR worker failed to start:\n{ready['error']}")
+
+        self.startup_timings = {**ready["startup timings"], "total": time.perf_counter() - start}
+
+        print(
+            f"    >>> ready in {self.startup_timings['total']:.1f} s "
+            f"(import {self.startup_timings['import']:.1f} s, warm-up {self.startup_timings['warm-up']:.1f} s)"
+        )
+
+    def submit(self, dataset, name=None, pysr_config=None, output_dir=None, **options):
+        """
+        Queues a fit, its result is returned by `result()` (in the order of submission).
+
+        Parameters
+        ----------
+        dataset : dict
+            SymbolFit arguments of this dataset, at least `x`, `y` (and `y_up`, `y_down`).
+        name : str | None
+            Name of the dataset, `None` for its submission number.
+        pysr_config : PySRRegressor | None
+            PySR configuration of this fit, `None` for the one of the worker.
+        output_dir : str | None
+            If provided, the results are saved to `output_dir/<name>/` as with `SymbolFit.save_to_csv()`.
+        **options
+            Other SymbolFit arguments, e.g., `max_stderr=20`.
+
+        Returns
+        -------
+        name : str
+            Name of the dataset.
+        """
+
+        if not self.process.is_alive():
+            raise RuntimeError("The PySR worker is closed.")
+
+        if name is None:
+            name = str(len(self.fit_results) + self.num_pending)
+
+        self.jobs.put(
+            {
+                "name": name,
+                "dataset": dataset,
+                "pysr_config": pysr_config,
+                "options": options,
+                "output_dir": output_dir,
+                "submit time": time.time(),
+            }
+        )
+
+        self.num_pending += 1
+
+        return name
+
+    def result(self):
+        """
+        Waits for the next fit submitted. Raises `RuntimeError` if the worker process died
+        (e.g., a crash of Julia), instead of waiting forever.
+
+        Returns
+        -------
+        result : dict
+            `'name'`, `'func_candidates'` (`None` if the fit failed), `'timings'` (per stage, see `SymbolFit.fit()`),
+            `'total time'` (of the fit), `'queue time'` (waiting for the worker) and `'error'`
+            (traceback of the failure, `None` if succeeded).
+        """
+
+        if self.num_pending == 0:
+            raise RuntimeError("No fit submitted.")
+
+        try:
+            result = receive(self.results, self.process)
+
+        except RuntimeError:
+            # The fits still pending are lost with the worker.
+            self.num_pending = 0
+            raise
+
+        self.num_pending -= 1
+        self.fit_results.append(result)
+
+        return result
+
+    def fit(self, dataset, **kwargs):
+        """
+        Submits a fit and waits for its result, see `submit()` and `result()`.
+        """
+
+        self.submit(dataset, **kwargs)
+
+        return self.result()
+
+    def timing_summary(self):
+        """
+        Startup time of the worker and time of each fit served, to show the amortization of the startup.
+
+        Returns
+        -------
+        summary : DataFrame
+            One row for the startup and one per fit with the wall time [s] of each stage,
+            and the startup time amortized over the fits served so far.
+        """
+
+        rows = [{"Fit": "startup", **{f"Time: {k} [s]": v for k, v in self.startup_timings.items()}}]
+
+        for result in self.fit_results:
+            row = {"Fit": result["name"], "Status": "ok" if result["error"] is None else "failed"}
+
+            for stage, t in result["timings"].items():
+                row[f"Time: {stage} [s]"] = t
+
+            row["Time: total [s]"] = result["total time"]
+            row["Time: queue [s]"] = result["queue time"]
+
+            row["Time: total + amortized startup [s]"] = result["total time"] + self.startup_timings["total"] / len(
+                self.fit_results
+            )
+
+            rows.append(row)
+
+        return pd.DataFrame(rows).set_index("Fit").round(3)
+
+    def close(self):
+        """
+        Stops the worker process after the fits already submitted.
+        """
+
+        if self.process.is_alive():
+            self.jobs.put(None)
+
+            # Collect the remaining results so that the worker is not blocked on a full queue.
+            while self.num_pending > 0:
+                self.result()
+
+            self.process.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
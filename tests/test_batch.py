@@ -0,0 +1,117 @@
+import importlib.util
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import symbolfit
+
+
+class SlopePySR:
+    # Stands in for PySRRegressor: "finds" the exponential slope of the (scaled) data.
+    def __init__(self):
+        self.params = {"niterations": 10}
+
+    def set_params(self, **params):
+        self.params.update(params)
+
+    def get_params(self):
+        return dict(self.params)
+
+    def fit(self, X, y, weights=None):
+        if not np.all(y > 0):
+            raise ValueError("Cannot fit a non-positive spectrum.")
+
+        run_directory = os.path.join(self.params["output_directory"], "run")
+        os.makedirs(run_directory)
+
+        slope = round(float(-np.log(y[-1, 0] / y[0, 0])), 1)
+
+        pd.DataFrame({"PySR equation": [f"3.0*exp(-{slope}*x0)", "1.0 + 0.1*x0"], "Complexity": [6, 5]}).to_csv(
+            os.path.join(run_directory, "hall_of_fame.csv")
+        )
+
+
+class CrashingPySR(SlopePySR):
+    # Kills its process in the middle of the search, as a crash of Julia would.
+    def fit(self, X, y, weights=None):
+        time.sleep(1)
+        os._exit(3)
+
+
+def use_stub_pysr(monkeypatch):
+    # The fake PySR module reads back the hall of fame, in this process and in the spawned workers
+    # (they start from the same sys.path).
+    stub_dir = os.path.join(os.path.dirname(__file__), "stubs")
+
+    monkeypatch.syspath_prepend(stub_dir)
+
+    spec = importlib.util.spec_from_file_location("pysr", os.path.join(stub_dir, "pysr.py"))
+    pysr = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(pysr)
+
+    monkeypatch.setitem(sys.modules, "pysr", pysr)
+
+
+def spectrum(slope, norm=1e4):
+    x = np.linspace(100, 2000, 40)
+    y = norm * np.exp(-slope * (x - 100) / 1900)
+    y_unc = 0.02 * y + 1
+
+    return {"x": x.tolist(), "y": y.tolist(), "y_up": y_unc.tolist(), "y_down": y_unc.tolist()}
+
+
+datasets = {"dijet": spectrum(3.0), "dimuon": spectrum(2.0), "broken": spectrum(1.0, norm=-1.0)}
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_fit_many(tmp_path, monkeypatch, max_workers):
+    use_stub_pysr(monkeypatch)
+
+    results, summary = symbolfit.fit_many(
+        datasets,
+        pysr_config=SlopePySR(),
+        max_workers=max_workers,
+        output_dir=str(tmp_path),
+        max_stderr=40,
+    )
+
+    assert list(results) == ["dijet", "dimuon"]
+    assert list(results["dijet"]["PySR equation"]) == ["3.0*exp(-3.0*x0)", "0.1*x0 + 1.0"]
+    assert list(results["dimuon"]["PySR equation"]) == ["3.0*exp(-2.0*x0)", "0.1*x0 + 1.0"]
+
+    assert list(summary.index) == ["dijet", "dimuon", "broken"]
+    assert list(summary["Status"]) == ["ok", "ok", "failed"]
+    assert list(summary["Candidates"]) == [2, 2, 0]
+    assert summary["Error"]["broken"] == "ValueError: Cannot fit a non-positive spectrum."
+    assert "exp(" in summary["Best candidate"]["dijet"]
+    assert np.isfinite(summary["Best Chi2/NDF"]["dijet"])
+
+    for stage in ["data processing", "PySR search", "parse", "parameterize", "refit", "unscale", "goodness of fit"]:
+        assert (summary[f"Time: {stage} [s]"][["dijet", "dimuon"]] >= 0).all()
+
+    assert (summary["Time: total [s]"] > 0).all()
+
+    assert sorted(os.listdir(tmp_path)) == ["dijet", "dimuon"]
+    assert os.path.exists(tmp_path / "dijet" / "candidates.csv")
+
+
+def test_fit_many_failures(monkeypatch):
+    use_stub_pysr(monkeypatch)
+
+    failing = {
+        "dijet": datasets["dijet"],
+        "typo": {**datasets["dimuon"], "max_stderrr": 40},
+        "crash": {**datasets["dimuon"], "pysr_config": CrashingPySR()},
+    }
+
+    # Neither an invalid option nor a crashed worker stops the batch.
+    _, summary = symbolfit.fit_many(failing, pysr_config=SlopePySR(), max_workers=2, max_stderr=40)
+
+    assert list(summary.index) == ["dijet", "typo", "crash"]
+    assert list(summary["Status"][["typo", "crash"]]) == ["failed", "failed"]
+    assert "max_stderrr" in summary["Error"]["typo"]
+    assert "BrokenProcessPool" in summary["Error"]["crash"]
@@ -0,0 +1,512 @@
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from symbolfit.evaluate import (
+    adaptive_func_sampling,
+    add_gof,
+    band_disagreement,
+    band_errors,
+    compile_func,
+    func_evaluate,
+    func_sampling,
+    func_sampling_1d,
+    linear_bands,
+    sampled_bands,
+    streamed_bands,
+)
+
+rng = np.random.default_rng(7)
+
+# Two datasets of different dimension evaluated at the same time.
+x_1d = np.reshape(np.linspace(10, 500, 300), (-1, 1))
+x_2d = rng.uniform(1, 5, size=(400, 2))
+
+candidates_1d = pd.DataFrame(
+    {
+        "Parameterized equation, unscaled": [
+            "a1*exp(-a2*x0)",
+            "a1*gauss(a2*(x0 - a3)) + a4",
+            "1.5*(a1 + a2*x0)",
+            "2.0*(a1)",
+        ],
+        "Parameterization": [
+            {"a1": 110.0, "a2": 0.011},
+            {"a1": 50.0, "a2": 0.02, "a3": 200.0, "a4": 1.0},
+            {"a1": 3.0, "a2": 0.5},
+            {"a1": 4.0},
+        ],
+        "Parameters: (best-fit, +1, -1)": [
+            {"a1": (100.0, 2.0, -2.0), "a2": (0.01, 0.001, -0.001)},
+            {"a1": (55.0, 1.0, -1.5), "a2": (0.021, 0.002, -0.002), "a3": (210.0, 3.0, -3.0), "a4": (0.5, 0, 0)},
+            {"a1": (2.5, 0.1, -0.1), "a2": (0.45, 0.01, -0.01)},
+            {"a1": (4.2, 0.3, -0.3)},
+        ],
+    }
+)
+
+candidates_2d = pd.DataFrame(
+    {
+        "Parameterized equation, unscaled": ["a1*x0 + a2*exp(-a3*x1)", "a1*tanh(x0*x1) + a2"],
+        "Parameterization": [{"a1": 1.0, "a2": 2.0, "a3": 0.5}, {"a1": 3.0, "a2": 0.1}],
+        "Parameters: (best-fit, +1, -1)": [
+            {"a1": (1.1, 0.1, -0.1), "a2": (2.2, 0.2, -0.2), "a3": (0.4, 0.05, -0.05)},
+            {"a1": (2.9, 0.3, -0.3), "a2": (0.12, 0.01, -0.01)},
+        ],
+    }
+)
+
+datasets = [(candidates_1d, x_1d, 1), (candidates_2d, x_2d, 2)]
+
+
+def evaluation_jobs():
+    jobs = []
+
+    for func_candidates, x, dim in datasets:
+        for i in range(len(func_candidates)):
+            func_candidate = func_candidates.iloc[i]
+
+            jobs.append((func_candidate, x, dim, None, None, False))
+            jobs.append((func_candidate, x, dim, None, None, True))
+
+            for param in func_candidate["Parameters: (best-fit, +1, -1)"]:
+                jobs.append((func_candidate, x, dim, param, "+", False))
+                jobs.append((func_candidate, x, dim, param, "-", False))
+
+    return jobs
+
+
+def evaluate(job):
+    func_candidate, x, dim, param_shifted, sigma_pm, evaluate_pysr = job
+
+    return func_evaluate(
+        func_candidate, x, dim, param_shifted=param_shifted, sigma_pm=sigma_pm, evaluate_pysr=evaluate_pysr
+    )
+
+
+def test_func_evaluate_threads():
+    jobs = evaluation_jobs()
+
+    expected = [evaluate(job) for job in jobs]
+
+    # Interleave the 1D and 2D evaluations many times over in a thread pool.
+    n_rounds = 50
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(evaluate, jobs * n_rounds))
+
+    for i, result in enumerate(results):
+        np.testing.assert_array_equal(result, expected[i % len(jobs)])
+
+
+def test_add_gof_threads():
+    datasets_repeated = datasets * 20
+
+    y_all = [
+        func_evaluate(func_candidates.iloc[0], x, dim) + rng.normal(0, 0.1, (x.shape[0], 1))
+        for func_candidates, x, dim in datasets_repeated
+    ]
+
+    def gof(i):
+        func_candidates, x, dim = datasets_repeated[i]
+        y_unc = np.full(y_all[i].shape, 0.1)
+
+        return add_gof(func_candidates=func_candidates.copy(), x=x, y=y_all[i], y_up=y_unc, y_down=y_unc, dim=dim)
+
+    expected = [gof(i) for i in range(len(datasets_repeated))]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(gof, range(len(datasets_repeated))))
+
+    for result, exp in zip(results, expected):
+        pd.testing.assert_frame_equal(result, exp)
+
+
+def test_func_sampling_2d(tmp_path):
+    # Linear in the parameters: the sampled bands are Gaussian with a known sigma at each point.
+    param = {"a1": (2.0, 0.1, -0.1), "a2": (1.0, 0.2, -0.2), "a3": (0.5, 0, 0)}
+    cov = {"a1, a1": 0.01, "a1, a2": -0.012, "a2, a2": 0.04}
+
+    x_grid = np.column_stack([g.flatten() for g in np.meshgrid(np.linspace(1, 3, 40), np.linspace(0, 2, 30))])
+
+    np.random.seed(3)
+
+    (bands,) = func_sampling(
+        func_str="a1*x0 + a2*x1 + a3",
+        param=param,
+        cov=cov,
+        x_grids=[x_grid],
+        dim=2,
+        n_samples=20000,
+        chunk_size=97,
+    )
+
+    mean, lower_2sigma, lower_1sigma, upper_1sigma, upper_2sigma = bands
+
+    central = 2.0 * x_grid[:, 0] + 1.0 * x_grid[:, 1] + 0.5
+    sigma = np.sqrt(0.01 * x_grid[:, 0] ** 2 + 2 * -0.012 * x_grid[:, 0] * x_grid[:, 1] + 0.04 * x_grid[:, 1] ** 2)
+
+    assert mean.shape == (x_grid.shape[0],)
+    np.testing.assert_allclose(mean, central, atol=0.02)
+    np.testing.assert_allclose(upper_1sigma - lower_1sigma, 2 * sigma, rtol=0.05, atol=0.01)
+    np.testing.assert_allclose(upper_2sigma - lower_2sigma, 2 * 1.96 * sigma, rtol=0.05, atol=0.01)
+
+    # The 1D wrapper keeps the shapes of both grids.
+    x = np.reshape(np.linspace(0, 1, 20), (-1, 1))
+    x_finer = np.linspace(0, 1, 500)
+
+    func_bands, func_bands_finer = func_sampling_1d(
+        func_str="a1*x0 + a2",
+        param={"a1": (1.0, 0.1, -0.1), "a2": (0.5, 0.1, -0.1)},
+        cov={},
+        x=x,
+        x_finer=x_finer,
+        n_samples=500,
+    )
+
+    assert all(band.shape == x.shape for band in func_bands)
+    assert all(band.shape == x_finer.shape for band in func_bands_finer)
+
+    # No varied parameter: the bands collapse onto the best-fit function, whatever the sampling.
+    fixed = {"a1": (1.0, 0, 0), "a2": (0.5, 0, 0)}
+
+    for streaming in [False, True]:
+        for band in func_sampling_1d("a1*x0 + a2", fixed, {}, x, x_finer, n_samples=500, streaming=streaming)[1]:
+            np.testing.assert_allclose(band, x_finer + 0.5)
+
+    func_bands, n_samples = adaptive_func_sampling("a1*x0 + a2", fixed, {}, [x], dim=1)
+
+    assert n_samples == 0
+    np.testing.assert_allclose(func_bands[0][4], x + 0.5)
+
+    # Sampling pages of 2D candidates.
+    from symbolfit.plotting import plot_total_unc_coverage_all_func_2D
+
+    x_edges = np.linspace(1, 3, 11)
+    x1_edges = np.linspace(0, 2, 6)
+    x_data = np.column_stack(
+        [g.flatten() for g in np.meshgrid((x_edges[1:] + x_edges[:-1]) / 2, (x1_edges[1:] + x1_edges[:-1]) / 2)]
+    )
+    y_data = 2.0 * x_data[:, 0] + x_data[:, 1] + 0.5
+    y_unc = np.full(y_data.shape, 0.3)
+
+    func_candidates = pd.DataFrame(
+        {
+            "Parameterized equation, unscaled": ["a1*x0 + a2*x1 + a3", "a1*x0", "a1*x0 + a2*x1 + a3"],
+            "Parameters: (best-fit, +1, -1)": [param, {"a1": (2.5, 0, 0)}, param],
+            # Not positive semi-definite: drawn without bands.
+            "Covariance": [cov, {}, {**cov, "a1, a2": 0.05}],
+        }
+    )
+
+    samples_used = plot_total_unc_coverage_all_func_2D(
+        func_candidates=func_candidates,
+        x=x_data,
+        bin_edges_2d=[x_edges.tolist(), x1_edges.tolist()],
+        y=np.reshape(y_data, (-1, 1)),
+        y_up=np.reshape(y_unc, (-1, 1)),
+        y_down=np.reshape(y_unc, (-1, 1)),
+        n_samples=200,
+        sampling_95quantile=False,
+        pdf_path=str(tmp_path / "candidates_sampling.pdf"),
+        logx0=False,
+        logx1=False,
+        logy=False,
+        cbar_min=None,
+        cbar_max=None,
+        cmap=None,
+    )
+
+    assert (tmp_path / "candidates_sampling.pdf").stat().st_size > 0
+    assert samples_used == [200, 0, 0]
+
+    # Same for 1D candidates, without leaving the figure of the failed page open.
+    import matplotlib.pyplot as plt
+
+    from symbolfit.plotting import plot_total_unc_coverage_all_func_1D
+
+    x = np.reshape(np.linspace(1, 3, 20), (-1, 1))
+    y_unc = np.full(x.shape, 0.3)
+
+    samples_used = plot_total_unc_coverage_all_func_1D(
+        func_candidates=func_candidates.assign(
+            **{"Parameterized equation, unscaled": ["a1*x0 + a2", "a1*x0", "a1*x0 + a2"]}
+        ),
+        x=x,
+        bin_widths_1d=None,
+        y=2.0 * x + 1.0,
+        y_up=y_unc,
+        y_down=y_unc,
+        n_samples=200,
+        sampling_95quantile=False,
+        pdf_path=str(tmp_path / "candidates_sampling_1d.pdf"),
+        logy=False,
+        logx=False,
+    )
+
+    assert samples_used == [200, 0, 0]
+    assert plt.get_fignums() == []
+
+
+def test_streamed_bands():
+    # The same samples, all at once or in chunks: the streamed percentiles are within a bin width.
+    func, _ = compile_func("a1*exp(-a2*x0) + a3*x1**2", 2)
+
+    x_grid = rng.uniform(0, 3, size=(500, 2))
+    samples = rng.multivariate_normal([2.0, 1.0, 0.5], np.diag([0.01, 0.04, 0.09]), size=5000)
+
+    exact = sampled_bands(
+        func=func,
+        params=[samples[:, k : k + 1] for k in range(3)],
+        x=x_grid,
+        n_samples=len(samples),
+        chunk_size=128,
+        dim=2,
+    )
+
+    # Chunks of different sizes, the first one sets the histogram range.
+    chunks = np.split(samples, [700, 2000, 4500])
+
+    streamed, streamed_constant = streamed_bands(
+        func=func,
+        param_chunks=([chunk[:, k : k + 1] for k in range(3)] for chunk in chunks),
+        x_grids=[x_grid, np.zeros((3, 2))],
+        chunk_size=128,
+        dim=2,
+        n_bins=256,
+    )
+
+    func_samples = func([samples[:, k : k + 1] for k in range(3)], x_grid[:, 0], x_grid[:, 1])
+    spread = np.ptp(func_samples[:700], axis=0)
+
+    np.testing.assert_allclose(streamed[0], exact[0], rtol=1e-12)
+
+    for band, exact_band in zip(streamed[1:], exact[1:]):
+        assert np.all(np.abs(band - exact_band) <= 1.5 * spread / 256)
+
+    # At x = 0 the function only depends on a1.
+    np.testing.assert_allclose(streamed_constant[2], np.percentile(samples[:, 0], 16), atol=1e-3)
+
+    # Through func_sampling(), with fewer samples than in a chunk as well.
+    for n_samples in [300, 20000]:
+        (bands,) = func_sampling(
+            func_str="a1*x0 + a2",
+            param={"a1": (1.0, 0.1, -0.1), "a2": (0.5, 0.2, -0.2)},
+            cov={"a1, a1": 0.01, "a2, a2": 0.04},
+            x_grids=[x_grid[:, :1]],
+            dim=1,
+            n_samples=n_samples,
+            streaming=True,
+        )
+
+        assert bands[0].shape == (500, 1)
+
+    sigma = np.sqrt(0.01 * x_grid[:, :1] ** 2 + 0.04)
+    np.testing.assert_allclose(bands[3] - bands[2], 2 * sigma, rtol=0.05)
+
+    # Sampled parameters leaving the domain of the function: NaN bands at the same points as all at once.
+    x = np.reshape(np.linspace(0, 1, 50), (-1, 1))
+
+    for func_str in ["log(a1)*x0 + 1", "a2*x0 + log(a1 + x0)"]:
+        np.random.seed(0)
+        (exact,) = func_sampling(
+            func_str=func_str,
+            param={"a1": (0.01, 0.05, -0.05), "a2": (1.0, 0.1, -0.1)},
+            cov={"a1, a1": 0.0025, "a2, a2": 0.01},
+            x_grids=[x],
+            dim=1,
+            n_samples=4000,
+        )
+
+        np.random.seed(0)
+        (streamed,) = func_sampling(
+            func_str=func_str,
+            param={"a1": (0.01, 0.05, -0.05), "a2": (1.0, 0.1, -0.1)},
+            cov={"a1, a1": 0.0025, "a2, a2": 0.01},
+            x_grids=[x],
+            dim=1,
+            n_samples=4000,
+            streaming=True,
+            sample_chunk_size=1000,
+        )
+
+        for band, exact_band in zip(streamed, exact):
+            np.testing.assert_array_equal(np.isnan(band), np.isnan(exact_band))
+            np.testing.assert_allclose(band[np.isfinite(band)], exact_band[np.isfinite(exact_band)], atol=0.02)
+
+    assert np.all(np.isnan(exact[0][x < 0.05])) and np.all(np.isfinite(exact[0][x > 0.2]))
+
+
+def test_linear_bands():
+    param = {"a1": (2.0, 0.1, -0.1), "a2": (1.0, 0.2, -0.2), "a3": (0.5, 0, 0)}
+    cov = {"a1, a1": 0.01, "a1, a2": -0.012, "a2, a2": 0.04}
+
+    x_grid = rng.uniform(0, 2, size=(300, 2))
+
+    # Exact for a function linear in its parameters.
+    ((central, lower_2sigma, lower_1sigma, upper_1sigma, upper_2sigma),) = linear_bands(
+        func_str="a1*x0 + a2*x1 + a3", param=param, cov=cov, x_grids=[x_grid], dim=2, chunk_size=64
+    )
+
+    sigma = np.sqrt(0.01 * x_grid[:, 0] ** 2 + 2 * -0.012 * x_grid[:, 0] * x_grid[:, 1] + 0.04 * x_grid[:, 1] ** 2)
+
+    np.testing.assert_allclose(central, 2.0 * x_grid[:, 0] + x_grid[:, 1] + 0.5)
+    np.testing.assert_allclose(upper_1sigma - lower_1sigma, 2 * 0.994457883209753 * sigma)
+    np.testing.assert_allclose(upper_2sigma - central, 1.959963984540054 * sigma)
+
+    # Through func_sampling(), keeping the shape of 1D grids.
+    x = np.reshape(np.linspace(0, 1, 20), (-1, 1))
+
+    ((central, *_),) = func_sampling(
+        func_str="a1*x0 + a2*x0**2 + a3",
+        param=param,
+        cov=cov,
+        x_grids=[x],
+        dim=1,
+        n_samples=None,
+        band_method="linear",
+    )
+
+    assert central.shape == x.shape
+
+    # All parameters fixed: zero-width bands at the best-fit function.
+    bands = linear_bands(
+        func_str="a1*x0 + a2", param={"a1": (2.0, 0, 0), "a2": (1.0, 0, 0)}, cov={}, x_grids=[x], dim=1
+    )[0]
+
+    for band in bands:
+        np.testing.assert_allclose(band, 2.0 * x + 1.0)
+
+    # Agrees with the sampled bands for a linear function, not for a strongly nonlinear one.
+    np.random.seed(4)
+
+    assert band_disagreement("a1*x0 + a2*x1 + a3", param, cov, x_grid, dim=2) < 0.2
+    assert band_disagreement("exp(3*a2)*x1 + a1*x0 + a3", param, cov, x_grid, dim=2) > 0.2
+
+
+def test_qmc_sampling():
+    param = {"a1": (2.0, 0.1, -0.1), "a2": (1.0, 0.2, -0.2), "a3": (0.5, 0, 0)}
+    cov = {"a1, a1": 0.01, "a1, a2": -0.012, "a2, a2": 0.04}
+
+    x_grid = rng.uniform(0, 2, size=(200, 2))
+
+    sigma = np.sqrt(0.01 * x_grid[:, 0] ** 2 + 2 * -0.012 * x_grid[:, 0] * x_grid[:, 1] + 0.04 * x_grid[:, 1] ** 2)
+
+    # Linear function: the exact 16/84 percentiles are central -/+ 0.994 sigma.
+    def band_error(sampler, n_samples):
+        (bands,) = func_sampling(
+            func_str="a1*x0 + a2*x1 + a3",
+            param=param,
+            cov=cov,
+            x_grids=[x_grid],
+            dim=2,
+            n_samples=n_samples,
+            sampler=sampler,
+        )
+
+        return np.median(np.abs((bands[3] - bands[2]) / 2 - 0.994457883209753 * sigma) / sigma)
+
+    np.random.seed(8)
+
+    # Sobol points with 4 times fewer samples than random ones.
+    assert band_error("sobol", 512) < band_error("random", 2048)
+    assert band_error("halton", 1000) < 0.02
+
+    # Reported standard errors: same scale as the actual errors, smaller for Sobol points.
+    errors = {}
+
+    for sampler in ["random", "sobol"]:
+        bands, errors[sampler] = band_errors(
+            func_str="a1*x0 + a2*x1 + a3",
+            param=param,
+            cov=cov,
+            x=x_grid,
+            dim=2,
+            n_samples=1024,
+            sampler=sampler,
+            seed=2,
+        )
+
+        assert len(errors[sampler]) == 4 and errors[sampler][1].shape == (200,)
+        assert np.median(errors[sampler][2] / sigma) < 0.1
+
+    assert np.median(errors["sobol"][2]) < np.median(errors["random"][2])
+
+    # Fully correlated parameters: a singular covariance matrix, sampled with all samplers.
+    x = np.reshape(np.linspace(0, 1, 20), (-1, 1))
+
+    for sampler in ["random", "sobol", "halton"]:
+        ((_, _, lower_1sigma, upper_1sigma, _),) = func_sampling(
+            func_str="a1*x0 + a2",
+            param={"a1": (1.0, 0.1, -0.1), "a2": (0.5, 0.1, -0.1)},
+            cov={"a1, a1": 0.01, "a1, a2": 0.01, "a2, a2": 0.01},
+            x_grids=[x],
+            dim=1,
+            n_samples=4096,
+            sampler=sampler,
+        )
+
+        np.testing.assert_allclose((upper_1sigma - lower_1sigma) / 2, 0.994457883209753 * 0.1 * (x + 1), rtol=0.1)
+
+
+def test_adaptive_sampling():
+    param = {"a1": (2.0, 0.1, -0.1), "a2": (1.0, 0.2, -0.2), "a3": (0.5, 0, 0)}
+    cov = {"a1, a1": 0.01, "a1, a2": -0.012, "a2, a2": 0.04}
+
+    x = np.reshape(np.linspace(0.5, 2, 30), (-1, 1))
+    x_finer = np.linspace(0.5, 2, 300)
+
+    sigma = np.sqrt(0.01 * x**2 + 2 * -0.012 * x * x**2 + 0.04 * x**4)
+
+    np.random.seed(9)
+
+    (bands, bands_finer), n_samples = adaptive_func_sampling(
+        func_str="a1*x0 + a2*x0**2 + a3", param=param, cov=cov, x_grids=[x, x_finer], dim=1, rtol=0.05
+    )
+
+    # Doubled from 256 until converged, before the cap.
+    assert n_samples in [512, 1024, 2048, 4096, 8192, 16384]
+    assert bands[0].shape == x.shape and bands_finer[0].shape == x_finer.shape
+    np.testing.assert_allclose((bands[3] - bands[2]) / 2, 0.994457883209753 * sigma, rtol=0.1)
+
+    # A tighter tolerance needs more samples, up to the cap.
+    _, n_tight = adaptive_func_sampling(
+        func_str="a1*x0 + a2*x0**2 + a3", param=param, cov=cov, x_grids=[x], dim=1, rtol=0.001, max_samples=3000
+    )
+
+    assert n_tight == 3000
+
+    # The percentiles of a function of a single varied parameter are exact at the first doubling.
+    _, n_single = adaptive_func_sampling(
+        func_str="a1*x0 + a2*0 + a3",
+        param={"a1": (2.0, 0.1, -0.1), "a2": (1.0, 0, 0), "a3": (0.5, 0, 0)},
+        cov={"a1, a1": 0.01},
+        x_grids=[x],
+        dim=1,
+        rtol=0.2,
+        sampler="sobol",
+    )
+
+    assert n_single == 512
+
+
+def test_import_time_budget():
+    # Evaluating saved candidates must not load PySR/Julia, lmfit, scipy or the plotting stack.
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import symbolfit.evaluate\n"
+        "print(time.perf_counter() - start)\n"
+        "print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))\n"
+    )
+
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split("\n")
+
+    import_time = float(output[0])
+    modules = set(output[1].split())
+
+    assert not modules & {"pysr", "juliacall", "lmfit", "scipy", "matplotlib", "seaborn", "sympy", "pandas"}
+    assert import_time < 2.0
@@ -0,0 +1,130 @@
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from symbolfit import inference
+from symbolfit.evaluate import func_evaluate, func_sampling_1d
+from symbolfit.symbolfit import SymbolFit
+
+rng = np.random.default_rng(3)
+
+
+def test_parse_literal():
+    cell = "{'a1': (np.float64(-3.0), np.float64(0.008), np.float64(-0.008)), 'a2': (np.float64(2.8), 0, 0)}"
+
+    assert inference.parse_literal(cell) == {"a1": (-3.0, 0.008, -0.008), "a2": (2.8, 0, 0)}
+    assert inference.parse_literal("{'a1, a2': -1e-05, 'a1, a1': nan}")["a1, a2"] == -1e-05
+    assert inference.parse_literal("[{'vary': [True, False], 'nfev': 10}]") == [{"vary": [True, False], "nfev": 10}]
+
+    for cell in ["__import__('os').system('true')", "np.load('x.npy')", "{'a1': x}", "-'a'"]:
+        with pytest.raises(ValueError):
+            inference.parse_literal(cell)
+
+
+def test_load_and_evaluate(tmp_path):
+    x_data = np.linspace(100, 2000, 60)
+    y_data = 1e4 * np.exp(-3 * (x_data - 100) / 1900)
+    y_unc = 0.02 * y_data + 1
+    y_data = y_data + rng.normal(0, 1, y_data.shape) * y_unc
+
+    model = SymbolFit(x=x_data.tolist(), y=y_data.tolist(), y_up=y_unc.tolist(), y_down=y_unc.tolist())
+    model.refit_from(["3.1*exp(-3.0*x0)", "1.0 + 0.5*x0", "2.9*exp(-2.8*x0) + 0.01"])
+    model.save_to_csv(output_dir=str(tmp_path))
+
+    candidates = inference.load(tmp_path)
+
+    assert len(candidates) == 3
+    assert candidates[0].gof["Chi2/NDF"] == model.func_candidates["Chi2/NDF"][0]
+
+    x_new = np.linspace(50, 2500, 500)
+
+    for i, candidate in enumerate(candidates):
+        func_candidate = model.func_candidates.iloc[i]
+        expected = func_evaluate(func_candidate, x_new.reshape(-1, 1), dim=1)
+
+        np.testing.assert_allclose(candidate.evaluate(x_new), expected[:, 0], rtol=1e-12)
+
+        bands = candidate.bands(x_new, n_samples=4000, seed=1, chunk_size=128)
+
+        assert list(bands) == ["central", "mean", "-2sigma", "-1sigma", "+1sigma", "+2sigma"]
+        assert all(band.shape == x_new.shape for band in bands.values())
+        assert np.all(bands["-2sigma"] <= bands["-1sigma"]) and np.all(bands["+1sigma"] <= bands["+2sigma"])
+
+        # Reproducible with a seed, and consistent with the sampling of the plots.
+        np.testing.assert_array_equal(candidate.bands(x_new, n_samples=4000, seed=1)["+1sigma"], bands["+1sigma"])
+
+        reference, _ = func_sampling_1d(
+            func_candidate["Parameterized equation, unscaled"],
+            func_candidate["Parameters: (best-fit, +1, -1)"],
+            func_candidate["Covariance"],
+            x_new.reshape(-1, 1),
+            x_new.reshape(-1, 1),
+            n_samples=4000,
+        )
+
+        width = reference[3] - reference[2]
+        np.testing.assert_allclose(bands["+1sigma"] - bands["-1sigma"], width[:, 0], rtol=0.1)
+
+
+def test_bands_2d(tmp_path):
+    pd.DataFrame(
+        {
+            "Parameterized equation, unscaled": ["a1*exp(-a2*x0) + a3*x1"],
+            "Parameters: (best-fit, +1, -1)": [{"a1": (2.0, 0.1, -0.1), "a2": (0.5, 0.0, 0.0), "a3": (1.0, 0.2, -0.2)}],
+            "Covariance": [{"a1, a1": 0.01, "a1, a3": 0.018, "a3, a3": 0.04}],
+            "RMSE": [0.1],
+        }
+    ).to_csv(tmp_path / "candidates_compact.csv")
+
+    (candidate,) = inference.load(tmp_path / "candidates_compact.csv")
+
+    x = np.column_stack([np.linspace(0, 2, 1000), np.linspace(-1, 1, 1000)])
+
+    np.testing.assert_allclose(candidate.evaluate(x), 2.0 * np.exp(-0.5 * x[:, 0]) + x[:, 1])
+
+    bands = candidate.bands(x, n_samples=20000, seed=0, chunk_size=100)
+
+    # Linear in the correlated a1, a3 (a2 fixed), so the band is exactly gaussian.
+    d1, d3 = np.exp(-0.5 * x[:, 0]), x[:, 1]
+    sigma = np.sqrt(0.01 * d1**2 + 0.04 * d3**2 + 2 * 0.018 * d1 * d3)
+    np.testing.assert_allclose((bands["+1sigma"] - bands["-1sigma"]) / 2, sigma, rtol=0.05, atol=0.005)
+
+    # Streaming: same band without keeping all samples.
+    streamed = candidate.bands(x, n_samples=20000, seed=0, chunk_size=100, streaming=True, sample_chunk_size=3000)
+    np.testing.assert_allclose((streamed["+1sigma"] - streamed["-1sigma"]) / 2, sigma, rtol=0.05, atol=0.005)
+    np.testing.assert_allclose(streamed["mean"], bands["mean"], atol=0.02)
+
+    qmc = candidate.bands(x, n_samples=4096, seed=0, sampler="sobol")
+    np.testing.assert_allclose((qmc["+1sigma"] - qmc["-1sigma"]) / 2, sigma, rtol=0.05, atol=0.005)
+
+    # The same samples (and rounded Sobol sample counts) as func_sampling() from the same random state.
+    from symbolfit.evaluate import func_sampling
+
+    for sampler in ["random", "sobol"]:
+        np.random.seed(5)
+        sampled = candidate.bands(x, n_samples=1000, sampler=sampler)
+
+        np.random.seed(5)
+        ((_, *band_values),) = func_sampling(
+            candidate.equation, candidate.parameters, candidate.covariance, [x], dim=2, n_samples=1000, sampler=sampler
+        )
+
+        for key, band in zip(["-2sigma", "-1sigma", "+1sigma", "+2sigma"], band_values):
+            np.testing.assert_allclose(sampled[key], band)
+
+    linear = candidate.bands(x, band_method="linear")
+    np.testing.assert_allclose((linear["+1sigma"] - linear["-1sigma"]) / 2, 0.994457883209753 * sigma)
+    np.testing.assert_allclose(linear["mean"], linear["central"])
+
+
+def test_import_is_numpy_only():
+    code = "import sys, symbolfit.inference; print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    modules = set(
+        subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+    )
+
+    assert "numpy" in modules
+    assert not modules & {"pysr", "juliacall", "lmfit", "scipy", "matplotlib", "seaborn", "sympy", "pandas"}
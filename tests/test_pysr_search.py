@@ -0,0 +1,237 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import symbolfit.symbolfit
+from symbolfit.cache import cache_key, cache_load, cache_stats, cache_store
+from symbolfit.symbolfit import SymbolFit
+
+x = np.reshape(np.linspace(0, 1, 50), (-1, 1))
+y = np.exp(-3 * x)
+weights = np.ones(50)
+pysr_params = {"niterations": 100, "binary_operators": ["+", "*"], "output_directory": "a", "verbosity": 1}
+
+
+def test_cache_key():
+    key = cache_key(x, y, weights, pysr_params, max_complexity=20, random_seed=1)
+
+    # Settings that do not change the search are ignored.
+    assert key == cache_key(x, y, weights, {**pysr_params, "output_directory": "b", "verbosity": 0}, 20, 1)
+
+    assert key != cache_key(x, y * 1.0001, weights, pysr_params, 20, 1)
+    assert key != cache_key(x, y, weights * 2, pysr_params, 20, 1)
+    assert key != cache_key(x, y, weights, {**pysr_params, "niterations": 101}, 20, 1)
+    assert key != cache_key(x, y, weights, pysr_params, 21, 1)
+    assert key != cache_key(x, y, weights, pysr_params, 20, 2)
+
+
+def test_cache_eviction(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    func_candidates = pd.DataFrame({"PySR equation": ["exp(x0)"] * 50, "Complexity": range(50)})
+
+    assert cache_load(cache_dir, "k0") is None
+
+    cache_store(cache_dir, "k0", func_candidates, max_size=None)
+    entry_size = cache_stats(cache_dir)["size"]
+
+    # Room for two entries: storing more evicts the least recently used one.
+    cache_store(cache_dir, "k1", func_candidates, max_size=2 * entry_size)
+    os.utime(os.path.join(cache_dir, "k0.pkl"), (0, 0))
+    os.utime(os.path.join(cache_dir, "k1.pkl"), (1, 1))
+    pd.testing.assert_frame_equal(cache_load(cache_dir, "k0"), func_candidates)
+
+    cache_store(cache_dir, "k2", func_candidates, max_size=2 * entry_size)
+
+    assert cache_load(cache_dir, "k1") is None
+    assert cache_load(cache_dir, "k0") is not None
+    assert cache_load(cache_dir, "k2") is not None
+
+    assert cache_stats(cache_dir) == {
+        "entries": 2,
+        "size": 2 * entry_size,
+        "hits": 3,
+        "misses": 2,
+        "hit rate": 0.6,
+        "evictions": 1,
+    }
+
+
+class RecordingPySR:
+    # Stands in for PySRRegressor, recording the searches.
+    def __init__(self):
+        self.params = {"niterations": 10}
+        self.searches = []
+
+    def set_params(self, **params):
+        self.params.update(params)
+
+    def get_params(self):
+        return dict(self.params)
+
+    def fit(self, X, y, weights=None):
+        self.searches.append(self.get_params())
+        os.makedirs(os.path.join(self.params["output_directory"], f"run{len(self.searches)}"))
+
+        # PySR keeps the state of the search to resume from with warm_start.
+        self.julia_state_stream_ = b"state"
+
+    @property
+    def num_fits(self):
+        return len(self.searches)
+
+
+x_data = np.linspace(100, 2000, 40)
+y_unc = 0.02 * 1e4 * np.exp(-3 * (x_data - 100) / 1900) + 1
+
+
+def fit(y_data, pysr_model, **kwargs):
+    model = SymbolFit(
+        x=x_data.tolist(),
+        y=y_data.tolist(),
+        y_up=y_unc.tolist(),
+        y_down=y_unc.tolist(),
+        pysr_config=pysr_model,
+        random_seed=1,
+        **kwargs,
+    )
+    model.fit()
+
+    return model
+
+
+def fake_hall_of_fame(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+
+    parsed_run_directories = []
+
+    def parse_pysr_equ(pysr_dir, x):
+        parsed_run_directories.append(os.path.basename(pysr_dir))
+
+        return pd.DataFrame({"PySR equation": ["3.1*exp(-3.0*x0)", "1.0 + 0.5*x0"], "Complexity": [6, 5]})
+
+    monkeypatch.setattr(symbolfit.symbolfit, "parse_pysr_equ", parse_pysr_equ)
+
+    return parsed_run_directories
+
+
+def test_fit_with_cache(tmp_path, monkeypatch):
+    fake_hall_of_fame(monkeypatch, tmp_path)
+
+    y_data = 1e4 * np.exp(-3 * (x_data - 100) / 1900)
+
+    pysr_model = RecordingPySR()
+
+    def fit_cached(y_data):
+        return fit(y_data, pysr_model, pysr_cache=str(tmp_path / "cache"))
+
+    first = fit_cached(y_data)
+    second = fit_cached(y_data)
+
+    assert pysr_model.num_fits == 1
+    pd.testing.assert_frame_equal(first.func_candidates, second.func_candidates)
+
+    fit_cached(y_data * np.linspace(1, 1.1, 40))
+
+    assert pysr_model.num_fits == 2
+    assert second.pysr_cache_stats()["hits"] == 1
+    assert second.pysr_cache_stats()["misses"] == 2
+    assert second.pysr_cache_stats()["entries"] == 2
+
+
+def test_fit_warm_start(tmp_path, monkeypatch):
+    parsed_run_directories = fake_hall_of_fame(monkeypatch, tmp_path)
+
+    pysr_model = RecordingPySR()
+
+    model = SymbolFit(pysr_config=pysr_model, pysr_warm_start=True, pysr_warm_start_niterations=3)
+
+    # New data arriving for the same spectrum.
+    for norm in (1e4, 1.1e4, 1.2e4):
+        model.x = x_data.tolist()
+        model.y = (norm * np.exp(-3 * (x_data - 100) / 1900)).tolist()
+        model.y_up = model.y_down = y_unc.tolist()
+        model.fit()
+
+    assert [search["warm_start"] for search in pysr_model.searches] == [False, True, True]
+    assert [search["niterations"] for search in pysr_model.searches] == [10, 3, 3]
+    assert pysr_model.get_params()["niterations"] == 10
+
+    # The previous runs are kept, and the latest one is parsed.
+    assert sorted(os.listdir(model.pysr_output_directory)) == ["run1", "run2", "run3"]
+    assert parsed_run_directories == ["run1", "run2", "run3"]
+
+    assert [search["warm start"] for search in model.pysr_searches] == [False, True, True]
+    assert [search.get("iterations saved") for search in model.pysr_searches] == [None, 7, 7]
+    assert all("time saved" in search for search in model.pysr_searches[1:])
+
+
+def test_fit_warm_start_with_cache(tmp_path, monkeypatch):
+    fake_hall_of_fame(monkeypatch, tmp_path)
+
+    pysr_model = RecordingPySR()
+
+    model = SymbolFit(pysr_config=pysr_model, pysr_warm_start=True, pysr_cache=str(tmp_path / "cache"))
+
+    for norm in (1e4, 1.1e4):
+        model.x = x_data.tolist()
+        model.y = (norm * np.exp(-3 * (x_data - 100) / 1900)).tolist()
+        model.y_up = model.y_down = y_unc.tolist()
+        model.fit()
+
+    assert [search["warm_start"] for search in pysr_model.searches] == [False, True]
+
+    # Only the cold search is stored, as a warm-started one depends on the previous runs.
+    assert model.pysr_cache_stats()["entries"] == 1
+
+
+class HallOfFamePySR(RecordingPySR):
+    # Writes a hall of fame specific to each dataset, read back by hall_of_fame_from_csv().
+    def fit(self, X, y, weights=None):
+        super().fit(X, y, weights)
+
+        run_directory = os.path.join(self.params["output_directory"], f"run{len(self.searches)}")
+        slope = round(float(-np.log(y[-1, 0] / y[0, 0])), 1)
+
+        # Give the other fits time to start while this one is running.
+        time.sleep(0.5)
+
+        pd.DataFrame({"PySR equation": [f"3.0*exp(-{slope}*x0)"], "Complexity": [6]}).to_csv(
+            os.path.join(run_directory, "hall_of_fame.csv")
+        )
+
+
+def hall_of_fame_from_csv(pysr_dir, x):
+    return pd.read_csv(os.path.join(pysr_dir, "hall_of_fame.csv"))[["PySR equation", "Complexity"]]
+
+
+def fit_slope(slope, work_dir_cleanup="always"):
+    # Runs in a worker process.
+    symbolfit.symbolfit.parse_pysr_equ = hall_of_fame_from_csv
+
+    y_data = 1e4 * np.exp(-slope * (x_data - 100) / 1900)
+
+    model = fit(y_data, HallOfFamePySR(), work_dir=".", work_dir_cleanup=work_dir_cleanup)
+
+    return model.pysr_output_directory, model.func_candidates["PySR equation"][0]
+
+
+def test_concurrent_fits(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    slopes = [1.0, 2.0, 3.0, 4.0]
+
+    with ProcessPoolExecutor(max_workers=len(slopes)) as executor:
+        results = list(executor.map(fit_slope, slopes))
+
+    # Each fit parsed its own search, in its own working directory (cleaned up afterwards).
+    assert [equation for _, equation in results] == [f"3.0*exp(-{slope}*x0)" for slope in slopes]
+    assert len({directory for directory, _ in results}) == len(slopes)
+    assert os.listdir(tmp_path) == []
+
+    monkeypatch.setattr(symbolfit.symbolfit, "parse_pysr_equ", hall_of_fame_from_csv)
+
+    directory, _ = fit_slope(2.0, work_dir_cleanup="never")
+    assert os.listdir(directory) == ["run1"]
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+
+from symbolfit.refit import add_refit_results, exhaustive_freezing, parameterize_func_all, refit_all, refit_iter
+from symbolfit.symbolfit import SymbolFit
+
+# Scaled 1D spectrum with a peak on a falling background and asymmetric uncertainties.
+rng = np.random.default_rng(42)
+
+x = np.reshape(np.linspace(0, 1, 200), (-1, 1))
+y = 2.0 * np.exp(-3.0 * x) + 0.5 * np.exp(-(((x - 0.5) / 0.1) ** 2))
+y_up = 0.02 + 0.05 * y
+y_down = 0.03 + 0.04 * y
+y = y + rng.normal(0, 1, y.shape) * y_up
+
+pysr_equations = pd.DataFrame(
+    {
+        "PySR equation": [
+            "exp(x0)",
+            "0.7 + 0.2*x0",
+            "1.8*exp(-2.7*x0)",
+            "1.9*exp(-2.9*x0) + 0.45*exp(-(9.8*x0 - 5.1)**2)",
+        ],
+        "Complexity": [2, 5, 6, 14],
+    }
+)
+
+
+def refit(**kwargs):
+    func_candidates = parameterize_func_all(func_candidates=pysr_equations.copy(), dim=1)
+
+    kwargs.setdefault("max_stderr", 20)
+
+    return refit_all(func_candidates=func_candidates, x=x, y=y, y_up=y_up, y_down=y_down, dim=1, **kwargs)
+
+
+def test_refit_parallel_matches_serial():
+    serial = refit(n_jobs=1)
+    parallel = refit(n_jobs=2)
+
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_refit_threads_match_serial():
+    serial = refit(n_jobs=1)
+    threaded = refit(n_jobs=4, parallel_backend="thread")
+
+    pd.testing.assert_frame_equal(serial, threaded)
+
+
+def test_refit_iter_streams_in_order():
+    serial = refit()
+
+    for n_jobs in (1, 2):
+        func_candidates = parameterize_func_all(func_candidates=pysr_equations.copy(), dim=1)
+
+        refit_results = refit_iter(
+            func_candidates=func_candidates, x=x, y=y, y_up=y_up, y_down=y_down, max_stderr=20, dim=1, n_jobs=n_jobs
+        )
+
+        # Each candidate can be completed on its own as soon as its refit is done.
+        rows = []
+        for i, refit_result in enumerate(refit_results):
+            rows.append(add_refit_results(func_candidates.iloc[[i]].reset_index(drop=True), [refit_result]))
+
+        pd.testing.assert_frame_equal(pd.concat(rows, ignore_index=True), serial)
+
+    # Stopping early does not wait for the remaining candidates.
+    refit_results = refit_iter(
+        func_candidates=func_candidates, x=x, y=y, y_up=y_up, y_down=y_down, max_stderr=20, dim=1, n_jobs=2
+    )
+    assert next(refit_results)[0].keys() == serial["Parameters: (best-fit, +1, -1)"][0].keys()
+    refit_results.close()
+
+
+def test_refit_analytic_jacobian():
+    finite_diff = refit()
+    analytic = refit(analytic_jacobian=True)
+
+    for params_fd, params_an in zip(
+        finite_diff["Parameters: (best-fit, +1, -1)"], analytic["Parameters: (best-fit, +1, -1)"]
+    ):
+        assert params_fd.keys() == params_an.keys()
+
+        for name in params_fd:
+            np.testing.assert_allclose(params_fd[name], params_an[name], rtol=1e-3)
+
+
+def test_refit_budget():
+    requested = []
+
+    def recording_freezing(num_params):
+        for vary in exhaustive_freezing(num_params):
+            requested.append(vary)
+            yield vary
+
+    # No fit can pass such a tight max_stderr, so without a budget the
+    # 5-parameter candidate would go through all 2^5 combinations.
+    func_candidates = parameterize_func_all(func_candidates=pysr_equations.iloc[[3]].reset_index(drop=True), dim=1)
+
+    refit_all(
+        func_candidates=func_candidates,
+        x=x,
+        y=y,
+        y_up=y_up,
+        y_down=y_down,
+        max_stderr=1e-6,
+        dim=1,
+        freeze_strategy=recording_freezing,
+        max_refits=3,
+    )
+
+    assert len(requested) == 3
+
+
+def test_refit_greedy():
+    greedy = refit(freeze_strategy="greedy")
+
+    # The well-constrained candidates pass in the first fit with all parameters varied,
+    # same as for the exhaustive search.
+    pd.testing.assert_frame_equal(greedy, refit())
+
+    # A redundant linear term (no such component in the data): its parameter a3 exceeds max_stderr
+    # and is the one frozen, in 2 fits where the exhaustive search takes 4.
+    func_candidates = parameterize_func_all(
+        func_candidates=pd.DataFrame(
+            {"PySR equation": ["1.9*exp(-2.9*x0) + 0.45*exp(-(9.8*x0 - 5.1)**2) + 0.001*x0"], "Complexity": [18]}
+        ),
+        dim=1,
+    )
+
+    assert func_candidates["Parameterized equation"][0] == "a3*x0 + a4*exp(-(a1 + a6*x0)**2) + a5*exp(a2*x0)"
+
+    def refit_redundant(**kwargs):
+        return refit_all(
+            func_candidates=func_candidates.copy(), x=x, y=y, y_up=y_up, y_down=y_down, max_stderr=20, dim=1, **kwargs
+        )
+
+    greedy = refit_redundant(freeze_strategy="greedy")
+    exhaustive = refit_redundant(freeze_strategy="exhaustive")
+
+    assert [trial["vary"] for trial in greedy["ROF trials"][0]] == [[True] * 6, [True, True, False, True, True, True]]
+    assert greedy["Parameters: (best-fit, +1, -1)"][0]["a3"] == (0.001, 0, 0)
+    assert len(exhaustive["ROF trials"][0]) == 4
+    assert greedy["Parameters: (best-fit, +1, -1)"][0] == exhaustive["Parameters: (best-fit, +1, -1)"][0]
+
+    # The refit budget stops the search after the first fit, a3 is then left varied.
+    budget = refit_redundant(freeze_strategy="greedy", max_refits=1)
+
+    assert [trial["vary"] for trial in budget["ROF trials"][0]] == [[True] * 6]
+    assert budget["Parameters: (best-fit, +1, -1)"][0]["a3"][1] > 0
+
+
+def test_refit_warm_start_trials():
+    cold = refit(max_stderr=1)
+    warm = refit(max_stderr=1, warm_start=True)
+
+    for func_candidates in (cold, warm):
+        for trials, nfev in zip(func_candidates["ROF trials"], func_candidates["ROF nfev"]):
+            assert nfev == sum(trial["nfev"] or 0 for trial in trials)
+
+    # Retries start from the best converged values, so the final fits cannot end up worse.
+    for trials_cold, trials_warm in zip(cold["ROF trials"], warm["ROF trials"]):
+        if trials_cold:
+            assert trials_warm[-1]["chi2"] <= trials_cold[-1]["chi2"]
+
+
+def test_refit_from(tmp_path):
+    x_data = np.linspace(100, 2000, 60)
+    y_data = 1e4 * np.exp(-3 * (x_data - 100) / 1900)
+    y_unc = 0.02 * y_data + 1
+    y_data = y_data + rng.normal(0, 1, y_data.shape) * y_unc
+
+    model = SymbolFit(x=x_data.tolist(), y=y_data.tolist(), y_up=y_unc.tolist(), y_down=y_unc.tolist())
+
+    # Equations in the rescaled x, as PySR sees them.
+    model.refit_from(["3.1*exp(-3.0*x0)", "1.0 + 0.5*x0", "2.9*exp(-2.8*x0) + 0.01"])
+
+    assert list(model.func_candidates["Complexity"]) == [6, 5, 8]
+    assert model.func_candidates["Chi2/NDF"][0] < 2
+    assert model.func_candidates["Chi2/NDF"][1] > 10
+
+    previous = model.func_candidates
+    model.save_to_csv(output_dir=str(tmp_path))
+
+    # Same candidates from the dataframe or the saved csv, refitted with other settings.
+    model.max_stderr = 5
+    model.refit_from(previous)
+    from_df = model.func_candidates
+
+    model.refit_from(str(tmp_path / "candidates.csv"))
+    pd.testing.assert_frame_equal(model.func_candidates, from_df)
+
+    assert list(from_df["PySR equation"]) == list(previous["PySR equation"])
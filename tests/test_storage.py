@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from symbolfit import inference
+from symbolfit.storage import load_candidates, read_candidates
+from symbolfit.symbolfit import SymbolFit
+
+rng = np.random.default_rng(5)
+
+
+def test_npz_round_trip(tmp_path):
+    x_data = np.linspace(100, 2000, 60)
+    y_data = 1e4 * np.exp(-3 * (x_data - 100) / 1900)
+    y_unc = 0.02 * y_data + 1
+    y_data = y_data + rng.normal(0, 1, y_data.shape) * y_unc
+
+    model = SymbolFit(x=x_data.tolist(), y=y_data.tolist(), y_up=y_unc.tolist(), y_down=y_unc.tolist(), max_stderr=5)
+    model.refit_from(["3.1*exp(-3.0*x0)", "1.0 + 0.5*x0", "2.9*exp(-2.8*x0) + 0.01"])
+
+    model.save_to_npz(output_dir=str(tmp_path))
+    model.save_to_csv(output_dir=str(tmp_path))
+
+    loaded = load_candidates(str(tmp_path))
+
+    pd.testing.assert_frame_equal(loaded, model.func_candidates)
+
+    # Also the order of the keys in the parameter dicts.
+    for column in ["Parameterization", "Parameters: (best-fit, +1, -1)", "Covariance", "Correlation"]:
+        for saved, original in zip(loaded[column], model.func_candidates[column]):
+            assert list(saved) == list(original)
+
+    # Fixed parameters keep their zero uncertainties.
+    assert any(0 in values[1:] for p in loaded["Parameters: (best-fit, +1, -1)"] for values in p.values())
+
+    _, _, data, settings = read_candidates(str(tmp_path))
+
+    np.testing.assert_array_equal(data["y_up"], y_unc)
+    assert settings["max_stderr"] == 5
+
+    # The numpy-only inference reads the npz files, with the same content as the csv files.
+    from_npz = inference.load(tmp_path)
+    from_csv = inference.load(tmp_path / "candidates.csv")
+
+    for a, b in zip(from_npz, from_csv):
+        assert a.equation == b.equation
+        assert a.parameters == b.parameters
+        assert a.covariance == b.covariance
+        assert a.gof == b.gof
+
+
+def test_load(tmp_path):
+    x_data = np.linspace(100, 2000, 40)
+    y_data = 1e4 * np.exp(-3 * (x_data - 100) / 1900)
+    y_unc = 0.02 * y_data + 1
+
+    model = SymbolFit(x=x_data.tolist(), y=y_data.tolist(), y_up=y_unc.tolist(), y_down=y_unc.tolist(), max_stderr=30)
+    model.refit_from(["3.1*exp(-3.0*x0)", "1.0 + 0.5*x0"])
+
+    model.save_to_npz(output_dir=str(tmp_path / "npz"))
+    model.save_to_csv(output_dir=str(tmp_path / "csv"))
+
+    loaded = SymbolFit.load(str(tmp_path / "npz"))
+
+    pd.testing.assert_frame_equal(loaded.func_candidates, model.func_candidates)
+    assert loaded.x == model.x and loaded.y_up == model.y_up
+    assert loaded.max_stderr == 30
+
+    # From csv the data is passed again, the parameter dicts are parsed without eval().
+    from_csv = SymbolFit.load(str(tmp_path / "csv"), x=model.x, y=model.y, y_up=model.y_up, y_down=model.y_down)
+
+    for column in ["Parameters: (best-fit, +1, -1)", "Covariance", "Correlation", "ROF trials"]:
+        assert list(from_csv.func_candidates[column]) == list(model.func_candidates[column])
+
+    loaded.print_candidate(candidate_number=0)
+    loaded.plot_to_pdf(output_dir=str(tmp_path / "npz"))
+
+    assert os.path.exists(tmp_path / "npz" / "candidates_sampling.pdf")
+
+    # The linear candidate 1.0 + 0.5*x0 has the same linearized and sampled bands.
+    diagnostics = loaded.check_linear_bands()
+
+    assert diagnostics["Linear bands OK"].iloc[1]
+
+    # The exponential candidate fits the noiseless data exactly, its band is at the rounding level.
+    precision = loaded.band_precision(n_samples=256)
+
+    assert precision["Rel. error: 16/84"].iloc[1] < 0.2
+
+    loaded.plot_to_pdf(output_dir=str(tmp_path / "linear"), band_method="linear")
+
+    assert os.path.exists(tmp_path / "linear" / "candidates_sampling.pdf")
+
+    with pytest.raises(ValueError, match="band_method"):
+        loaded.plot_to_pdf(output_dir=str(tmp_path / "linear"), band_method="delta")
+
+    with pytest.raises(ValueError, match="sampler"):
+        loaded.plot_to_pdf(output_dir=str(tmp_path / "linear"), sampler="sobel")
+
+    # Number of samples per candidate, recorded in the results, within the cap.
+    # The band of the linear candidate converges before it.
+    np.random.seed(0)
+    loaded.plot_to_pdf(output_dir=str(tmp_path / "adaptive"), sampling_rtol=0.1, max_samples=4096)
+
+    assert all(256 < n_samples <= 4096 for n_samples in loaded.func_candidates["Band samples"])
+    assert loaded.func_candidates["Band samples"].iloc[1] < 4096
+
+    with pytest.raises(FileNotFoundError):
+        SymbolFit.load(str(tmp_path))
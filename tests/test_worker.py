@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+
+from symbolfit.worker import FitWorker
+
+from .test_batch import CrashingPySR, SlopePySR, datasets, use_stub_pysr
+
+
+class LoggedSlopePySR(SlopePySR):
+    # Logs the process id of each search, including the warm-up.
+    def __init__(self, log):
+        super().__init__()
+        self.log = log
+
+    def fit(self, X, y, weights=None):
+        with open(self.log, "a") as f:
+            f.write(f"{os.getpid()} {self.params['niterations']}\n")
+
+        super().fit(X, y, weights=weights)
+
+
+def test_fit_worker(tmp_path, monkeypatch):
+    use_stub_pysr(monkeypatch)
+
+    pysr_config = LoggedSlopePySR(log=tmp_path / "searches.log")
+
+    with FitWorker(pysr_config=pysr_config) as worker:
+        assert set(worker.startup_timings) == {"import", "warm-up", "total"}
+
+        for name, dataset in datasets.items():
+            assert worker.submit(dataset, name=name, output_dir=str(tmp_path / "results"), max_stderr=40) == name
+
+        results = [worker.result() for _ in datasets]
+
+        result = worker.fit(datasets["dimuon"], max_stderr=40)
+
+    assert not worker.process.is_alive()
+
+    # Results in the order of submission, a failed fit does not stop the worker.
+    assert [r["name"] for r in results] == ["dijet", "dimuon", "broken"]
+    assert [r["error"] is None for r in results] == [True, True, False]
+    assert "Cannot fit a non-positive spectrum." in results[2]["error"]
+    assert list(results[0]["func_candidates"]["PySR equation"]) == ["3.0*exp(-3.0*x0)", "0.1*x0 + 1.0"]
+
+    assert result["name"] == "3"
+    assert list(result["func_candidates"]["PySR equation"]) == ["3.0*exp(-2.0*x0)", "0.1*x0 + 1.0"]
+
+    # One warm-up search (niterations=1), then all fits served by the same worker process.
+    searches = (tmp_path / "searches.log").read_text().split()
+    pids = set(searches[::2])
+
+    assert searches[1::2] == ["1", "10", "10", "10", "10"]
+    assert len(pids) == 1 and str(os.getpid()) not in pids
+
+    assert sorted(os.listdir(tmp_path / "results")) == ["dijet", "dimuon"]
+    assert results[0]["queue time"] >= 0
+
+    summary = worker.timing_summary()
+
+    assert list(summary.index) == ["startup", "dijet", "dimuon", "broken", "3"]
+    assert list(summary["Status"][1:]) == ["ok", "ok", "failed", "ok"]
+    assert np.all(summary["Time: PySR search [s]"][1:] >= 0)
+    # The summary is rounded to 1 ms per column.
+    assert np.all(
+        summary["Time: total + amortized startup [s]"][1:]
+        >= summary["Time: total [s]"][1:] + summary["Time: total [s]"]["startup"] / 4 - 2e-3
+    )
+
+    with pytest.raises(RuntimeError, match="closed"):
+        worker.submit(datasets["dijet"])
+
+
+def test_fit_worker_crash(monkeypatch):
+    use_stub_pysr(monkeypatch)
+
+    with FitWorker(warm_up=False) as worker:
+        worker.submit(datasets["dijet"], pysr_config=CrashingPySR())
+        worker.submit(datasets["dimuon"])
+
+        with pytest.raises(RuntimeError, match="exit code 3"):
+            worker.result()
+
+    assert not worker.process.is_alive()